@@ -1,6 +1,6 @@
 # from .utils import measure_time, get_environment_variable, logger
 # from .utils import argscli
-from .utils import measure_time, get_environment_variable
+from .utils import measure_time, get_environment_variable, is_env_enabled
 from .logger import logger
 
 __all__ = [
@@ -8,4 +8,5 @@ __all__ = [
     "logger",
     # 'argscli',
     "get_environment_variable",
+    "is_env_enabled",
 ]
@@ -19,6 +19,53 @@ def parse_cli_args():
     parser.add_argument(
         "--debug", action="store_true", help="Active le mode debug détaillé"
     )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Reste en mémoire (modèles chargés) et exécute le graphe toutes les DAEMON_INTERVAL_MINUTES minutes",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Reprend une exécution interrompue au dernier noeud terminé",
+    )
+    parser.add_argument(
+        "--bluesky-stream",
+        action="store_true",
+        help="Ingestion continue Bluesky (Jetstream) vers la file locale",
+    )
+    parser.add_argument(
+        "--init-db",
+        action="store_true",
+        help="Crée les tables et migre une base existante, puis s'arrête",
+    )
+    parser.add_argument(
+        "--health-report",
+        action="store_true",
+        help="Affiche les sources les plus lentes et les sources en échec",
+    )
+    parser.add_argument(
+        "--reindex-articles",
+        action="store_true",
+        help="Indexe les embeddings des articles sauvegardés absents de l'index (recherche sémantique)",
+    )
+    parser.add_argument(
+        "--tune-embeddings",
+        action="store_true",
+        help="Mesure le débit des embeddings (modèles, lots, threads, devices) et écrit les réglages recommandés",
+    )
+    parser.add_argument(
+        "--llm-stub",
+        action="store_true",
+        help="Démarre un serveur LLM factice compatible OpenAI (benchmarks sans GPU)",
+    )
+    parser.add_argument(
+        "--tune-models", help="Modèles candidats séparés par des virgules (défaut : MODEL_EMBEDDINGS)"
+    )
+    parser.add_argument("--tune-batch-sizes", default="16,32,64,128", help="Tailles de lot candidates")
+    parser.add_argument("--tune-threads", help="Nombres de threads torch candidats (défaut : 1,2,4,8 bornés aux CPU)")
+    parser.add_argument("--tune-devices", help="Devices candidats (défaut : cpu, et cuda si disponible)")
+    parser.add_argument("--tune-texts", type=int, default=512, help="Textes de l'échantillon mesuré")
     return parser.parse_args()
 
 
@@ -45,3 +92,14 @@ def measure_time(func):
 def get_environment_variable(key, default=None):
     load_dotenv()
     return os.getenv(key, default)
+
+
+TRUE_VALUES = ("1", "true", "yes", "on", "oui")
+
+
+def is_env_enabled(key, default=False):
+    """Réglage booléen du .env : 1 / true / yes / on / oui (casse ignorée)"""
+    value = get_environment_variable(key)
+    if value is None:
+        return default
+    return value.strip().lower() in TRUE_VALUES
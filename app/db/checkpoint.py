@@ -0,0 +1,398 @@
+"""
+Points de reprise (checkpoints) LangGraph dans la base SQLite de l'application
+
+Un arrêt pendant summarize obligeait à tout refaire au lancement suivant (fetch, embeddings,
+résumés). Le graphe est compilé avec SQLiteCheckpointSaver : après chaque noeud terminé, l'état
+est enregistré sous l'identifiant de l'exécution (thread_id LangGraph) et
+`python -m app --resume <run_id>` repart du dernier noeud terminé.
+
+Stockage compact :
+    - les noeuds renvoient l'état complet, chaque étape produit donc une nouvelle version de
+      tous les canaux (articles, filtered_articles, ...) : les valeurs sont adressées par leur
+      empreinte (table graph_checkpoint_values), une liste d'articles inchangée depuis
+      l'étape précédente n'est pas enregistrée à nouveau ;
+    - sérialisation msgpack (JsonPlusSerializer), compressée par zlib au-delà de 1 Ko.
+
+Les résumés sont en plus enregistrés article par article (table summary_checkpoints) au fil
+de summarize_node : une reprise ne rappelle pas le LLM pour les articles déjà résumés.
+Une exécution terminée supprime ses points de reprise ; ceux des exécutions en échec jamais
+reprises sont purgés au lancement suivant après GRAPH_CHECKPOINT_TTL_DAYS jours.
+
+Configuration .env :
+    GRAPH_CHECKPOINT=true
+    GRAPH_CHECKPOINT_TTL_DAYS=7       0 : pas de purge
+"""
+
+import hashlib
+import threading
+import zlib
+from functools import lru_cache
+from collections.abc import Iterator, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, Text, delete, func, select, tuple_
+from sqlalchemy.orm import sessionmaker
+
+from app.core.utils import get_environment_variable, is_env_enabled
+from app.db.db import Base, engine as default_engine
+
+# blobs plus petits : la compression ne gagne rien
+COMPRESS_MIN_BYTES = 1024
+COMPRESSED_PREFIX = "zlib+"
+# types de l'application présents dans l'état du graphe (désérialisation autorisée)
+ALLOWED_MSGPACK_MODULES = [
+    ("app.services.models", "SourceType"),
+    ("app.services.models", "UnifiedState"),
+]
+
+
+class GraphCheckpoint(Base):
+    """Point de reprise : versions des canaux, sans leurs valeurs"""
+
+    __tablename__ = "graph_checkpoints"
+    thread_id = Column(String, primary_key=True)
+    checkpoint_ns = Column(String, primary_key=True, default="")
+    checkpoint_id = Column(String, primary_key=True)
+    parent_checkpoint_id = Column(String)
+    type = Column(String, nullable=False)
+    checkpoint = Column(LargeBinary, nullable=False)
+    meta_type = Column(String, nullable=False)
+    meta = Column("metadata", LargeBinary, nullable=False)
+    dt_created = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class GraphCheckpointBlob(Base):
+    """Version d'un canal de l'état : empreinte de sa valeur"""
+
+    __tablename__ = "graph_checkpoint_blobs"
+    thread_id = Column(String, primary_key=True)
+    checkpoint_ns = Column(String, primary_key=True, default="")
+    channel = Column(String, primary_key=True)
+    version = Column(String, primary_key=True)
+    type = Column(String, nullable=False)
+    digest = Column(String)
+
+
+class GraphCheckpointValue(Base):
+    """Valeur sérialisée, enregistrée une fois par exécution quel que soit son nombre de versions"""
+
+    __tablename__ = "graph_checkpoint_values"
+    thread_id = Column(String, primary_key=True)
+    digest = Column(String, primary_key=True)
+    blob = Column(LargeBinary, nullable=False)
+
+
+class GraphCheckpointWrite(Base):
+    """Écritures en attente d'un noeud (reprise au milieu d'une étape parallèle)"""
+
+    __tablename__ = "graph_checkpoint_writes"
+    thread_id = Column(String, primary_key=True)
+    checkpoint_ns = Column(String, primary_key=True, default="")
+    checkpoint_id = Column(String, primary_key=True)
+    task_id = Column(String, primary_key=True)
+    idx = Column(Integer, primary_key=True)
+    channel = Column(String, nullable=False)
+    type = Column(String, nullable=False)
+    blob = Column(LargeBinary)
+    task_path = Column(String, default="")
+
+
+class SummaryCheckpoint(Base):
+    """Résumé d'un article enregistré dès sa génération"""
+
+    __tablename__ = "summary_checkpoints"
+    thread_id = Column(String, primary_key=True)
+    article_key = Column(String, primary_key=True)
+    summary = Column(Text)
+    status = Column(String)
+    dt_created = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+TABLES = [
+    model.__table__
+    for model in (
+        GraphCheckpoint,
+        GraphCheckpointBlob,
+        GraphCheckpointValue,
+        GraphCheckpointWrite,
+        SummaryCheckpoint,
+    )
+]
+
+
+def is_checkpoint_enabled() -> bool:
+    return is_env_enabled("GRAPH_CHECKPOINT", True)
+
+
+def checkpoint_ttl_days() -> float:
+    return float(get_environment_variable("GRAPH_CHECKPOINT_TTL_DAYS", "7"))
+
+
+def run_config(run_id: str) -> RunnableConfig:
+    return {"configurable": {"thread_id": run_id}}
+
+
+def article_key(article: dict) -> str:
+    return article.get("link") or article["title"]
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """Checkpointer LangGraph sur la base SQLAlchemy de l'application"""
+
+    def __init__(self, engine=None):
+        super().__init__(serde=JsonPlusSerializer(allowed_msgpack_modules=ALLOWED_MSGPACK_MODULES))
+        self.engine = engine or default_engine
+        Base.metadata.create_all(self.engine, tables=TABLES)
+        self.Session = sessionmaker(bind=self.engine)
+        # écritures des noeuds parallèles (fetchers) et des résumés simultanés
+        self._lock = threading.Lock()
+
+    # sérialisation compacte
+
+    def _dumps(self, value: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            return COMPRESSED_PREFIX + type_, zlib.compress(data)
+        return type_, data
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        if type_.startswith(COMPRESSED_PREFIX):
+            type_, data = type_[len(COMPRESSED_PREFIX) :], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    # lecture
+
+    def _tuple(self, session, row: GraphCheckpoint) -> CheckpointTuple:
+        checkpoint = self._loads(row.type, row.checkpoint)
+        versions = checkpoint["channel_versions"]
+        blobs = session.execute(
+            select(GraphCheckpointBlob.channel, GraphCheckpointBlob.type, GraphCheckpointValue.blob)
+            .join(
+                GraphCheckpointValue,
+                (GraphCheckpointValue.thread_id == GraphCheckpointBlob.thread_id)
+                & (GraphCheckpointValue.digest == GraphCheckpointBlob.digest),
+            )
+            .where(
+                GraphCheckpointBlob.thread_id == row.thread_id,
+                GraphCheckpointBlob.checkpoint_ns == row.checkpoint_ns,
+                tuple_(GraphCheckpointBlob.channel, GraphCheckpointBlob.version).in_(
+                    [(channel, str(version)) for channel, version in versions.items()]
+                ),
+            )
+        )
+        values = {channel: self._loads(type_, blob) for channel, type_, blob in blobs}
+        writes = sorted(
+            session.scalars(
+                select(GraphCheckpointWrite).where(
+                    GraphCheckpointWrite.thread_id == row.thread_id,
+                    GraphCheckpointWrite.checkpoint_ns == row.checkpoint_ns,
+                    GraphCheckpointWrite.checkpoint_id == row.checkpoint_id,
+                )
+            ),
+            key=lambda write: writes_sort_key(write.task_path, write.task_id, write.idx),
+        )
+        configurable = {"thread_id": row.thread_id, "checkpoint_ns": row.checkpoint_ns}
+        return CheckpointTuple(
+            config={"configurable": {**configurable, "checkpoint_id": row.checkpoint_id}},
+            checkpoint={**checkpoint, "channel_values": values},
+            metadata=self._loads(row.meta_type, row.meta),
+            parent_config=(
+                {"configurable": {**configurable, "checkpoint_id": row.parent_checkpoint_id}}
+                if row.parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (write.task_id, write.channel, self._loads(write.type, write.blob)) for write in writes
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        configurable = config["configurable"]
+        query = select(GraphCheckpoint).where(
+            GraphCheckpoint.thread_id == configurable["thread_id"],
+            GraphCheckpoint.checkpoint_ns == configurable.get("checkpoint_ns", ""),
+        )
+        if checkpoint_id := get_checkpoint_id(config):
+            query = query.where(GraphCheckpoint.checkpoint_id == checkpoint_id)
+        with self.Session() as session:
+            # identifiants de checkpoint croissants (uuid6) : le plus grand est le dernier
+            row = session.scalars(query.order_by(GraphCheckpoint.checkpoint_id.desc()).limit(1)).first()
+            return self._tuple(session, row) if row else None
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = select(GraphCheckpoint)
+        if config:
+            configurable = config["configurable"]
+            query = query.where(GraphCheckpoint.thread_id == configurable["thread_id"])
+            if (checkpoint_ns := configurable.get("checkpoint_ns")) is not None:
+                query = query.where(GraphCheckpoint.checkpoint_ns == checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                query = query.where(GraphCheckpoint.checkpoint_id == checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query = query.where(GraphCheckpoint.checkpoint_id < before_id)
+        with self.Session() as session:
+            count = 0
+            for row in session.scalars(query.order_by(GraphCheckpoint.checkpoint_id.desc())).all():
+                item = self._tuple(session, row)
+                if filter and any(item.metadata.get(key) != value for key, value in filter.items()):
+                    continue
+                if limit is not None and count >= limit:
+                    break
+                count += 1
+                yield item
+
+    # écriture
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint = checkpoint.copy()
+        values = checkpoint.pop("channel_values")
+        type_, data = self._dumps(checkpoint)
+        meta_type, meta = self._dumps(get_checkpoint_metadata(config, metadata))
+        with self._lock, self.Session.begin() as session:
+            for channel, version in new_versions.items():
+                blob_type, digest = "empty", None
+                if channel in values:
+                    blob_type, blob = self._dumps(values[channel])
+                    digest = hashlib.blake2b(blob, digest_size=16).hexdigest()
+                    # valeur identique à une version précédente : déjà enregistrée
+                    if not session.get(GraphCheckpointValue, (thread_id, digest)):
+                        session.add(GraphCheckpointValue(thread_id=thread_id, digest=digest, blob=blob))
+                        session.flush()
+                session.merge(
+                    GraphCheckpointBlob(
+                        thread_id=thread_id,
+                        checkpoint_ns=checkpoint_ns,
+                        channel=channel,
+                        version=str(version),
+                        type=blob_type,
+                        digest=digest,
+                    )
+                )
+            session.merge(
+                GraphCheckpoint(
+                    thread_id=thread_id,
+                    checkpoint_ns=checkpoint_ns,
+                    checkpoint_id=checkpoint["id"],
+                    parent_checkpoint_id=config["configurable"].get("checkpoint_id"),
+                    type=type_,
+                    checkpoint=data,
+                    meta_type=meta_type,
+                    meta=meta,
+                )
+            )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        key = {
+            "thread_id": configurable["thread_id"],
+            "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+            "checkpoint_id": configurable["checkpoint_id"],
+            "task_id": task_id,
+        }
+        with self._lock, self.Session.begin() as session:
+            for idx, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, idx)
+                # écritures spéciales (erreur, interruption) : remplacées ; autres : conservées
+                if idx >= 0 and session.get(GraphCheckpointWrite, {**key, "idx": idx}):
+                    continue
+                type_, blob = self._dumps(value)
+                session.merge(
+                    GraphCheckpointWrite(
+                        **key, idx=idx, channel=channel, type=type_, blob=blob, task_path=task_path
+                    )
+                )
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self.Session.begin() as session:
+            for table in TABLES:
+                session.execute(delete(table).where(table.c.thread_id == thread_id))
+
+    def purge_expired(self, ttl_days: float, keep: str | None = None) -> Sequence[str]:
+        """
+        Supprime les exécutions dont le dernier point de reprise (ou résumé) date de plus de
+        ttl_days jours, sauf keep ; rend leurs identifiants
+        """
+        if ttl_days <= 0:
+            return []
+        # dates enregistrées sans fuseau (UTC) par SQLite
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=ttl_days)
+        with self.Session() as session:
+            last_activity: dict[str, datetime] = {}
+            for model in (GraphCheckpoint, SummaryCheckpoint):
+                rows = session.execute(
+                    select(model.thread_id, func.max(model.dt_created)).group_by(model.thread_id)
+                )
+                for thread_id, dt_created in rows:
+                    last_activity[thread_id] = max(dt_created, last_activity.get(thread_id, dt_created))
+        expired = [
+            thread_id
+            for thread_id, dt_created in last_activity.items()
+            if dt_created < cutoff and thread_id != keep
+        ]
+        for thread_id in expired:
+            self.delete_thread(thread_id)
+        return expired
+
+    # résumés article par article
+
+    def load_summaries(self, thread_id: str) -> dict[str, tuple[str | None, str | None]]:
+        """(résumé, statut) déjà générés dans l'exécution, par clé d'article"""
+        with self.Session() as session:
+            rows = session.scalars(
+                select(SummaryCheckpoint).where(SummaryCheckpoint.thread_id == thread_id)
+            )
+            return {row.article_key: (row.summary, row.status) for row in rows}
+
+    def save_summary(self, thread_id: str, key: str, summary: str | None, status: str | None):
+        with self._lock, self.Session.begin() as session:
+            session.merge(
+                SummaryCheckpoint(thread_id=thread_id, article_key=key, summary=summary, status=status)
+            )
+
+
+@lru_cache(maxsize=1)
+def get_checkpointer() -> SQLiteCheckpointSaver:
+    """Checkpointer partagé sur la base de l'application (DB_PATH)"""
+    return SQLiteCheckpointSaver()
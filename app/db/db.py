@@ -1,7 +1,7 @@
 import os
 import logging
 from sqlalchemy import create_engine, select, text
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Text, DateTime, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -61,6 +61,8 @@ class Article(Base):
         default=SourceType.RSS,  # Optionnel : valeur par défaut
         index=True,  # Optionnel : index pour les requêtes
     )
+    # quasi-doublons regroupés sous cet article : [{"title", "link", "source"}]
+    also_covered_by = Column(JSON, nullable=True)
 
 
 # Evènement pour màj de dt_updated - /!\ après la déclaration du modèle
@@ -69,6 +71,73 @@ def update_timestamp(mapper, connection, target):
     target.dt_updated = datetime.now(timezone.utc)
 
 
+class BlueskyQueuedPost(Base):
+    """File d'attente locale des posts Bluesky reçus en continu (Jetstream)"""
+
+    __tablename__ = "bluesky_stream_queue"
+    id = Column(Integer, primary_key=True)
+    dt_created = Column(
+        DateTime,
+        server_default=func.now(),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    uri = Column(String, nullable=False, unique=True)  # at://did/collection/rkey
+    published = Column(String, nullable=False, index=True)
+    payload = Column(JSON, nullable=False)  # article au format unifié
+    # exécution (run_id) qui a lu le post : supprimé quand elle a enregistré ses résumés
+    claimed_by = Column(String, nullable=True)
+
+
+class StreamCursor(Base):
+    """Dernière position lue d'un flux d'évènements (time_us Jetstream)"""
+
+    __tablename__ = "stream_cursors"
+    name = Column(String, primary_key=True)
+    cursor = Column(BigInteger, nullable=False)
+    dt_updated = Column(
+        DateTime,
+        onupdate=lambda: datetime.now(timezone.utc),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+class SourceSchedule(Base):
+    """Planification adaptative du polling par source (fréquence de publication apprise)"""
+
+    __tablename__ = "source_schedules"
+    source_key = Column(String, primary_key=True)  # "<type>:<url>"
+    source_type = Column(SQLAlchemyEnum(SourceType), nullable=False, index=True)
+    last_polled = Column(DateTime, nullable=True)
+    next_due = Column(DateTime, nullable=True, index=True)
+    interval_hours = Column(Float, nullable=False)  # intervalle estimé entre 2 publications
+    last_published = Column(String, nullable=True)  # article le plus récent déjà vu
+    polls = Column(Integer, nullable=False, default=0)
+    polls_with_news = Column(Integer, nullable=False, default=0)
+
+
+class SourceHealth(Base):
+    """Santé d'une source : latence, erreurs, volume transféré, état du disjoncteur"""
+
+    __tablename__ = "source_health"
+    source_key = Column(String, primary_key=True)  # "<type>:<url>"
+    source_type = Column(SQLAlchemyEnum(SourceType), nullable=False, index=True)
+    name = Column(String, nullable=True)
+    last_attempt = Column(DateTime, nullable=True)
+    last_success = Column(DateTime, nullable=True)
+    last_latency_ms = Column(Float, nullable=True)
+    avg_latency_ms = Column(Float, nullable=True)  # moyenne mobile
+    last_bytes = Column(Integer, nullable=True)
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    last_error_class = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    consecutive_failures = Column(Integer, nullable=False, default=0)
+    total_failures = Column(Integer, nullable=False, default=0)
+    total_successes = Column(Integer, nullable=False, default=0)
+    open_until = Column(DateTime, nullable=True)  # disjoncteur ouvert jusqu'à
+
+
 class ArticleFTS:
     """Modèle pour la table FTS5 Full Text Search"""
 
@@ -206,6 +275,7 @@ class ArticleFTS:
         base_sql += f"""
             )
             SELECT 
+                a.id as id,
                 ranked.title as title, 
                 ranked.content as content,  
                 a.link as link,
@@ -319,9 +389,46 @@ async_engine = create_async_engine(
     # echo=True,  # Affiche les requêtes SQL (optionnel, pour le debug))    
 )
 
+# colonnes ajoutées après la création initiale des tables
+ADDED_COLUMNS = {
+    "articles": {"also_covered_by": "JSON"},
+    "bluesky_stream_queue": {"claimed_by": "VARCHAR"},
+}
+
+
+def pending_migrations(engine) -> dict[str, dict[str, str]]:
+    """Colonnes de ADDED_COLUMNS absentes de la base, par table"""
+    from sqlalchemy import inspect
+
+    inspector = inspect(engine)
+    pending = {}
+    for table, columns in ADDED_COLUMNS.items():
+        if not inspector.has_table(table):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        missing = {name: ddl for name, ddl in columns.items() if name not in existing}
+        if missing:
+            pending[table] = missing
+    return pending
+
+
+def migrate_tables(engine):
+    """
+    Ajoute aux bases existantes les colonnes manquantes des tables.
+    Exécutée par l'agent (init_db) uniquement : plusieurs workers web en parallèle se
+    disputeraient le même ALTER TABLE.
+    """
+    with engine.begin() as conn:
+        for table, columns in pending_migrations(engine).items():
+            for name, ddl_type in columns.items():
+                logger.info(f"Migration : ajout de la colonne {table}.{name}")
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl_type}"))
+
+
 def init_db():
     """Initialise la base de données SQLite."""
     Base.metadata.create_all(engine)
+    migrate_tables(engine)
     ArticleFTS.init_table(engine)
     print("Table 'articles' initialisée avec succès !")
 
@@ -390,18 +497,23 @@ def _validate_and_get_articles_summaries(summaries):
     return articles_data
 
 
-def save_to_db(summaries: list[dict]):
+def save_to_db(summaries: list[dict]) -> list[dict]:
     """
     Sauvegarde les articles en base avec validation Pydantic avec insertion en bulk.
     Les articles n'ayant pas déjà été insérés le sont : filtre sur titre et date
+    Les embeddings des articles insérés sont ajoutés à l'index des articles (détection de nouveauté).
 
     Args:
         summaries: Liste de articles à insérer
 
+    Returns:
+        Les articles insérés, avec leur id
+
     Raises:
         ValueError: Si la validation Pydantic échoue
         Exception: Pour les erreurs de base de données
     """
+    articles_data = []
     with get_db() as session:
         try:
             existing = session.query(Article.title, Article.published).all()
@@ -414,12 +526,23 @@ def save_to_db(summaries: list[dict]):
             if new_articles:
                 logger.info(f"Nombre de nouveaux articles {len(new_articles)}")
                 articles_data = _validate_and_get_articles_summaries(new_articles)
-                session.bulk_insert_mappings(Article, articles_data)
+                # return_defaults : les ids générés sont reportés dans articles_data
+                session.bulk_insert_mappings(Article, articles_data, return_defaults=True)
                 session.commit()
         except Exception as e:
             session.rollback()
             raise e
 
+    if articles_data:
+        from app.services.vector_store import index_saved_articles
+
+        try:
+            index_saved_articles(articles_data)
+        except Exception as e:
+            # l'index n'est qu'un complément : la sauvegarde ne doit pas échouer pour autant
+            logger.error(f"Indexation des embeddings impossible : {e}")
+    return articles_data
+
 
 def search_fts(keywords: str):
     with get_db() as session:
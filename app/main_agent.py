@@ -14,6 +14,14 @@ Framework : LangGraph pour le graphe des actions (noeuds)
 
 Usage :
     python -m app [--debug]
+    python -m app --init-db         # création des tables et migration de la base, seules
+    python -m app --resume <run_id>  # reprise d'une exécution interrompue au dernier noeud terminé
+    python -m app --daemon          # exécutions planifiées, modèles gardés en mémoire
+    python -m app --bluesky-stream  # ingestion Bluesky continue (Jetstream)
+    python -m app --health-report   # sources lentes ou en échec
+    python -m app --reindex-articles  # embeddings des articles sauvegardés (recherche sémantique)
+    python -m app --tune-embeddings   # réglages embeddings de l'hôte (modèle, lots, threads, device)
+    python -m app --llm-stub          # serveur LLM factice compatible OpenAI (benchmarks)
 
 Ollama doit être exécuté en local avec le modèle pullé, ou tout autre serveur LLM
 """
@@ -32,11 +40,15 @@ from .models.states import RSSState
 from .services.utils_fetchers import register_fetchers_auto
 from .services.models import SourceType, UnifiedState
 
-from .core import get_environment_variable
+from .core import get_environment_variable, is_env_enabled
 from .core.logger import logger
 
 from .nodes import (
     filter_node,
+    novelty_node,
+    is_novelty_filter_enabled,
+    topic_cluster_node,
+    is_topic_clustering_enabled,
     summarize_node,
     output_node,
     save_articles_node,
@@ -98,14 +110,11 @@ BLUESKY_FETCH = True
 
 
 def which_fetcher():
-    do_rss = get_environment_variable("RSS_FETCH", "1")
-    RSS_FETCH = do_rss.lower() in ("1", "true", "yes", "on", "oui")
+    RSS_FETCH = is_env_enabled("RSS_FETCH", True)
     logger.info(Fore.BLUE + f"RSS_FETCH : {RSS_FETCH}")
-    do_reddit = get_environment_variable("REDDIT_FETCH", "1")
-    REDDIT_FETCH = do_reddit.lower() in ("1", "true", "yes", "on", "oui")
+    REDDIT_FETCH = is_env_enabled("REDDIT_FETCH", True)
     logger.info(Fore.BLUE + f"REDDIT_FETCH : {REDDIT_FETCH}")
-    do_bluesky = get_environment_variable("BLUESKY_FETCH", "1")
-    BLUESKY_FETCH = do_bluesky.lower() in ("1", "true", "yes", "on", "oui")
+    BLUESKY_FETCH = is_env_enabled("BLUESKY_FETCH", True)
     logger.info(Fore.BLUE + f"BLUESKY_FETCH : {BLUESKY_FETCH}")
     return RSS_FETCH, REDDIT_FETCH, BLUESKY_FETCH
 
@@ -217,6 +226,12 @@ def make_graph():
     graph.add_node("merge_articles", RunnableLambda(merge_fetched_articles))
 
     graph.add_node("filter", RunnableLambda(filter_node))
+    NOVELTY_FILTER = is_novelty_filter_enabled()
+    if NOVELTY_FILTER:
+        graph.add_node("novelty", RunnableLambda(novelty_node))
+    TOPIC_CLUSTERING = is_topic_clustering_enabled()
+    if TOPIC_CLUSTERING:
+        graph.add_node("cluster_topics", RunnableLambda(topic_cluster_node))
     graph.add_node("summarize", RunnableLambda(summarize_node))
     graph.add_node("displayoutput", RunnableLambda(create_legacy_wrapper(output_node)))
     graph.add_node(
@@ -248,12 +263,59 @@ def make_graph():
     # on fusionne le tout
     graph.add_edge("merge_articles", "filter")
 
-    graph.add_edge("filter", "summarize")
+    # étapes optionnelles entre filtre et résumé :
+    # articles déjà couverts écartés (novelty), puis un résumé par sujet (cluster_topics)
+    steps = ["filter"]
+    if NOVELTY_FILTER:
+        steps.append("novelty")
+    if TOPIC_CLUSTERING:
+        steps.append("cluster_topics")
+    steps.append("summarize")
+    for source_node, target_node in zip(steps, steps[1:]):
+        graph.add_edge(source_node, target_node)
     graph.add_edge("summarize", "displayoutput")
     graph.add_edge("displayoutput", "savedbsummaries")
     graph.add_edge("savedbsummaries", "sendsummaries")
 
-    return graph.compile()
+    # points de reprise après chaque noeud dans la base SQLite (--resume <run_id>)
+    from app.db.checkpoint import get_checkpointer, is_checkpoint_enabled
+
+    checkpointer = get_checkpointer() if is_checkpoint_enabled() else None
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run_graph(agent, initial_state: UnifiedState, resume: str | None = None):
+    """
+    Exécution du graphe sous un identifiant (thread_id des points de reprise). Avec resume,
+    l'exécution interrompue repart du dernier noeud terminé. Une exécution terminée efface
+    ses points de reprise, ceux des exécutions en échec sont purgés après
+    GRAPH_CHECKPOINT_TTL_DAYS jours.
+    """
+    import uuid
+    from datetime import datetime
+
+    from app.db.checkpoint import checkpoint_ttl_days, run_config
+
+    # suffixe aléatoire : deux exécutions lancées dans la même seconde (démon) restent distinctes
+    run_id = resume or f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+    config = run_config(run_id)
+    if agent.checkpointer is not None:
+        expired = agent.checkpointer.purge_expired(checkpoint_ttl_days(), keep=resume)
+        if expired:
+            logger.info(Fore.CYAN + f"Points de reprise expirés supprimés : {', '.join(expired)}")
+    if resume:
+        next_nodes = agent.get_state(config).next if agent.checkpointer is not None else ()
+        if not next_nodes:
+            logger.error(Fore.RED + f"Aucune exécution interrompue {run_id} à reprendre")
+            return
+        logger.info(Fore.CYAN + f"Reprise de l'exécution {run_id} à {', '.join(next_nodes)}")
+        agent.invoke(None, config)
+    else:
+        if agent.checkpointer is not None:
+            logger.info(Fore.CYAN + f"Exécution {run_id} (après un arrêt : python -m app --resume {run_id})")
+        agent.invoke(initial_state, config)
+    if agent.checkpointer is not None:
+        agent.checkpointer.delete_thread(run_id)
 
 
 def _show_graph(graph):
@@ -291,10 +353,12 @@ def _show_graph(graph):
 
 
 def prepare_data():
+    # relu à chaque exécution : FILTER_KEYWORDS modifié est pris en compte en mode démon
+    keywords = get_environment_variable("FILTER_KEYWORDS", "").split(",")
     initial_state = UnifiedState(
         sources=[],
-        keywords=FILTER_KEYWORDS
-        if FILTER_KEYWORDS != [""]
+        keywords=keywords
+        if keywords != [""]
         else ["intelligence artificielle", "IA", "cybersécurité", "alerte sécurité"],
     )
     return initial_state
@@ -316,6 +380,45 @@ def main():
     logger.info(Fore.YELLOW + f"Initialisation DB")
     init_db()
 
+    if args.init_db:
+        return
+
+    if args.health_report:
+        from app.services.source_health import print_health_report
+
+        print_health_report()
+        return
+
+    if args.reindex_articles:
+        from app.services.semantic_search import reindex_articles
+
+        logger.info(Fore.CYAN + f"{reindex_articles()} articles ajoutés à l'index")
+        return
+
+    if args.tune_embeddings:
+        from app.services.embedding_tuning import tune_embeddings
+
+        tune_embeddings(args)
+        return
+
+    if args.llm_stub:
+        from app.services.llm_stub import run_llm_stub
+
+        run_llm_stub()
+        return
+
+    if args.bluesky_stream:
+        from app.services.bluesky_jetstream import run_bluesky_stream
+
+        run_bluesky_stream()
+        return
+
+    if args.daemon:
+        from app.services.daemon import run_daemon
+
+        run_daemon(make_graph, prepare_data, run_graph)
+        return
+
     initial_state = prepare_data()
 
     agent = make_graph()
@@ -325,7 +428,7 @@ def main():
         logger.info(f"🤖 LangGraph déroulera cet automate...")
         _show_graph(agent)
 
-    agent.invoke(initial_state)
+    run_graph(agent, initial_state, resume=args.resume)
 
 
 def search():
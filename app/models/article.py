@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 from app.services.models import SourceType
@@ -12,6 +14,8 @@ class ArticleModel(BaseModel):
     score: str  # ou float/int ?
     published: str
     source: SourceType
+    # quasi-doublons regroupés : [{"title", "link", "source"}]
+    also_covered_by: Optional[list[dict]] = None
 
     # class Config:
     #     from_attributes = True  # Utile utilisation ORM mode plus tard
@@ -6,6 +6,8 @@ from .fetch_nodes import (
     merge_fetched_articles,
 )
 from .filter_nodes import filter_node
+from .novelty_nodes import novelty_node, is_novelty_filter_enabled
+from .cluster_nodes import topic_cluster_node, is_topic_clustering_enabled
 from .summarize_nodes import summarize_node
 from .output_nodes import output_node
 from .save_nodes import save_articles_node
@@ -18,6 +20,10 @@ __all__ = [
     "fetch_bluesky_node",
     "merge_fetched_articles",
     "filter_node",
+    "novelty_node",
+    "is_novelty_filter_enabled",
+    "topic_cluster_node",
+    "is_topic_clustering_enabled",
     "summarize_node",
     "output_node",
     "save_articles_node",
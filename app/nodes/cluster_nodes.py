@@ -0,0 +1,39 @@
+import logging
+
+logging.basicConfig(level=logging.INFO)
+from colorama import Fore
+
+from app.core.logger import logger, count_by_type_articles
+from app.core.utils import measure_time, get_environment_variable, is_env_enabled
+from app.services.embeddings import encode_articles
+from app.services.models import UnifiedState
+from app.services.topic_clustering import group_articles_by_topic
+
+
+def is_topic_clustering_enabled() -> bool:
+    return is_env_enabled("TOPIC_CLUSTERING", False)
+
+
+@measure_time
+def topic_cluster_node(state: UnifiedState) -> UnifiedState:
+    """Regroupe par sujet les articles filtrés : un résumé multi-sources par sujet"""
+    threshold = float(get_environment_variable("TOPIC_CLUSTER_THRESHOLD", "0.75"))
+    max_articles = int(get_environment_variable("TOPIC_CLUSTER_MAX_ARTICLES", "5"))
+    articles = state.filtered_articles or []
+
+    # embeddings du filtre sémantique (cache), pas de ré-encodage
+    topics = group_articles_by_topic(
+        articles, encode_articles(articles), threshold, max_articles
+    )
+    for topic in topics:
+        if topic.get("topic_members"):
+            logger.info(
+                Fore.LIGHTBLUE_EX
+                + f"Sujet « {topic['title']} » : {len(topic['also_covered_by']) + 1} articles"
+            )
+    logger.info(
+        f"🧩 {len(articles)} articles regroupés en {len(topics)} sujets (seuil={threshold})"
+    )
+    count_by_type_articles("Nombre de sujets par source du représentant", topics)
+
+    return state.model_copy(update={"filtered_articles": topics})
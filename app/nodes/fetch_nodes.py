@@ -2,11 +2,13 @@ from functools import lru_cache
 from colorama import Fore
 import time
 
+from app.services.dedup import dedup_fetched_articles, is_dedup_enabled
 from app.services.factory_fetcher import FetcherFactory
+from app.services.near_dup import collapse_fetched_articles, is_near_dup_enabled
 from app.services.models import Source, SourceType, UnifiedState
 from app.core.logger import logger
 from app.core.logger import print_color
-from app.core.utils import get_environment_variable
+from app.core.utils import get_environment_variable, is_env_enabled
 from .utils_fetch_nodes import (
     fetch_articles,
     get_rss_urls,
@@ -19,15 +21,13 @@ import logging
 
 logging.basicConfig(level=logging.INFO)
 
-MAX_DAYS = int(get_environment_variable("MAX_DAYS", "10"))
-
 
 def fetch_rss_node(state: UnifiedState) -> dict:
     """fetch des flux RSS"""
     start = time.time()
     logger.info(f"🔵 RSS fetch START at {start}")
 
-    fetcher_rss = FetcherFactory.create_fetcher(SourceType.RSS)
+    fetcher_rss = FetcherFactory.get_fetcher(SourceType.RSS)
     sources_urls = get_rss_urls()
     all_articles = fetch_articles(fetcher_rss, sources_urls)
 
@@ -43,7 +43,7 @@ def fetch_reddit_node(state: UnifiedState) -> dict:
     REDDIT_CLIENT_ID = get_environment_variable("REDDIT_CLIENT_ID", None)
     REDDIT_CLIENT_SECRET = get_environment_variable("REDDIT_CLIENT_SECRET", None)
 
-    fetcher_reddit = FetcherFactory.create_fetcher(
+    fetcher_reddit = FetcherFactory.get_fetcher(
         SourceType.REDDIT,
         client_id=REDDIT_CLIENT_ID,
         client_secret=REDDIT_CLIENT_SECRET,
@@ -66,12 +66,22 @@ def fetch_reddit_node(state: UnifiedState) -> dict:
 
 
 def fetch_bluesky_node(state: UnifiedState) -> dict:
+    if is_env_enabled("BLUESKY_STREAM", False):
+        # ingestion continue (python -m app --bluesky-stream) : lecture locale uniquement
+        from app.services.bluesky_jetstream import BlueskyStreamQueue
+
+        all_articles = BlueskyStreamQueue().drain(int(get_environment_variable("MAX_DAYS", "10")))
+        logger.info(
+            Fore.CYAN + f"fetcher_bluesky_node : {len(all_articles)} articles Bluesky (file Jetstream)"
+        )
+        return {"bluesky_articles": all_articles}
+
     BLUESKY_HANDLE = get_environment_variable(
         "BLUESKY_HANDLE", "your_bluesky_handle.bsky.social"
     )
     BLUESKY_PASSWORD = get_environment_variable("BLUESKY_PASSWORD", "app_password")
 
-    fetcher_bluesky = FetcherFactory.create_fetcher(
+    fetcher_bluesky = FetcherFactory.get_fetcher(
         SourceType.BLUESKY, handle=BLUESKY_HANDLE, password=BLUESKY_PASSWORD
     )
     start = time.time()
@@ -126,16 +136,12 @@ def merge_fetched_articles(state: UnifiedState) -> dict:
     print_color(color, f"merge_fetched_articles {source_counts}")
     print_color(color, "=" * 60)
 
-    # Déduplique si nécessaire
-    # seen_urls = set()
-    # unique_articles = []
-    # for article in all_articles:
-    #     url = article.get("url")
-    #     if url and url not in seen_urls:
-    #         seen_urls.add(url)
-    #         unique_articles.append(article)
-
-    # logger.info(f"merge des articles : {unique_articles}")
-    # return state.model_copy(update={"articles": unique_articles})
+    # Déduplique : URL canoniques (link, external_url) et empreinte du contenu
+    if is_dedup_enabled():
+        all_articles = dedup_fetched_articles(all_articles)
+    # Regroupe les quasi-doublons : seul le représentant sera embeddé et résumé
+    if is_near_dup_enabled():
+        all_articles = collapse_fetched_articles(all_articles)
+
     logger.info(f"merge des articles : {len(all_articles)}")
     return state.model_copy(update={"articles": all_articles})
@@ -1,5 +1,9 @@
+import json
 import os
 import logging
+from collections import Counter
+
+import numpy as np
 
 logging.basicConfig(level=logging.INFO)
 from colorama import Fore
@@ -9,11 +13,36 @@ from app.services.models import UnifiedState
 from app.core.utils import measure_time, get_environment_variable
 from app.core.logger import count_by_type_articles
 from app.services.model_service import init_sentence_model
+from app.services.embeddings import article_text, encode_article_chunks
+from app.services.embedding_backends import get_embedding_backend
+from app.services.embedding_tuning import DEFAULT_MODEL_EMBEDDINGS, embedding_setting
+from app.services.lexical_filter import cascade_split, is_cascade_filter_enabled
+
+DEFAULT_FAISS_INDEX_PATH = "data/keywords_index.faiss"
+
+def _index_meta(meta_path: str) -> dict | None:
+    """Mots-clés, modèle et dimension avec lesquels l'index FAISS a été construit (None : inconnus)"""
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _max_pooled_keyword_search(index, chunks: list[np.ndarray], k: int):
+    """
+    Comme index.search sur un vecteur par article, mais la similarité d'un article à un
+    mot-clé est la meilleure de ses fenêtres (EMBEDDING_TEXT_MODE=chunks).
+    """
+    similarities, indices = index.search(np.vstack(chunks), k=index.ntotal)
+    # similarités remises dans l'ordre des mots-clés, puis maximum par article
+    by_keyword = np.full(similarities.shape, -np.inf, dtype=np.float32)
+    np.put_along_axis(by_keyword, indices, similarities, axis=1)
+    starts = np.cumsum([0] + [len(c) for c in chunks[:-1]])
+    pooled = np.maximum.reduceat(by_keyword, starts, axis=0)
+    order = np.argsort(-pooled, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(pooled, order, axis=1), order
 
-THRESHOLD_SEMANTIC_SEARCH = float(
-    get_environment_variable("THRESHOLD_SEMANTIC_SEARCH", "0.5")
-)
-FAISS_INDEX_PATH = get_environment_variable("FAISS_INDEX_PATH", "data/keywords_index.faiss")
 
 @measure_time
 def _filter_articles_with_faiss(
@@ -33,7 +62,7 @@ def _filter_articles_with_faiss(
     import faiss
     
     if not index_path:
-        index_path = FAISS_INDEX_PATH
+        index_path = get_environment_variable("FAISS_INDEX_PATH", DEFAULT_FAISS_INDEX_PATH)
 
     model = init_sentence_model()
 
@@ -42,7 +71,16 @@ def _filter_articles_with_faiss(
 
     @measure_time
     def get_or_create_index(keywords, model, index_path):
-        if os.path.exists(index_path):
+        # réglages de l'index enregistrés à côté : FILTER_KEYWORDS, modèle d'embeddings
+        # (autre dimension après --tune-embeddings) ou backend modifiés -> index reconstruit
+        meta_path = f"{index_path}.meta.json"
+        meta = {
+            "keywords": list(keywords),
+            "model": embedding_setting("MODEL_EMBEDDINGS", DEFAULT_MODEL_EMBEDDINGS),
+            "dim": model.get_sentence_embedding_dimension(),
+            "backend": get_embedding_backend(),
+        }
+        if os.path.exists(index_path) and _index_meta(meta_path) == meta:
             logger.info("🔍 Chargement de l'index FAISS existant...")
             return faiss.read_index(index_path)
         else:
@@ -58,47 +96,70 @@ def _filter_articles_with_faiss(
             index.add(keyword_embeddings)
 
             faiss.write_index(index, index_path)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
             return index
 
     # Créer un index FAISS pour le produit scalaire (similarité cosinus)
     index = get_or_create_index(keywords, model, index_path)
 
+    # embeddings calculés en un seul lot et conservés pour les étapes suivantes
+    candidates = [article for article in articles if article_text(article)]
     filtered = []
-    for article in articles:
-        text = f"{article['title']} {article['summary']}".strip()
-        if not text:
-            continue
-        # cleaned_text = preprocess_text(text)
-
-        article_embedding = model.encode(
-            [text], convert_to_tensor=True, show_progress_bar=False
+    if is_cascade_filter_enabled():
+        # palier lexical : seuls les articles ambigus passent par le modèle d'embeddings
+        filtered, candidates, rejected = cascade_split(candidates, keywords, threshold)
+        logger.info(
+            Fore.CYAN
+            + f"Filtre en cascade : {len(filtered)} acceptés et {len(rejected)} rejetés par le palier lexical, "
+            f"{len(candidates)} ambigus envoyés aux embeddings"
         )
-        article_embedding = article_embedding.cpu().numpy()
-        faiss.normalize_L2(article_embedding)  # Normaliser l'embedding de l'article
-
-        # Recherche
-        similarities, indices = index.search(
-            article_embedding, k=len(keywords)
-        )  # k = top N mot-clé le plus proche
-        max_similarity = similarities[0].max()  # La similarité est déjà entre 0 et 1
+        for article in filtered:
+            logger.debug(
+                f"Palier lexical : accepté (score={article['lexical_score']}, mots-clés: "
+                f"{article['matched_keywords']}): {article['title']}"
+            )
+    if not candidates:
+        all_similarities = np.empty((0, len(keywords)), dtype=np.float32)
+        all_indices = np.empty((0, len(keywords)), dtype=np.int64)
+    else:
+        _, candidates_chunks = encode_article_chunks(candidates, model)
+        all_similarities, all_indices = _max_pooled_keyword_search(
+            index, candidates_chunks, k=len(keywords)
+        )
+    for article, similarities, indices in zip(
+        candidates, all_similarities, all_indices
+    ):
+        max_similarity = similarities.max()  # La similarité est déjà entre 0 et 1
 
         if max_similarity >= threshold:
             matched_keywords = [
-                keywords[i] for i in indices[0] if similarities[0][i] >= threshold
+                keywords[i] for i in indices if similarities[i] >= threshold
             ]
             # logger.info(
-            #     f"Similarities: {similarities[0]}, Indices: {indices[0]}"
+            #     f"Similarities: {similarities}, Indices: {indices}"
             # )
             logger.info(
                 f"✅ Article retenu (sim={max_similarity:.2f}, mots-clés: {matched_keywords}): {article['title']} {article['link']}"
             )
             article["score"] = f"{max_similarity * 100:.1f}"
+            article["filter_tier"] = "embedding"
             logger.info(
                 Fore.CYAN
                 + f"{article['title']} {article['source']} -> {article['score']}"
             )
             filtered.append(article)
 
+    if is_cascade_filter_enabled() and candidates:
+        # scores lexicaux de la zone ambiguë selon la décision des embeddings : réglage des bandes
+        kept = Counter(a["lexical_score"] for a in candidates if a.get("filter_tier") == "embedding")
+        dropped = Counter(a["lexical_score"] for a in candidates if a.get("filter_tier") != "embedding")
+        logger.info(
+            Fore.CYAN
+            + f"Palier embeddings : {sum(kept.values())}/{len(candidates)} ambigus retenus, "
+            f"scores lexicaux retenus {dict(sorted(kept.items()))}, écartés {dict(sorted(dropped.items()))}"
+        )
+
     logger.info(
         f"📊 {len(filtered)}/{len(articles)} articles après filtrage sémantique (seuil={threshold})"
     )
@@ -108,8 +169,11 @@ def _filter_articles_with_faiss(
 def filter_node(state: UnifiedState) -> UnifiedState:
     logger.info("🔍 Filtrage des articles par mots-clés...")
 
+    # réglages lus à chaque exécution (relus par le démon quand .env change)
     filtered = _filter_articles_with_faiss(
-        state.articles, state.keywords, threshold=THRESHOLD_SEMANTIC_SEARCH
+        state.articles,
+        state.keywords,
+        threshold=float(get_environment_variable("THRESHOLD_SEMANTIC_SEARCH", "0.5")),
     )
     logger.info(f"{len(filtered)} articles correspondent aux mots-clés (sémantique)")
     count_by_type_articles("Nombre d'articles filtrés par sources", filtered)  # OK
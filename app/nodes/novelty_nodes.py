@@ -0,0 +1,74 @@
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+from colorama import Fore
+
+from app.core.logger import logger, count_by_type_articles
+from app.core.utils import measure_time, get_environment_variable, is_env_enabled
+from app.services.embeddings import encode_articles
+from app.services.models import UnifiedState
+from app.services.vector_store import ArticleVectorStore
+
+
+def is_novelty_filter_enabled() -> bool:
+    return is_env_enabled("NOVELTY_FILTER", False)
+
+
+@measure_time
+def _split_already_covered(
+    articles: list[dict],
+    store: ArticleVectorStore,
+    threshold: float,
+    days: float,
+    now: float | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Sépare les articles nouveaux de ceux trop proches d'un article sauvegardé ces
+    `days` derniers jours (similarité cosinus >= threshold).
+    Les embeddings sont ceux calculés par le filtre sémantique (cache).
+    """
+    if not articles or not len(store):
+        return articles, []
+    if not store.is_compatible():
+        logger.warning(
+            Fore.YELLOW
+            + "Index des articles construit avec un autre modèle d'embeddings, filtre de nouveauté ignoré"
+        )
+        return articles, []
+
+    since = (now or time.time()) - days * 86400
+    similarities, ids = store.max_similarity_since(encode_articles(articles), since)
+    fresh, covered = [], []
+    for article, similarity, article_id in zip(articles, similarities, ids):
+        if article_id >= 0 and similarity >= threshold:
+            article["already_covered"] = {
+                "article_id": int(article_id),
+                "similarity": round(float(similarity), 3),
+            }
+            logger.info(
+                Fore.LIGHTBLACK_EX
+                + f"Déjà couvert (sim={similarity:.2f}, article #{article_id}) : {article['title']}"
+            )
+            covered.append(article)
+        else:
+            fresh.append(article)
+    return fresh, covered
+
+
+def novelty_node(state: UnifiedState) -> UnifiedState:
+    """Écarte avant résumé les articles déjà couverts par un article sauvegardé récemment"""
+    threshold = float(get_environment_variable("NOVELTY_THRESHOLD", "0.9"))
+    days = float(get_environment_variable("NOVELTY_DAYS", "7"))
+    logger.info(
+        f"🆕 Filtre de nouveauté (seuil={threshold}, sur {days:g} jours)..."
+    )
+    fresh, covered = _split_already_covered(
+        state.filtered_articles or [], ArticleVectorStore(), threshold, days
+    )
+    logger.info(
+        f"{len(covered)} articles déjà couverts écartés, {len(fresh)} articles nouveaux"
+    )
+    count_by_type_articles("Nombre d'articles nouveaux par sources", fresh)
+
+    return state.model_copy(update={"filtered_articles": fresh})
@@ -2,13 +2,20 @@ import logging
 
 logging.basicConfig(level=logging.INFO)
 from colorama import Fore
+from langchain_core.runnables import RunnableConfig
 from app.core.logger import logger
 from app.models.states import RSSState
 from app.db import save_to_db
 
 
-def save_articles_node(state: RSSState) -> RSSState:
+def save_articles_node(state: RSSState, config: RunnableConfig | None = None) -> RSSState:
     logger.info(Fore.LIGHTWHITE_EX + "Sauvegarde des articles résumés en DB")
     if len(state.summaries) > 0:
         save_to_db(state.summaries)
+    # les posts Bluesky lus dans la file Jetstream ne sont supprimés qu'une fois enregistrés
+    run_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    if run_id:
+        from app.services.bluesky_jetstream import BlueskyStreamQueue
+
+        BlueskyStreamQueue().release(run_id)
     return state
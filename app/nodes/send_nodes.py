@@ -8,9 +8,6 @@ from app.models.states import RSSState
 from app.models.emails import EmailTemplateParams
 
 load_dotenv()
-THRESHOLD_SEMANTIC_SEARCH = float(
-    get_environment_variable("THRESHOLD_SEMANTIC_SEARCH", "0.5")
-)
 
 
 def send_articles_node(state: RSSState) -> RSSState:
@@ -22,7 +19,7 @@ def send_articles_node(state: RSSState) -> RSSState:
         _params_mail = EmailTemplateParams(
             articles=state.summaries,
             keywords=state.keywords,
-            threshold=THRESHOLD_SEMANTIC_SEARCH,
+            threshold=float(get_environment_variable("THRESHOLD_SEMANTIC_SEARCH", "0.5")),
         )
         send_watch_articles(_params_mail)
     return state
@@ -1,16 +1,49 @@
 import logging
+import time
+from functools import partial
 
 logging.basicConfig(level=logging.INFO)
 from colorama import Fore
 
+from langchain_core.runnables import RunnableConfig
+
 from app.core.logger import logger
 from app.services.models import UnifiedState
 from app.core.utils import measure_time, get_environment_variable  # , argscli
-from app.services.model_service import set_prompt
+from app.services.model_service import set_prompt, set_topic_prompt, set_batch_prompt
 from app.services.sources_ponderation import select_articles_for_summary
 from app.core.logger import count_by_type_articles
-from app.services.model_service import init_llm_chat
+from app.services.model_service import init_llm_chat, init_small_llm_chat
 from app.core.utils import configure_logging_from_args
+from app.services.compression import (
+    CompressionStats,
+    ExtractiveCompressor,
+    is_compression_enabled,
+)
+from app.services.llm_cascade import LLMCascade, is_llm_cascade_enabled
+from app.services.adaptive_concurrency import (
+    get_concurrency_controller,
+    llm_concurrency_max,
+    llm_retries,
+    run_adaptive,
+)
+from app.services.batch_summary import (
+    BatchStats,
+    batch_max_tokens,
+    batch_size,
+    is_batch_summary_enabled,
+    parse_batch_response,
+    short_batches,
+)
+from app.services.generation_budget import (
+    STATUS_COMPLETE,
+    STATUS_EXTRACTIVE,
+    GenerationTimeout,
+    SummaryBudget,
+    extractive_summary,
+    fallback_summary,
+    stream_with_deadline,
+)
 
 
 def _calculate_tokens(summary, elapsed):
@@ -24,11 +57,45 @@ def _calculate_tokens(summary, elapsed):
     )
 
 
+THEME = "IA, ingénieurie logicielle et cybersécurité"
+
+
+@measure_time
+def _summarize_article(title, content, llm=None, deadline=None):
+    prompt = set_prompt(THEME, title, content)
+    return _invoke_summary(prompt, llm, deadline)
+
+
 @measure_time
-def _summarize_article(title, content):
+def _summarize_topic(articles: list[dict], deadline=None):
+    """Un seul résumé pour les articles d'un même sujet (regroupement par sujet)"""
+    prompt = set_topic_prompt(THEME, articles)
+    return _invoke_summary(prompt, deadline=deadline)
+
+
+@measure_time
+def _summarize_batch(articles: list[dict], llm=None, deadline=None) -> dict[int, str]:
+    """
+    Résumés de plusieurs contenus courts en un appel (réponse JSON), par position dans
+    articles ; seuls les résumés valides sont rendus
+    """
+    items = [(i, article["title"], article["summary"]) for i, article in enumerate(articles, start=1)]
+    try:
+        response = _invoke_summary(set_batch_prompt(THEME, items), llm, deadline)
+    except GenerationTimeout as e:
+        # réponse tronquée à l'échéance : objets complets gardés
+        response = e.partial
+    parsed = parse_batch_response(response, set(range(1, len(articles) + 1)))
+    return {i - 1: summary for i, summary in parsed.items()}
+
+
+def _invoke_summary(prompt, llm=None, deadline=None):
+    """
+    Résumé par le LLM ; avec une échéance (secondes), génération en flux interrompue par
+    GenerationTimeout (sortie partielle jointe)
+    """
     import time
 
-    prompt = set_prompt("IA, ingénieurie logicielle et cybersécurité", title, content)
     _, args = configure_logging_from_args()
     if args.debug:
         logger.debug(
@@ -40,9 +107,13 @@ def _summarize_article(title, content):
         start = time.time()
 
     # Appel au LLM
-    llm = init_llm_chat()
-    result = llm.invoke(prompt)
-    summary = result.content.strip().strip('"').strip()
+    llm = llm or init_llm_chat()
+    if deadline is None:
+        result = llm.invoke(prompt)
+        raw = result.content
+    else:
+        raw = result = stream_with_deadline(llm, prompt, deadline)
+    summary = raw.strip().strip('"').strip()
 
     if args.debug:
         end = time.time()
@@ -64,8 +135,12 @@ def _summarize_article(title, content):
     return summary
 
 
-def summarize_node(state: UnifiedState) -> UnifiedState:
-    """Résumé des articles par le LLM local"""
+def summarize_node(state: UnifiedState, config: RunnableConfig | None = None) -> UnifiedState:
+    """
+    Résumé des articles par le LLM local. Dans une exécution avec points de reprise
+    (config thread_id), chaque résumé est enregistré dès sa génération et une reprise
+    réutilise les résumés déjà faits.
+    """
 
     # dict Article : 'title', 'summary', 'link', 'published', 'score', 'source'
     #
@@ -83,13 +158,120 @@ def summarize_node(state: UnifiedState) -> UnifiedState:
     )
 
     logger.info(f"{len(articles_to_summarise)} articles sélectionnés pour résumé")
-    summaries = []
-    for i, article in enumerate(articles_to_summarise, start=1):
+    # compression extractive du contenu avant le prompt (prompts plus courts)
+    compressor = ExtractiveCompressor.from_env() if is_compression_enabled() else None
+    compression_stats = CompressionStats()
+
+    def _content(article: dict) -> str:
+        if compressor is None:
+            return article["summary"]
+        content, before, after = compressor.compress(article["title"], article["summary"])
+        compression_stats.add(before, after)
+        return content
+
+    # cascade : petit modèle pour les contenus courts et le tri, grand modèle sinon
+    cascade = LLMCascade.from_env(_summarize_article) if is_llm_cascade_enabled() else None
+
+    # échéance par article bornée par le budget de l'exécution (repli extractif)
+    budget = SummaryBudget.from_env()
+
+    # résumés déjà enregistrés par une exécution interrompue (--resume)
+    run_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    checkpointer = None
+    done: dict[str, tuple] = {}
+    if run_id:
+        from app.db.checkpoint import article_key, get_checkpointer, is_checkpoint_enabled
+
+        if is_checkpoint_enabled():
+            checkpointer = get_checkpointer()
+            done = checkpointer.load_summaries(run_id)
+            if done:
+                logger.info(Fore.CYAN + f"Reprise : {len(done)} résumés déjà générés")
+
+    def _is_done(article: dict) -> bool:
+        return checkpointer is not None and article_key(article) in done
+
+    # contenus courts résumés par paquets (un appel, réponse JSON) ; les invalides repassent en individuel
+    batched: dict[int, str] = {}
+    batch_stats = BatchStats()
+    if is_batch_summary_enabled():
+        size = batch_size()
+        init_batch_llm = init_small_llm_chat if cascade is not None else init_llm_chat
+        batch_llm = init_batch_llm(max_tokens=batch_max_tokens(size))
+        pending = [article for article in articles_to_summarise if not _is_done(article)]
+        for batch in short_batches(pending, size):
+            if budget.exhausted():
+                break
+            results = _summarize_batch(batch, batch_llm, budget.article_deadline())
+            batch_stats.add(len(batch), len(results))
+            batched.update({id(batch[i]): summary for i, summary in results.items()})
+
+    def _summarize_one(i: int, article: dict, content: str, members: list[dict] | None):
+        """(résumé, statut) d'un article"""
+        if _is_done(article):
+            return done[article_key(article)]
+        result = _generate_one(i, article, content, members)
+        if checkpointer is not None:
+            checkpointer.save_summary(run_id, article_key(article), *result)
+        return result
+
+    def _generate_one(i: int, article: dict, content: str, members: list[dict] | None):
         logger.info(
             Fore.YELLOW
             + f"Résumé {i}/{len(articles_to_summarise)} : {article['title']}"
         )
-        summary_text = _summarize_article(article["title"], article["summary"])
+        status = STATUS_COMPLETE
+        try:
+            deadline = budget.article_deadline()
+            if id(article) in batched:
+                summary_text = batched[id(article)]
+            elif budget.exhausted():
+                raise GenerationTimeout()
+            elif members:
+                # sujet regroupant plusieurs articles : un seul appel LLM
+                summary_text = _summarize_topic(members, deadline=deadline)
+            elif cascade is not None:
+                summary_text = cascade.summarize(THEME, article["title"], content, deadline=deadline)
+                if summary_text is None:
+                    # écarté par le tri mais retenu par la sélection : résumé extractif, sans grand modèle
+                    summary_text, status = extractive_summary(article["title"], content), STATUS_EXTRACTIVE
+            else:
+                summary_text = _summarize_article(article["title"], content, deadline=deadline)
+        except GenerationTimeout as e:
+            summary_text, status = fallback_summary(article["title"], content, e.partial)
+            logger.warning(
+                Fore.YELLOW
+                + f"Échéance de résumé atteinte ({e.seconds:.1f}s) pour « {article['title']} » : résumé {status}"
+            )
+        return summary_text, status
+
+    # contenus préparés (compression) avant les appels LLM
+    tasks = []
+    for i, article in enumerate(articles_to_summarise, start=1):
+        members = None
+        if _is_done(article):
+            # résumé repris : ni compression ni appel LLM
+            content = article["summary"]
+        elif article.get("topic_members"):
+            members = [
+                {**member, "summary": _content(member)}
+                for member in [article, *article["topic_members"]]
+            ]
+            content = members[0]["summary"]
+        else:
+            content = _content(article)
+        tasks.append(partial(_summarize_one, i, article, content, members))
+
+    # requêtes simultanées sous contrôle adaptatif (AIMD), sinon séquentielles
+    if llm_concurrency_max() > 1:
+        controller = get_concurrency_controller()
+        results = run_adaptive(controller, tasks, llm_retries())
+        logger.info(Fore.CYAN + f"Concurrence LLM : limite {controller.limit} (historique {controller.history[-10:]})")
+    else:
+        results = [task() for task in tasks]
+
+    summaries = []
+    for article, (summary_text, status) in zip(articles_to_summarise, results):
         summary = {
             "title": article["title"],
             "summary": summary_text,
@@ -98,6 +280,8 @@ def summarize_node(state: UnifiedState) -> UnifiedState:
             "published": article["published"],
             "dt_created": datetime.now(timezone.utc),
             "source": article["source"] if "source" in article else "unknown",
+            "also_covered_by": article.get("also_covered_by"),
+            "summary_status": status,
         }
         summaries.append(summary)
         logger.info(f"Ajout du résumé {summary}")
@@ -110,5 +294,15 @@ def summarize_node(state: UnifiedState) -> UnifiedState:
         summaries = summaries[:LIMIT_ARTICLES_TO_RESUME]
 
     count_by_type_articles("Nombre de résumés par source", summaries)
+    if compressor is not None:
+        compression_stats.report()
+    if cascade is not None:
+        cascade.stats.report()
+    batch_stats.report()
+    fallbacks = sum(1 for summary in summaries if summary["summary_status"] != STATUS_COMPLETE)
+    logger.info(
+        Fore.CYAN
+        + f"Résumés en {time.monotonic() - budget.start:.1f}s, {fallbacks} de repli (échéance atteinte ou tri)"
+    )
 
     return state.model_copy(update={"summaries": summaries})
@@ -1,5 +1,7 @@
 from functools import lru_cache
 from colorama import Fore
+import os
+import time
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -7,8 +9,13 @@ logging.basicConfig(level=logging.INFO)
 from app.core.logger import logger
 from app.core.utils import get_environment_variable
 from app.services.models import Source, SourceType
-
-MAX_DAYS = int(get_environment_variable("MAX_DAYS", "10"))
+from app.services.polling_scheduler import (
+    PollingScheduler,
+    is_scheduler_enabled,
+    select_due_sources,
+    source_key,
+)
+from app.services.source_health import SourceHealthTracker
 
 __all__ = [
     "register_fetchers",
@@ -31,10 +38,13 @@ def register_fetchers():
     FetcherFactory.register_fetcher(SourceType.BLUESKY, BlueskyFetcher)
 
 
-def get_rss_urls():
+def get_rss_urls(due_only: bool = True):
     """
     Obtient la liste des URL RSS à traiter à partir des variables d'environnement.
     Le .env ne contient que des types string et au format JSON
+
+    Args:
+        due_only: ne retourne que les sources échues si POLL_SCHEDULER est activé
     """
     from app.read_opml import parse_opml_to_rss_list
     from app.services.models import Source, SourceType
@@ -44,7 +54,7 @@ def get_rss_urls():
     logger.info("Obtention des URL RSS à traiter...")
     rss_list_opml = parse_opml_to_rss_list(OPML_FILE)
 
-    return [
+    sources = [
         Source(
             type=SourceType.RSS, name=feed.titre, url=feed.lien_rss, link=feed.lien_web
         )
@@ -54,24 +64,58 @@ def get_rss_urls():
             or True
         )
     ]
+    return select_due_sources(sources) if due_only else sources
+
+
+def _record_fetch(record, source, *args):
+    """
+    Suivi (santé, planification) d'une relève : une erreur de la base (verrou SQLite...)
+    est journalisée, ni comptée comme échec de la source ni propagée
+    """
+    try:
+        record(source, *args)
+    except Exception as e:
+        logger.warning(Fore.YELLOW + f"Suivi de {source.url} non enregistré : {e}")
 
 
 def fetch_articles(fetcher, sources_urls):
+    max_days = int(get_environment_variable("MAX_DAYS", "10"))
+    scheduler = PollingScheduler() if is_scheduler_enabled() else None
+    health = SourceHealthTracker()
+    open_sources = health.open_sources(sources_urls)
+    if open_sources:
+        logger.warning(
+            Fore.YELLOW
+            + f"{len(open_sources)} sources ignorées (disjoncteur ouvert) : {sorted(open_sources)}"
+        )
+
     all_articles = []
     for source in sources_urls:
+        if source_key(source) in open_sources:
+            continue
+        start = time.perf_counter()
+        fetcher.last_bytes = None
         try:
-            articles = fetcher.fetch_articles(source, max_days=MAX_DAYS)
-            all_articles.extend(articles)
-            logger.info(
-                f"{len(articles)} articles récents de {source.name or source.url}"
-            )
+            articles = fetcher.fetch_articles(source, max_days=max_days)
         except Exception as e:
+            latency_ms = (time.perf_counter() - start) * 1000
             logger.error(f"Error fetching from {source.url}: {e}")
+            _record_fetch(health.record_failure, source, latency_ms, e)
+            continue
+        latency_ms = (time.perf_counter() - start) * 1000
+        all_articles.extend(articles)
+        logger.info(
+            f"{len(articles)} articles récents de {source.name or source.url}"
+        )
+        _record_fetch(health.record_success, source, latency_ms, fetcher.last_bytes)
+        if scheduler:
+            _record_fetch(scheduler.record_poll, source, articles)
     return all_articles
 
 
-@lru_cache(maxsize=1)
-def _load_json_reddit_bluesky(config_path):
+@lru_cache(maxsize=8)
+def _load_json_reddit_bluesky(config_path, mtime=None):
+    """Fichier lu une fois par version (mtime) : une modification est prise en compte (mode démon)"""
     import json
     logger.info(Fore.LIGHTMAGENTA_EX + f"Chargement du fichier de configuration : {config_path}")
     with open(config_path, "r") as f:
@@ -106,7 +150,7 @@ def _load_sources_from_config(config_path: str, type_source: str) -> list[Source
     }
     """
 
-    config = _load_json_reddit_bluesky(config_path)
+    config = _load_json_reddit_bluesky(config_path, os.path.getmtime(config_path))
 
     logger.info(Fore.LIGHTRED_EX + f"filter sources Reddit ou Bluesky : {type_source}")
     sources = []
@@ -134,25 +178,33 @@ def _load_sources_from_config(config_path: str, type_source: str) -> list[Source
     return sources
 
 
-def get_subs_reddit_urls():
+def get_subs_reddit_urls(due_only: bool = True):
     """
     Obtient la liste des URL Reddit à traiter à partir du fichier myreddit.json
+
+    Args:
+        due_only: ne retourne que les sources échues si POLL_SCHEDULER est activé
     """
     MY_REDDIT_FILE = get_environment_variable("REDDIT_FILE",None)
     if not MY_REDDIT_FILE:
         logger.warning("Aucun fichier Reddit spécifié.")
         raise ValueError("Aucun fichier Reddit spécifié.")
-    return _load_sources_from_config(MY_REDDIT_FILE, SourceType.REDDIT.value)
+    sources = _load_sources_from_config(MY_REDDIT_FILE, SourceType.REDDIT.value)
     # return _load_sources_from_config(MY_REDDIT_FILE, "reddit")
+    return select_due_sources(sources) if due_only else sources
 
 
-def get_bluesky_urls():
+def get_bluesky_urls(due_only: bool = True):
     """
     Obtient la liste des URL Bluesky à traiter à partir du fichier mybluesky.json
+
+    Args:
+        due_only: ne retourne que les sources échues si POLL_SCHEDULER est activé
     """
     BLUESKY_FILE = get_environment_variable("BLUESKY_FILE", None)
     if not BLUESKY_FILE:
         logger.warning("Aucun fichier Bluesky spécifié.")
         raise ValueError("Aucun fichier Bluesky spécifié.")
 
-    return _load_sources_from_config(BLUESKY_FILE, SourceType.BLUESKY.value)
+    sources = _load_sources_from_config(BLUESKY_FILE, SourceType.BLUESKY.value)
+    return select_due_sources(sources) if due_only else sources
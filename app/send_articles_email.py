@@ -14,15 +14,19 @@ from app.models import EmailTemplateParams
 from app.core.utils import get_environment_variable
 
 # =========================
-# Configuration SMTP
+# Configuration SMTP (lue à chaque envoi : le démon prend en compte un .env modifié)
 # =========================
 
-SMTP_SERVER = get_environment_variable("SMTP_SERVER", "smtp.server.ntld")
-SMTP_PORT = int(get_environment_variable("SMTP_PORT", "587"))
-SMTP_LOGIN = get_environment_variable("SMTP_LOGIN", "jdoe")
-SMTP_PASSWORD = get_environment_variable("SMTP_PASSWORD", "pwd")
-SENDER = get_environment_variable("SENDER", "zorky00@gmail.com")
-SEND_EMAIL_TO = get_environment_variable("SEND_EMAIL_TO", "jane.do@domain.ntld")
+
+def smtp_settings() -> dict:
+    return {
+        "sender": get_environment_variable("SENDER", "zorky00@gmail.com"),
+        "to": get_environment_variable("SEND_EMAIL_TO", "jane.do@domain.ntld"),
+        "smtp_server": get_environment_variable("SMTP_SERVER", "smtp.server.ntld"),
+        "smtp_port": int(get_environment_variable("SMTP_PORT", "587")),
+        "login": get_environment_variable("SMTP_LOGIN", "jdoe"),
+        "password": get_environment_variable("SMTP_PASSWORD", "pwd"),
+    }
 
 # =========================
 # Rendu du template Jinja2
@@ -95,12 +99,7 @@ def send_watch_articles(params: EmailTemplateParams):
         subject=email_subject,
         html_content=html_content,
         text_content=text_content,
-        sender=SENDER,
-        to=SEND_EMAIL_TO,
-        smtp_server=SMTP_SERVER,
-        smtp_port=SMTP_PORT,
-        login=SMTP_LOGIN,
-        password=SMTP_PASSWORD,
+        **smtp_settings(),
     )
 
 
@@ -146,10 +145,5 @@ if __name__ == "__main__":
         subject=email_subject,
         html_content=html_content,
         text_content=text_content,
-        sender=SENDER,
-        to=SEND_EMAIL_TO,
-        smtp_server=SMTP_SERVER,
-        smtp_port=SMTP_PORT,
-        login=SMTP_LOGIN,
-        password=SMTP_PASSWORD,
+        **smtp_settings(),
     )
@@ -0,0 +1,190 @@
+"""
+Contrôle adaptatif (AIMD) du nombre de requêtes de résumé simultanées vers le LLM
+
+Le bon parallélisme dépend du modèle chargé par Ollama, de OLLAMA_NUM_PARALLEL et des autres
+tâches qui partagent la machine : une valeur fixe est soit trop timide, soit source
+d'effondrement par file d'attente. Le contrôleur ajuste la limite de requêtes en vol par
+fenêtres d'au moins `limite` requêtes terminées :
+
+    erreur dans la fenêtre                        limite x LLM_CONCURRENCY_BACKOFF (décroissance multiplicative)
+    latence moyenne > latence de base x tolérance  limite x LLM_CONCURRENCY_BACKOFF (file d'attente côté serveur)
+    débit en hausse par rapport à la fenêtre       limite + 1 (croissance additive)
+    débit stable depuis PROBE_WINDOWS fenêtres     limite + 1 (nouvel essai)
+    sinon                                          limite inchangée
+
+Après une baisse, les requêtes parties sous l'ancienne limite ne comptent plus dans les
+fenêtres (leur latence reflète la file d'attente déjà corrigée).
+
+La latence de base est la latence minimale observée (requête sans attente), réapprise toutes
+les BASELINE_TTL secondes pour suivre un changement de modèle. Le contrôleur est partagé par les exécutions
+d'un même processus : la limite apprise est conservée (mode démon).
+
+Configuration .env :
+    LLM_CONCURRENCY_MAX=1               1 : résumés séquentiels, sans contrôleur
+    LLM_CONCURRENCY_MIN=1
+    LLM_LATENCY_TOLERANCE=1.5
+    LLM_CONCURRENCY_BACKOFF=0.5
+    LLM_RETRIES=1                       nouvelles tentatives d'une requête en erreur
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable
+
+# hausse de débit minimale pour croître (bruit de mesure)
+THROUGHPUT_GAIN = 0.05
+# fenêtres de débit stable avant de tester une limite plus haute
+PROBE_WINDOWS = 3
+MIN_WINDOW = 4
+# durée de validité de la latence de base (changement de modèle, machine partagée)
+BASELINE_TTL = 300
+
+
+class AIMDController:
+    """Limite de requêtes en vol, croissance additive / décroissance multiplicative"""
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        initial: int | None = None,
+        latency_tolerance: float = 1.5,
+        backoff: float = 0.5,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, initial or self.min_limit))
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.baseline: float | None = None
+        self._baseline_time = 0.0
+        self.history: list[int] = [self.limit]
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._window: list[tuple[float, bool]] = []
+        self._window_start = time.monotonic()
+        self._last_throughput = 0.0
+        self._flat_windows = 0
+        # incrémenté à chaque baisse : les requêtes parties avant sont ignorées
+        self._epoch = 0
+
+    @classmethod
+    def from_env(cls) -> "AIMDController":
+        return cls(
+            min_limit=int(get_environment_variable("LLM_CONCURRENCY_MIN", "1")),
+            max_limit=llm_concurrency_max(),
+            latency_tolerance=float(get_environment_variable("LLM_LATENCY_TOLERANCE", "1.5")),
+            backoff=float(get_environment_variable("LLM_CONCURRENCY_BACKOFF", "0.5")),
+        )
+
+    @contextmanager
+    def slot(self):
+        """Attente d'une place sous la limite, puis mesure de la requête"""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+            epoch = self._epoch
+        start = time.monotonic()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._record(time.monotonic() - start, error, epoch)
+                self._condition.notify_all()
+
+    def _record(self, latency: float, error: bool, epoch: int):
+        now = time.monotonic()
+        if not error and (
+            self.baseline is None or latency < self.baseline or now - self._baseline_time > BASELINE_TTL
+        ):
+            self.baseline = latency
+            self._baseline_time = now
+        if epoch != self._epoch:
+            return
+        self._window.append((latency, error))
+        if len(self._window) < max(self.limit, MIN_WINDOW):
+            return
+
+        throughput = len(self._window) / max(now - self._window_start, 1e-9)
+        latencies = [latency for latency, error in self._window if not error]
+        errors = len(self._window) - len(latencies)
+        mean_latency = sum(latencies) / len(latencies) if latencies else math.inf
+        previous = self.limit
+
+        if errors:
+            self._decrease(f"{errors} erreur(s)")
+        elif self.baseline and mean_latency > self.baseline * self.latency_tolerance:
+            self._decrease(f"latence {mean_latency:.2f}s > {self.latency_tolerance} x {self.baseline:.2f}s")
+        else:
+            improved = throughput > self._last_throughput * (1 + THROUGHPUT_GAIN)
+            self._flat_windows = 0 if improved else self._flat_windows + 1
+            if (improved or self._flat_windows >= PROBE_WINDOWS) and self.limit < self.max_limit:
+                self._flat_windows = 0
+                self.limit += 1
+                logger.info(
+                    Fore.CYAN + f"Concurrence LLM : {previous} -> {self.limit} (débit {throughput:.2f} req/s)"
+                )
+            self._last_throughput = throughput
+
+        self._window = []
+        self._window_start = now
+        self.history.append(self.limit)
+
+    def _decrease(self, reason: str):
+        previous = self.limit
+        self.limit = max(self.min_limit, int(self.limit * self.backoff))
+        # après une baisse, le débit de référence repart de la nouvelle limite
+        self._last_throughput = 0.0
+        self._flat_windows = 0
+        self._epoch += 1
+        if self.limit != previous:
+            logger.info(Fore.YELLOW + f"Concurrence LLM : {previous} -> {self.limit} ({reason})")
+
+    def call(self, fn: Callable, retries: int = 0):
+        """Appel sous la limite, nouvelles tentatives en cas d'erreur (chacune comptée)"""
+        for attempt in range(retries + 1):
+            try:
+                with self.slot():
+                    return fn()
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                logger.warning(Fore.YELLOW + f"Requête LLM en erreur ({e}), nouvelle tentative")
+
+
+def run_adaptive(controller: AIMDController, tasks: list[Callable], retries: int = 0) -> list:
+    """Résultats des tâches dans leur ordre, au plus controller.limit en parallèle"""
+    with ThreadPoolExecutor(max_workers=controller.max_limit, thread_name_prefix="llm") as executor:
+        futures = [executor.submit(controller.call, task, retries) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def llm_concurrency_max() -> int:
+    return max(1, int(get_environment_variable("LLM_CONCURRENCY_MAX", "1")))
+
+
+def llm_retries() -> int:
+    return int(get_environment_variable("LLM_RETRIES", "1"))
+
+
+@lru_cache(maxsize=1)
+def get_concurrency_controller() -> AIMDController:
+    """Contrôleur partagé par les exécutions du processus (limite apprise conservée)"""
+    return AIMDController.from_env()
@@ -0,0 +1,111 @@
+"""
+Résumé groupé des contenus courts (posts Bluesky, self-posts Reddit) en un seul appel LLM
+
+Un post de moins de 50 mots paie quand même un aller-retour complet avec le long prompt de
+set_prompt : pour les contenus courts, le coût fixe par appel domine. Avec BATCH_SUMMARY=true,
+les articles dont le contenu fait au plus BATCH_SUMMARY_MAX_WORDS mots sont regroupés par
+BATCH_SUMMARY_SIZE dans une seule requête (set_batch_prompt) qui demande un tableau JSON
+[{"id": n, "summary": "..."}].
+
+La réponse est validée objet par objet (BatchSummaryItem) : un objet illisible, un id inconnu
+ou un résumé vide n'invalide que son contenu, et une réponse tronquée garde les objets complets.
+Les contenus sans résumé valide repassent par un appel individuel.
+
+Configuration .env :
+    BATCH_SUMMARY=false
+    BATCH_SUMMARY_MAX_WORDS=50
+    BATCH_SUMMARY_SIZE=8
+    BATCH_SUMMARY_TOKENS_PER_ITEM=120     max_tokens de la requête groupée = taille x 120
+"""
+
+import json
+import re
+
+from pydantic import BaseModel, ValidationError, field_validator
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable, is_env_enabled
+
+# objets JSON non imbriqués de la réponse (un tableau tronqué garde ses objets complets)
+_OBJECT_RE = re.compile(r"\{[^{}]*\}")
+
+
+class BatchSummaryItem(BaseModel):
+    """Objet attendu dans la réponse JSON groupée"""
+
+    id: int
+    summary: str
+
+    @field_validator("summary")
+    @classmethod
+    def summary_not_empty(cls, value: str) -> str:
+        value = value.strip()
+        if not value:
+            raise ValueError("résumé vide")
+        return value
+
+
+def is_batch_summary_enabled() -> bool:
+    return is_env_enabled("BATCH_SUMMARY", False)
+
+
+def batch_size() -> int:
+    return max(1, int(get_environment_variable("BATCH_SUMMARY_SIZE", "8")))
+
+
+def batch_max_tokens(size: int) -> int:
+    return size * int(get_environment_variable("BATCH_SUMMARY_TOKENS_PER_ITEM", "120"))
+
+
+def is_short(article: dict, max_words: int | None = None) -> bool:
+    if max_words is None:
+        max_words = int(get_environment_variable("BATCH_SUMMARY_MAX_WORDS", "50"))
+    return len((article.get("summary") or "").split()) <= max_words
+
+
+def short_batches(articles: list[dict], size: int) -> list[list[dict]]:
+    """Articles courts (hors sujets regroupés) par paquets de size, dans l'ordre"""
+    short = [a for a in articles if not a.get("topic_members") and is_short(a)]
+    # un contenu court isolé : appel individuel, rien à regrouper
+    batches = [short[start : start + size] for start in range(0, len(short), size)]
+    return [batch for batch in batches if len(batch) > 1]
+
+
+def parse_batch_response(text: str, ids: set[int]) -> dict[int, str]:
+    """Résumés valides de la réponse, par id (premier objet valide pour un id)"""
+    summaries: dict[int, str] = {}
+    for raw in _OBJECT_RE.findall(text or ""):
+        try:
+            item = BatchSummaryItem.model_validate(json.loads(raw))
+        except (json.JSONDecodeError, ValidationError):
+            continue
+        if item.id in ids and item.id not in summaries:
+            summaries[item.id] = item.summary
+    return summaries
+
+
+class BatchStats:
+    """Requêtes groupées et replis individuels sur une exécution"""
+
+    def __init__(self):
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+
+    def add(self, items: int, parsed: int):
+        self.batches += 1
+        self.items += items
+        self.fallbacks += items - parsed
+
+    def report(self):
+        if not self.batches:
+            return
+        logger.info(
+            Fore.CYAN
+            + f"Résumé groupé : {self.items} contenus courts en {self.batches} appels, "
+            f"{self.fallbacks} repassés en appel individuel"
+        )
@@ -0,0 +1,393 @@
+"""
+Ingestion Bluesky en continu via Jetstream (flux d'évènements JSON filtré par DID)
+
+Au lieu d'interroger toutes les heures le fil de chaque compte, un processus longue durée
+s'abonne au flux Jetstream pour les DIDs configurés (BLUESKY_FILE), normalise les posts avec
+BlueskyFetcher._format_bluesky_post et les ajoute à une file durable en base SQLite.
+Le noeud fetch_bluesky ne fait ensuite que lire cette file, sans appel réseau ; les posts lus
+sont réservés par l'exécution et supprimés une fois ses résumés enregistrés (noeud
+savedbsummaries).
+
+La file a un seul consommateur : une exécution du graphe à la fois (cron ou démon, pas les
+deux). Les posts réservés par une exécution qui a encore des points de reprise (en cours, ou
+interrompue et reprenable par --resume) ne sont pas repris par une autre ; ceux d'une
+exécution sans points de reprise (terminée en échec puis purgée, GRAPH_CHECKPOINT=false) le
+sont.
+
+Usage :
+    python -m app --bluesky-stream
+
+API : https://github.com/bluesky-social/jetstream
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from urllib.parse import urlencode
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from sqlalchemy import delete, inspect, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable
+from app.services.models import Source, SourceType
+
+JETSTREAM_URL = get_environment_variable(
+    "BLUESKY_JETSTREAM_URL", "wss://jetstream2.us-east.bsky.network/subscribe"
+)
+POST_COLLECTION = "app.bsky.feed.post"
+CURSOR_NAME = "bluesky_jetstream"
+# on rejoue quelques secondes à la reconnexion, les doublons sont ignorés par l'uri unique
+CURSOR_REWIND_US = 5 * 1_000_000
+
+
+def _default_session_factory():
+    from app.db.db import SessionLocal
+
+    return SessionLocal
+
+
+# =========================
+# Conversion évènement Jetstream -> post compatible _format_bluesky_post
+# =========================
+
+
+def _to_embed(embed: dict | None):
+    """Convertit l'embed JSON d'un record en objet à attributs (py_type, external, images)"""
+    if not embed:
+        return None
+    external = embed.get("external") or {}
+    return SimpleNamespace(
+        py_type=embed.get("$type"),
+        external=SimpleNamespace(
+            uri=external.get("uri"),
+            title=external.get("title"),
+            description=external.get("description"),
+        ),
+        images=[SimpleNamespace(alt=img.get("alt")) for img in embed.get("images", [])],
+    )
+
+
+def jetstream_event_to_post(event: dict, handles: dict | None = None):
+    """
+    Construit un objet équivalent à un PostView atproto depuis un évènement Jetstream.
+
+    Args:
+        event: évènement JSON Jetstream
+        handles: correspondance DID -> handle (Jetstream ne transmet que le DID)
+
+    Returns:
+        Le post, ou None si l'évènement n'est pas une création de post
+    """
+    commit = event.get("commit") or {}
+    if (
+        event.get("kind") != "commit"
+        or commit.get("operation") != "create"
+        or commit.get("collection") != POST_COLLECTION
+    ):
+        return None
+
+    record = commit.get("record") or {}
+    if not record.get("createdAt"):
+        return None
+
+    did = event["did"]
+    reply = record.get("reply")
+    return SimpleNamespace(
+        uri=f"at://{did}/{POST_COLLECTION}/{commit.get('rkey')}",
+        author=SimpleNamespace(
+            handle=(handles or {}).get(did) or did, display_name=None
+        ),
+        record=SimpleNamespace(
+            text=record.get("text", ""),
+            created_at=record["createdAt"],
+            embed=_to_embed(record.get("embed")),
+            reply=SimpleNamespace(parent=reply.get("parent")) if reply else None,
+        ),
+        like_count=None,
+        repost_count=None,
+        reply_count=None,
+    )
+
+
+# =========================
+# File durable en base
+# =========================
+
+
+class BlueskyStreamQueue:
+    """File locale des posts Bluesky, alimentée par Jetstream et vidée par le pipeline"""
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or _default_session_factory()
+
+    def push(self, articles: list[dict], cursor: int | None = None) -> int:
+        """
+        Ajoute des articles à la file et avance le curseur dans la même transaction :
+        une reprise après arrêt repart exactement du dernier lot enregistré.
+        """
+        from app.db.db import BlueskyQueuedPost, StreamCursor
+
+        with self.session_factory() as session:
+            if articles:
+                rows = [
+                    {
+                        "uri": article["uri"],
+                        "published": article["published"],
+                        "payload": {k: v for k, v in article.items() if k != "uri"},
+                    }
+                    for article in articles
+                ]
+                session.execute(
+                    sqlite_insert(BlueskyQueuedPost)
+                    .values(rows)
+                    .on_conflict_do_nothing(index_elements=["uri"])
+                )
+            if cursor is not None:
+                session.execute(
+                    sqlite_insert(StreamCursor)
+                    .values(name=CURSOR_NAME, cursor=cursor)
+                    .on_conflict_do_update(
+                        index_elements=["name"],
+                        set_={"cursor": cursor, "dt_updated": datetime.now()},
+                    )
+                )
+            session.commit()
+        return len(articles)
+
+    def get_cursor(self) -> int | None:
+        from app.db.db import StreamCursor
+
+        with self.session_factory() as session:
+            row = session.get(StreamCursor, CURSOR_NAME)
+            return row.cursor if row else None
+
+    def drain(self, max_days: int, run_id: str | None = None) -> list[dict]:
+        """
+        Réserve les posts disponibles de la file pour l'exécution run_id (par défaut celle du
+        graphe en cours) et retourne ceux publiés depuis moins de max_days jours. Disponibles :
+        non réservés, déjà réservés par run_id (reprise) ou par une exécution sans points de
+        reprise (abandonnée). Les posts ne sont supprimés que par release(), une fois les
+        résumés enregistrés. Hors exécution du graphe, ils sont supprimés aussitôt.
+        """
+        from app.db.db import BlueskyQueuedPost
+
+        run_id = run_id or _current_run_id()
+        cutoff = (datetime.now() - timedelta(days=max_days)).isoformat()
+        with self.session_factory() as session:
+            # posts d'une autre exécution en cours ou reprenable : laissés à celle-ci
+            others = _runs_with_checkpoints(session) - {run_id}
+            available = or_(
+                BlueskyQueuedPost.claimed_by.is_(None),
+                BlueskyQueuedPost.claimed_by.not_in(others),
+            )
+            rows = session.execute(
+                select(BlueskyQueuedPost).where(available).order_by(BlueskyQueuedPost.id)
+            ).scalars().all()
+            if not rows:
+                return []
+            last_id = rows[-1].id
+            queued = [(row.published, row.payload) for row in rows]
+            claimed = available & (BlueskyQueuedPost.id <= last_id)
+            if run_id:
+                session.execute(
+                    update(BlueskyQueuedPost).where(claimed).values(claimed_by=run_id)
+                )
+            else:
+                session.execute(delete(BlueskyQueuedPost).where(claimed))
+            session.commit()
+
+        articles = [
+            {**payload, "source": SourceType(payload["source"])}
+            for published, payload in queued
+            if published >= cutoff
+        ]
+        logger.info(
+            Fore.LIGHTMAGENTA_EX
+            + f"File Bluesky lue : {len(queued)} posts, {len(articles)} récents"
+        )
+        return articles
+
+    def release(self, run_id: str) -> int:
+        """Supprime les posts réservés par l'exécution run_id (résumés enregistrés)"""
+        from app.db.db import BlueskyQueuedPost
+
+        with self.session_factory() as session:
+            deleted = session.execute(
+                delete(BlueskyQueuedPost).where(BlueskyQueuedPost.claimed_by == run_id)
+            ).rowcount
+            session.commit()
+        if deleted:
+            logger.info(Fore.LIGHTMAGENTA_EX + f"File Bluesky : {deleted} posts traités supprimés")
+        return deleted
+
+
+def _runs_with_checkpoints(session) -> set[str]:
+    """Exécutions ayant des points de reprise (en cours ou interrompues), dans la même base"""
+    from app.db.checkpoint import GraphCheckpoint
+
+    if not inspect(session.get_bind()).has_table(GraphCheckpoint.__tablename__):
+        return set()
+    return set(session.scalars(select(GraphCheckpoint.thread_id).distinct()))
+
+
+def _current_run_id() -> str | None:
+    """Identifiant (thread_id) de l'exécution du graphe en cours, None hors du graphe"""
+    from langgraph.config import get_config
+
+    try:
+        return (get_config().get("configurable") or {}).get("thread_id")
+    except RuntimeError:
+        return None
+
+
+# =========================
+# Consommateur Jetstream
+# =========================
+
+
+class JetstreamConsumer:
+    """Abonnement Jetstream filtré par DIDs, écrit les posts dans une BlueskyStreamQueue"""
+
+    def __init__(
+        self,
+        dids: list[str],
+        queue: BlueskyStreamQueue,
+        handles: dict | None = None,
+        url: str = JETSTREAM_URL,
+        batch_size: int = 50,
+        flush_interval: float = 5.0,
+    ):
+        self.dids = dids
+        self.queue = queue
+        self.handles = handles or {}
+        self.url = url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.cursor = queue.get_cursor()
+        self._buffer: list[dict] = []
+        self._last_flush = 0.0
+
+    def subscribe_url(self) -> str:
+        params = [("wantedCollections", POST_COLLECTION)]
+        params += [("wantedDids", did) for did in self.dids]
+        if self.cursor:
+            params.append(("cursor", self.cursor - CURSOR_REWIND_US))
+        return f"{self.url}?{urlencode(params)}"
+
+    def handle_message(self, message: str | bytes) -> dict | None:
+        """Traite un message brut, retourne l'article mis en tampon le cas échéant"""
+        from app.services.fetchers.bluesky_fetcher import BlueskyFetcher
+
+        try:
+            event = json.loads(message)
+        except ValueError:
+            logger.warning(f"Message Jetstream illisible ignoré : {message[:100]!r}")
+            return None
+
+        if event.get("time_us"):
+            self.cursor = max(self.cursor or 0, event["time_us"])
+
+        # filtrage côté client en plus de wantedDids (relais ne filtrant pas)
+        if self.dids and event.get("did") not in self.dids:
+            return None
+        post = jetstream_event_to_post(event, self.handles)
+        if post is None:
+            return None
+
+        article = BlueskyFetcher._format_bluesky_post(post, event)
+        article["uri"] = post.uri
+        self._buffer.append(article)
+        return article
+
+    def flush(self):
+        if not self._buffer and self.cursor is None:
+            return
+        count = self.queue.push(self._buffer, self.cursor)
+        if count:
+            logger.info(Fore.LIGHTMAGENTA_EX + f"📥 {count} posts Bluesky mis en file")
+        self._buffer = []
+        self._last_flush = asyncio.get_running_loop().time()
+
+    def _should_flush(self) -> bool:
+        elapsed = asyncio.get_running_loop().time() - self._last_flush
+        return len(self._buffer) >= self.batch_size or elapsed >= self.flush_interval
+
+    async def run(self, stop: asyncio.Event | None = None, reconnect: bool = True):
+        """
+        Boucle de consommation ; reconnexion avec backoff exponentiel depuis le dernier curseur.
+
+        Args:
+            stop: évènement d'arrêt (optionnel)
+            reconnect: False pour s'arrêter à la fermeture de la connexion (tests, rejeu)
+        """
+        from websockets.asyncio.client import connect
+        from websockets.exceptions import WebSocketException
+
+        backoff = 1
+        self._last_flush = asyncio.get_running_loop().time()
+        while not (stop and stop.is_set()):
+            try:
+                url = self.subscribe_url()
+                logger.info(Fore.BLUE + f"Connexion Jetstream : {url}")
+                async with connect(url) as ws:
+                    backoff = 1
+                    async for message in ws:
+                        self.handle_message(message)
+                        if self._should_flush():
+                            self.flush()
+                        if stop and stop.is_set():
+                            break
+            except (OSError, WebSocketException) as e:
+                logger.error(f"Connexion Jetstream interrompue : {e}")
+            finally:
+                self.flush()
+
+            if not reconnect:
+                break
+            logger.info(f"Reconnexion Jetstream dans {backoff}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+
+def resolve_sources_dids(sources: list[Source]) -> dict:
+    """Résout les sources Bluesky (@handle ou did:) en correspondance DID -> handle"""
+    from atproto import IdResolver
+
+    resolver = IdResolver()
+    handles = {}
+    for source in sources:
+        identifier = source.url.split("/profile/")[-1].lstrip("@")
+        if identifier.startswith("did:"):
+            handles[identifier] = identifier
+            continue
+        did = resolver.handle.resolve(identifier)
+        if not did:
+            logger.error(f"Handle Bluesky introuvable : {identifier}")
+            continue
+        handles[did] = identifier
+    return handles
+
+
+def run_bluesky_stream():
+    """Point d'entrée de l'ingestion longue durée : python -m app --bluesky-stream"""
+    from app.nodes.utils_fetch_nodes import get_bluesky_urls
+
+    sources = [
+        s for s in get_bluesky_urls(due_only=False) if not s.url.startswith("firehose")
+    ]
+    handles = resolve_sources_dids(sources)
+    logger.info(Fore.LIGHTMAGENTA_EX + f"Ingestion Jetstream pour {handles}")
+
+    consumer = JetstreamConsumer(
+        dids=list(handles), queue=BlueskyStreamQueue(), handles=handles
+    )
+    try:
+        asyncio.run(consumer.run())
+    except KeyboardInterrupt:
+        logger.info("Arrêt de l'ingestion Jetstream")
@@ -0,0 +1,190 @@
+"""
+Compression extractive du contenu des articles avant le prompt de résumé
+
+Sur un LLM servi sur CPU, le traitement du prompt domine le temps jusqu'au premier token :
+un fil Reddit avec ses commentaires ou un long billet RSS donne des prompts de plusieurs
+milliers de tokens. Le contenu est ramené à COMPRESSION_MAX_TOKENS en gardant les phrases
+les plus centrales, dans leur ordre d'origine.
+
+Score des phrases (COMPRESSION_METHOD) :
+    textrank     PageRank sur le graphe de similarité des phrases (mots communs normalisés par
+                 la longueur des phrases), sans modèle
+    embeddings   PageRank sur la similarité cosinus des embeddings des phrases, pondéré par la
+                 similarité au titre (modèle d'embeddings de l'exécution)
+
+La première phrase (chapeau) est toujours gardée. Les tokens sont comptés avec tiktoken
+(cl100k_base, comme _calculate_tokens), sinon estimés (4 caractères par token).
+
+Configuration .env :
+    COMPRESSION_ENABLED=false
+    COMPRESSION_METHOD=textrank
+    COMPRESSION_MAX_TOKENS=400
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable
+
+import numpy as np
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable, is_env_enabled
+
+METHODS = ("textrank", "embeddings")
+CHARS_PER_TOKEN_ESTIMATE = 4
+DAMPING = 0.85
+# fin de phrase suivie d'un espace et d'une majuscule / chiffre / guillemet, ou saut de ligne
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+(?=[\"«(\[A-ZÀ-Ý0-9])|\n+")
+_WORD_RE = re.compile(r"\w{3,}")
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if s and s.strip()]
+
+
+@lru_cache(maxsize=1)
+def get_token_counter() -> Callable[[str], int]:
+    """Compteur de tokens tiktoken, estimation par la longueur si l'encodage est indisponible"""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except Exception as e:
+        logger.warning(Fore.YELLOW + f"tiktoken indisponible ({e}) : tokens estimés")
+        return lambda text: -(-len(text) // CHARS_PER_TOKEN_ESTIMATE)
+
+
+def pagerank(similarity: np.ndarray, damping: float = DAMPING, iterations: int = 50) -> np.ndarray:
+    """Centralité des phrases : PageRank sur la matrice de similarité (diagonale ignorée)"""
+    n = len(similarity)
+    weights = np.clip(similarity, 0, None).astype(np.float64)
+    np.fill_diagonal(weights, 0)
+    out_degree = weights.sum(axis=1, keepdims=True)
+    # phrase isolée : répartition uniforme
+    transition = np.where(out_degree > 0, weights / np.where(out_degree > 0, out_degree, 1), 1 / n)
+    scores = np.full(n, 1 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * transition.T @ scores
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+
+def word_overlap_similarity(sentences: list[str]) -> np.ndarray:
+    """Similarité TextRank : mots communs / (log |s1| + log |s2|)"""
+    words = [set(_WORD_RE.findall(s.lower())) for s in sentences]
+    n = len(sentences)
+    similarity = np.zeros((n, n))
+    for i in range(n):
+        for j in range(i + 1, n):
+            if len(words[i]) > 1 and len(words[j]) > 1:
+                common = len(words[i] & words[j])
+                if common:
+                    similarity[i, j] = similarity[j, i] = common / (
+                        np.log(len(words[i])) + np.log(len(words[j]))
+                    )
+    return similarity
+
+
+class ExtractiveCompressor:
+    """Réduit un texte à un budget de tokens en gardant ses phrases les plus centrales"""
+
+    def __init__(
+        self,
+        max_tokens: int = 400,
+        method: str = "textrank",
+        token_counter: Callable[[str], int] | None = None,
+        model=None,
+    ):
+        if method not in METHODS:
+            raise ValueError(f"COMPRESSION_METHOD={method} inconnu, valeurs possibles : {', '.join(METHODS)}")
+        self.max_tokens = max_tokens
+        self.method = method
+        self.count_tokens = token_counter or get_token_counter()
+        self.model = model
+
+    @classmethod
+    def from_env(cls) -> "ExtractiveCompressor":
+        return cls(
+            max_tokens=int(get_environment_variable("COMPRESSION_MAX_TOKENS", "400")),
+            method=get_environment_variable("COMPRESSION_METHOD", "textrank").lower(),
+        )
+
+    def _scores(self, title: str, sentences: list[str]) -> np.ndarray:
+        if self.method == "textrank":
+            return pagerank(word_overlap_similarity(sentences))
+
+        from app.services.embeddings import encode_texts
+
+        if self.model is None:
+            from app.services.semantic_search import get_embedding_model
+
+            self.model = get_embedding_model()
+        vectors = encode_texts(self.model, [title or "", *sentences])
+        title_vector, vectors = vectors[0], vectors[1:]
+        relevance = np.clip(vectors @ title_vector, 0, None) if title else 1.0
+        return pagerank(vectors @ vectors.T) * (0.5 + relevance)
+
+    def compress(self, title: str, text: str) -> tuple[str, int, int]:
+        """(texte compressé, tokens avant, tokens après)"""
+        text = (text or "").strip()
+        before = self.count_tokens(text)
+        if before <= self.max_tokens:
+            return text, before, before
+        sentences = split_sentences(text)
+        if len(sentences) < 2:
+            return text, before, before
+
+        lengths = [self.count_tokens(s) for s in sentences]
+        # chapeau d'abord, puis les phrases par centralité décroissante
+        scores = self._scores(title, sentences)
+        order = [0, *sorted(range(1, len(sentences)), key=lambda i: -scores[i])]
+        kept, used = [], 0
+        for i in order:
+            if used + lengths[i] <= self.max_tokens:
+                kept.append(i)
+                used += lengths[i]
+        if not kept:
+            # chapeau plus long que le budget : coupé en caractères
+            head = sentences[0][: self.max_tokens * CHARS_PER_TOKEN_ESTIMATE]
+            return head, before, self.count_tokens(head)
+        compressed = " ".join(sentences[i] for i in sorted(kept))
+        return compressed, before, self.count_tokens(compressed)
+
+
+class CompressionStats:
+    """Tokens de contenu envoyés au LLM sur une exécution, avant / après compression"""
+
+    def __init__(self):
+        self.articles = 0
+        self.compressed = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def add(self, before: int, after: int):
+        self.articles += 1
+        self.compressed += after < before
+        self.tokens_before += before
+        self.tokens_after += after
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def report(self):
+        ratio = self.tokens_saved / max(1, self.tokens_before)
+        logger.info(
+            Fore.CYAN
+            + f"Compression extractive : {self.compressed}/{self.articles} contenus réduits, "
+            f"{self.tokens_before} -> {self.tokens_after} tokens ({self.tokens_saved} économisés, {ratio:.0%})"
+        )
+
+
+def is_compression_enabled() -> bool:
+    return is_env_enabled("COMPRESSION_ENABLED", False)
@@ -0,0 +1,300 @@
+"""
+Mode démon : graphe construit une fois, modèles et clients gardés chauds, exécutions planifiées
+
+Chaque lancement par cron de `python -m app` repaie les imports (torch, sentence-transformers,
+langchain), le chargement du modèle d'embeddings et les connexions Bluesky / Reddit : 20 à 40s
+avant le premier article. `python -m app --daemon` reste en mémoire et exécute le graphe toutes
+les DAEMON_INTERVAL_MINUTES minutes :
+
+    - modèle d'embeddings chargé au démarrage (init_sentence_model), fetchers et leurs
+      sessions réutilisés (FetcherFactory.get_fetcher), caches d'embeddings conservés ;
+    - avant chaque exécution, les fichiers surveillés sont comparés à leur date de
+      modification : .env modifié -> variables relues (celles retirées du fichier sont
+      retirées de l'environnement), graphe reconstruit (fetchers activés), modèle
+      d'embeddings et pool d'encodage rechargés si leurs réglages ont changé, cache des
+      embeddings d'articles vidé si le modèle ou le texte encodé change ; fichiers
+      OPML / JSON des sources et FILTER_KEYWORDS sont relus à chaque exécution ;
+    - les réglages des noeuds (seuils, limites, MAX_DAYS, LLM_MODEL / OLLAMA_BASE_URL, SMTP...)
+      sont lus à chaque exécution ; ne sont pas relus : DB_PATH, SEMANTIC_QUERY_CACHE_SIZE
+      (redémarrage du démon) et BLUESKY_JETSTREAM_URL (processus --bluesky-stream) ;
+    - déclenchement à la demande sur l'interface locale (127.0.0.1 uniquement) :
+          curl -X POST http://127.0.0.1:8765/run     exécution dès que possible
+          curl http://127.0.0.1:8765/status          exécution en cours, dernière exécution
+      Une demande reçue pendant une exécution est jouée à la fin de celle-ci (une seule
+      exécution à la fois, plusieurs demandes regroupées).
+
+Une exécution en échec est journalisée sans arrêter le démon ; ses points de reprise restent
+en base (python -m app --resume <run_id>).
+
+Configuration .env :
+    DAEMON_INTERVAL_MINUTES=60
+    DAEMON_RUN_AT_START=true
+    DAEMON_TRIGGER_PORT=8765            0 : pas de déclenchement à la demande
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from dotenv import dotenv_values, find_dotenv, load_dotenv
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable, is_env_enabled
+
+# réglages qui imposent de recharger le modèle d'embeddings
+EMBEDDING_SETTINGS = ("MODEL_EMBEDDINGS", "EMBEDDING_BACKEND", "EMBEDDING_DEVICE", "EMBEDDING_THREADS")
+# réglages du texte encodé : embeddings en cache calculés sur un autre texte
+TEXT_SETTINGS = ("EMBEDDING_TEXT_MODE", "EMBEDDING_MAX_TOKENS", "EMBEDDING_MAX_CHUNKS", "EMBEDDING_HEAD_RATIO")
+# réglages qui imposent de redémarrer le pool d'encodage (en plus de ceux du modèle)
+POOL_SETTINGS = ("EMBEDDING_WORKERS", "EMBEDDING_THREADS_PER_WORKER", "EMBEDDING_POOL_CHUNK")
+
+
+class WatchedFiles:
+    """Dates de modification des fichiers de configuration, comparées à chaque appel"""
+
+    def __init__(self, paths: Callable[[], list[str]]):
+        self._paths = paths
+        self._mtimes = self._snapshot()
+
+    def _snapshot(self) -> dict[str, float | None]:
+        mtimes = {}
+        for path in self._paths():
+            if path:
+                mtimes[path] = os.path.getmtime(path) if os.path.exists(path) else None
+        return mtimes
+
+    def changed(self) -> list[str]:
+        """Fichiers modifiés, créés ou supprimés depuis l'appel précédent"""
+        mtimes = self._snapshot()
+        changed = [path for path, mtime in mtimes.items() if self._mtimes.get(path) != mtime]
+        self._mtimes = mtimes
+        return changed
+
+
+def config_files() -> list[str]:
+    """.env et fichiers des sources (chemins relus : ils peuvent changer dans .env)"""
+    return [
+        find_dotenv(usecwd=True),
+        get_environment_variable("OPML_FILE", "my.opml"),
+        get_environment_variable("REDDIT_FILE"),
+        get_environment_variable("BLUESKY_FILE"),
+    ]
+
+
+def _settings(keys: tuple) -> tuple:
+    return tuple(os.getenv(key) for key in keys)
+
+
+def _env_file_values(env_file: str) -> dict:
+    return dotenv_values(env_file) if env_file and os.path.exists(env_file) else {}
+
+
+def warm_up():
+    """Chargement anticipé du modèle d'embeddings (premier filtrage sans attente)"""
+    from app.services.model_service import init_sentence_model
+
+    start = time.perf_counter()
+    init_sentence_model()
+    logger.info(Fore.GREEN + f"Démon : modèle d'embeddings chargé en {time.perf_counter() - start:.1f}s")
+
+
+class Daemon:
+    """Exécutions du graphe, une à la fois, planifiées ou déclenchées à la demande"""
+
+    def __init__(
+        self,
+        build_graph: Callable,
+        prepare_state: Callable,
+        run_graph: Callable,
+        interval_seconds: float = 3600,
+        watched: WatchedFiles | None = None,
+    ):
+        self.build_graph = build_graph
+        self.prepare_state = prepare_state
+        self.run_graph = run_graph
+        self.interval_seconds = interval_seconds
+        self.watched = watched or WatchedFiles(config_files)
+        # variables chargées du .env : celles retirées du fichier sont retirées de l'environnement
+        self._env_file = find_dotenv(usecwd=True)
+        self._env_values = _env_file_values(self._env_file)
+        self.agent = None
+        self.running = False
+        self.runs = 0
+        self.last_run: dict | None = None
+        self.next_run: float | None = None
+        self._trigger = threading.Event()
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_env(cls, build_graph: Callable, prepare_state: Callable, run_graph: Callable) -> "Daemon":
+        return cls(
+            build_graph,
+            prepare_state,
+            run_graph,
+            interval_seconds=float(get_environment_variable("DAEMON_INTERVAL_MINUTES", "60")) * 60,
+        )
+
+    def trigger(self):
+        self._trigger.set()
+
+    def stop(self):
+        self._stop.set()
+        self._trigger.set()
+
+    def reload_if_changed(self):
+        changed = self.watched.changed()
+        if not changed:
+            return
+        logger.info(Fore.CYAN + f"Démon : fichiers modifiés {changed}")
+        env_file = find_dotenv(usecwd=True) or self._env_file
+        if env_file and env_file in changed:
+            from app.services.adaptive_concurrency import get_concurrency_controller
+            from app.services.embedding_pool import get_embedding_pool
+            from app.services.embeddings import embedding_cache
+            from app.services.model_service import init_sentence_model
+            from app.services.semantic_search import get_embedding_model
+            from app.services.text_prep import get_text_preparer
+
+            embedding_before, pool_before = _settings(EMBEDDING_SETTINGS), _settings(POOL_SETTINGS)
+            text_before = _settings(TEXT_SETTINGS)
+            values = _env_file_values(env_file)
+            removed = [
+                key
+                for key, value in self._env_values.items()
+                if key not in values and os.environ.get(key) == value
+            ]
+            for key in removed:
+                del os.environ[key]
+            if removed:
+                logger.info(Fore.CYAN + f"Démon : variables retirées du .env {removed}")
+            load_dotenv(env_file, override=True)
+            self._env_file, self._env_values = env_file, values
+            # fetchers activés et noeuds optionnels lus à la construction du graphe
+            self.agent = None
+            get_concurrency_controller.cache_clear()
+            get_text_preparer.cache_clear()
+            embedding_changed = _settings(EMBEDDING_SETTINGS) != embedding_before
+            pool_changed = embedding_changed or _settings(POOL_SETTINGS) != pool_before
+            if embedding_changed or _settings(TEXT_SETTINGS) != text_before:
+                # clé du cache : lien + texte, sans le modèle ni la préparation du texte
+                logger.info(Fore.CYAN + "Démon : modèle ou texte encodé modifié, cache des embeddings vidé")
+                embedding_cache.clear()
+            if pool_changed and get_embedding_pool.cache_info().currsize:
+                logger.info(Fore.CYAN + "Démon : réglages du pool d'encodage modifiés, pool redémarré")
+                get_embedding_pool().close()
+                get_embedding_pool.cache_clear()
+            if embedding_changed:
+                logger.info(Fore.CYAN + "Démon : réglages d'embeddings modifiés, modèle rechargé")
+                init_sentence_model.cache_clear()
+                get_embedding_model.cache_clear()
+                warm_up()
+
+    def run_once(self):
+        self.reload_if_changed()
+        if self.agent is None:
+            self.agent = self.build_graph()
+        self.running = True
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            self.run_graph(self.agent, self.prepare_state())
+        except Exception as e:
+            status = f"erreur : {e}"
+            logger.exception(Fore.RED + f"Démon : exécution en échec ({e})")
+        finally:
+            self.running = False
+            self.runs += 1
+            seconds = time.perf_counter() - start
+            self.last_run = {"finished": time.time(), "seconds": round(seconds, 1), "status": status}
+            logger.info(Fore.MAGENTA + f"Démon : exécution {self.runs} terminée en {seconds:.1f}s ({status})")
+
+    def serve_forever(self, run_at_start: bool = True):
+        self.next_run = time.monotonic() + (0 if run_at_start else self.interval_seconds)
+        while not self._stop.is_set():
+            triggered = self._trigger.wait(max(0.0, self.next_run - time.monotonic()))
+            if self._stop.is_set():
+                break
+            self._trigger.clear()
+            self.run_once()
+            if not triggered:
+                # cadence fixe : une exécution longue ne décale pas les suivantes
+                while self.next_run <= time.monotonic():
+                    self.next_run += self.interval_seconds
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "runs": self.runs,
+            "last_run": self.last_run,
+            "next_run_in": round(max(0.0, self.next_run - time.monotonic())) if self.next_run else None,
+        }
+
+
+class TriggerHandler(BaseHTTPRequestHandler):
+    daemon: Daemon = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/status":
+            self._send_json(200, self.daemon.status())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") == "/run":
+            self.daemon.trigger()
+            logger.info(Fore.CYAN + "Démon : exécution demandée")
+            self._send_json(202, {"queued": True, "running": self.daemon.running})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+
+def start_trigger_server(daemon: Daemon, port: int, host: str = "127.0.0.1"):
+    """Interface locale de déclenchement, dans un thread : (serveur, URL)"""
+    handler = type("BoundTriggerHandler", (TriggerHandler,), {"daemon": daemon})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="daemon-trigger").start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def run_daemon(build_graph: Callable, prepare_state: Callable, run_graph: Callable):
+    """Commande --daemon : exécutions planifiées jusqu'à l'arrêt du processus"""
+    import signal
+
+    daemon = Daemon.from_env(build_graph, prepare_state, run_graph)
+    warm_up()
+    port = int(get_environment_variable("DAEMON_TRIGGER_PORT", "8765"))
+    server = None
+    if port:
+        server, url = start_trigger_server(daemon, port)
+        logger.info(Fore.GREEN + f"Démon : déclenchement à la demande POST {url}/run, état GET {url}/status")
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    logger.info(Fore.GREEN + f"Démon : une exécution toutes les {daemon.interval_seconds / 60:g} minutes")
+    try:
+        daemon.serve_forever(
+            run_at_start=is_env_enabled("DAEMON_RUN_AT_START", True)
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.shutdown()
+        logger.info(Fore.MAGENTA + "Démon arrêté")
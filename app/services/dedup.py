@@ -0,0 +1,221 @@
+"""
+Dédoublonnage exact des articles ramenés par les fetchers
+
+Une même actualité arrive souvent par plusieurs canaux : flux RSS du site, post Reddit
+pointant vers l'article, partage Bluesky du lien. Chaque article reçoit des clés :
+    - les URL canoniques de son lien et de son lien externe (Reddit/Bluesky), voir canonicalize_url
+    - l'empreinte de son contenu normalisé (titre + texte)
+Les articles partageant une clé forment un groupe (union-find, O(n)) dont on ne garde
+qu'un représentant : le mieux noté, sinon le plus riche en texte.
+
+Configuration .env :
+    DEDUP_ENABLED=true               active le dédoublonnage dans merge_fetched_articles
+    DEDUP_RESOLVE_REDIRECTS=false    résout les liens raccourcis (requête HEAD, mise en cache)
+"""
+
+import hashlib
+import re
+import unicodedata
+import urllib.request
+from collections import Counter
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import is_env_enabled
+
+# paramètres de suivi retirés des URL
+TRACKING_PARAMS = frozenset(
+    (
+        "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+        "ref", "ref_src", "ref_url", "referrer", "share", "cmpid", "xtor",
+        "_hsenc", "_hsmi", "mkt_tok", "spm", "amp", "si", "feature", "sr_share",
+    )
+)
+TRACKING_PREFIXES = ("utm_", "at_", "pk_", "mtm_", "__twitter", "oly_")
+# raccourcisseurs et redirections de flux résolus si DEDUP_RESOLVE_REDIRECTS=true
+REDIRECT_HOSTS = frozenset(
+    (
+        "t.co", "bit.ly", "buff.ly", "ow.ly", "lnkd.in", "dlvr.it", "goo.gl", "tinyurl.com",
+        "trib.al", "ift.tt", "feedproxy.google.com", "feeds.feedburner.com", "redd.it",
+    )
+)
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+# URL du cache AMP de Google : /amp/s/<hôte>/<chemin>
+_AMP_CACHE = re.compile(r"^/amp/(s/)?(?P<host>[^/]+)(?P<path>/.*)?$")
+_NON_WORD = re.compile(r"[\W_]+")
+# en dessous, le contenu est trop court pour identifier une actualité (« Nouvel article »...)
+MIN_HASH_CHARS = 40
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+@lru_cache(maxsize=4096)
+def resolve_redirect(url: str, timeout: float = 5) -> str:
+    """URL finale d'un lien raccourci (HEAD, redirections suivies), l'URL d'origine en cas d'échec"""
+    try:
+        request = urllib.request.Request(
+            url, method="HEAD", headers={"User-Agent": "TechnoWatch 1.0"}
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.geturl()
+    except Exception as e:
+        logger.debug(f"Redirection non résolue pour {url} : {e}")
+        return url
+
+
+def canonicalize_url(url: str | None, resolve_redirects: bool = False) -> str | None:
+    """
+    Forme canonique d'une URL pour comparaison :
+    schéma http(s) unifié, hôte en minuscules sans www./m./amp., port par défaut retiré,
+    variantes AMP (/amp, .amp.html, cache Google AMP), paramètres de suivi, fragment
+    et slash final supprimés, paramètres restants triés.
+    """
+    if not url or not url.strip() or url.strip() == "#":
+        return None
+    url = url.strip()
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return url
+    host = (parts.hostname or "").lower()
+    if resolve_redirects and host in REDIRECT_HOSTS:
+        resolved = resolve_redirect(url)
+        if resolved != url:
+            return canonicalize_url(resolved)
+
+    path = parts.path or "/"
+    amp_cache = _AMP_CACHE.match(path) if host.startswith("www.google.") else None
+    if amp_cache:
+        host, path = amp_cache.group("host").lower(), amp_cache.group("path") or "/"
+    for prefix in ("www.", "m.", "amp."):
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix) :]
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(parts.scheme):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r"/{2,}", "/", path)
+    if path.endswith(".amp.html"):
+        path = path[: -len(".amp.html")] + ".html"
+    segments = [s for s in path.split("/") if s]
+    if segments and segments[-1].lower() == "amp":
+        segments = segments[:-1]
+    elif segments and segments[0].lower() == "amp":
+        segments = segments[1:]
+    path = "/" + "/".join(segments)
+
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def normalize_text(article: dict) -> str:
+    """Titre et texte normalisés : casse, accents, ponctuation et espaces"""
+    text = f"{article.get('title') or ''} {article.get('summary') or ''}"
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def content_hash(article: dict) -> str | None:
+    """Empreinte du titre et du texte normalisés (casse, accents, ponctuation, espaces)"""
+    text = normalize_text(article)
+    if len(text) < MIN_HASH_CHARS:
+        return None
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _relevance(article: dict) -> float:
+    """Score de pertinence "NN %" (les scores Reddit en votes ne sont pas comparables)"""
+    score = article.get("score")
+    if isinstance(score, str) and score.endswith("%"):
+        try:
+            return float(score[:-1])
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def richness(article: dict) -> tuple[float, int]:
+    """Critère de choix du représentant d'un groupe : pertinence puis longueur du texte"""
+    return _relevance(article), len(article.get("summary") or "")
+
+
+def source_name(article: dict) -> str:
+    source = article.get("source")
+    return getattr(source, "value", source) or "inconnue"
+
+
+def dedup_articles(
+    articles: list[dict], resolve_redirects: bool = False
+) -> tuple[list[dict], Counter]:
+    """
+    Regroupe les doublons exacts (URL canonique ou contenu identique) et garde un
+    représentant par groupe, à la position du premier article du groupe.
+
+    Returns:
+        (articles uniques, nombre d'articles retirés par source)
+    """
+    parent = list(range(len(articles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner_by_key: dict[str, int] = {}
+    for i, article in enumerate(articles):
+        keys = {
+            canonicalize_url(article.get(field), resolve_redirects)
+            for field in ("link", "external_url")
+        }
+        keys.add(content_hash(article))
+        keys.discard(None)
+        for key in keys:
+            owner = owner_by_key.setdefault(key, i)
+            root_owner, root_i = find(owner), find(i)
+            if root_owner != root_i:
+                # le plus petit indice reste racine : ordre d'origine conservé
+                parent[max(root_owner, root_i)] = min(root_owner, root_i)
+
+    best: dict[int, int] = {}
+    for i, article in enumerate(articles):
+        root = find(i)
+        if root not in best or richness(article) > richness(articles[best[root]]):
+            best[root] = i
+
+    kept = set(best.values())
+    unique = [articles[best[root]] for root in sorted(best)]
+    removed = Counter(
+        source_name(article) for i, article in enumerate(articles) if i not in kept
+    )
+    return unique, removed
+
+
+def is_dedup_enabled() -> bool:
+    return is_env_enabled("DEDUP_ENABLED", True)
+
+
+def dedup_fetched_articles(articles: list[dict]) -> list[dict]:
+    """Dédoublonnage configuré par le .env, avec le décompte des retraits par source"""
+    resolve_redirects = is_env_enabled("DEDUP_RESOLVE_REDIRECTS", False)
+    unique, removed = dedup_articles(articles, resolve_redirects)
+    if removed:
+        details = ", ".join(f"{source}: {count}" for source, count in removed.items())
+        logger.info(
+            Fore.LIGHTMAGENTA_EX
+            + f"Dédoublonnage : {len(articles)} -> {len(unique)} articles (retirés par source : {details})"
+        )
+    else:
+        logger.info(f"Dédoublonnage : aucun doublon parmi {len(articles)} articles")
+    return unique
@@ -0,0 +1,125 @@
+"""
+Backends d'inférence du modèle d'embeddings (EMBEDDING_BACKEND)
+
+    torch        PyTorch fp32 (comportement historique, GPU si disponible)
+    torch-int8   PyTorch, couches Linear quantifiées dynamiquement en int8 (CPU, sans dépendance)
+    onnx         export ONNX exécuté par onnxruntime (CPU)
+    onnx-int8    export ONNX quantifié dynamiquement en int8 (onnxruntime, CPU)
+
+Les backends ONNX nécessitent `pip install "sentence-transformers[onnx]"` (optimum, onnxruntime).
+Un modèle du hub qui ne publie pas de variante int8 est exporté et quantifié une seule fois
+dans EMBEDDING_ONNX_DIR, selon le jeu d'instructions EMBEDDING_ONNX_QUANTIZATION
+(arm64, avx2, avx512, avx512_vnni).
+
+Les vecteurs quantifiés s'écartent légèrement de ceux du modèle fp32 : parity_report mesure
+cet écart sur les scores mots-clés / articles (voir tests/bench/bench_embedding_backends.py).
+
+Configuration .env :
+    EMBEDDING_BACKEND=torch
+    EMBEDDING_ONNX_QUANTIZATION=avx2
+    EMBEDDING_ONNX_DIR=./data/onnx_models
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def get_embedding_backend() -> str:
+    backend = get_environment_variable("EMBEDDING_BACKEND", "torch").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"EMBEDDING_BACKEND={backend} inconnu, valeurs possibles : {', '.join(BACKENDS)}")
+    return backend
+
+
+def quantize_dynamic_int8(model):
+    """Quantification dynamique int8 des couches Linear (poids int8, activations quantifiées à la volée)"""
+    import torch
+
+    model.to("cpu").eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _onnx_int8_model(model_name: str):
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    config = get_environment_variable("EMBEDDING_ONNX_QUANTIZATION", "avx2")
+    file_name = f"onnx/model_qint8_{config}.onnx"
+    local_dir = Path(get_environment_variable("EMBEDDING_ONNX_DIR", "./data/onnx_models")) / model_name.replace("/", "__")
+    if (local_dir / file_name).exists():
+        return SentenceTransformer(
+            str(local_dir), device="cpu", backend="onnx", model_kwargs={"file_name": file_name}
+        )
+    try:
+        # variante déjà publiée sur le hub (modèles sentence-transformers usuels)
+        return SentenceTransformer(
+            model_name, device="cpu", backend="onnx", model_kwargs={"file_name": file_name}
+        )
+    except Exception as e:
+        logger.info(Fore.CYAN + f"Pas de variante {file_name} pour {model_name} ({e}) : export local")
+
+    model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+    model.save(str(local_dir))
+    export_dynamic_quantized_onnx_model(model, config, str(local_dir))
+    return SentenceTransformer(
+        str(local_dir), device="cpu", backend="onnx", model_kwargs={"file_name": file_name}
+    )
+
+
+def load_sentence_model(model_name: str, backend: str = "torch", device: str = "cpu"):
+    """SentenceTransformer pour le backend demandé (les backends quantifiés / ONNX sont CPU)"""
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name, device=device)
+    if backend == "torch-int8":
+        return quantize_dynamic_int8(SentenceTransformer(model_name, device="cpu"))
+    if backend == "onnx":
+        return SentenceTransformer(model_name, device="cpu", backend="onnx")
+    if backend == "onnx-int8":
+        return _onnx_int8_model(model_name)
+    raise ValueError(f"Backend d'embeddings inconnu : {backend}")
+
+
+def parity_report(
+    reference_model,
+    candidate_model,
+    keywords: list[str],
+    texts: list[str],
+    threshold: float | None = None,
+) -> dict:
+    """
+    Écart des scores (similarité cosinus texte / mot-clé) du candidat par rapport au modèle
+    de référence (fp32) : écart absolu moyen / max, meilleur mot-clé inchangé, et décisions
+    du filtre sémantique (score max >= threshold) qui basculent.
+    """
+    from app.services.embeddings import encode_texts
+
+    if threshold is None:
+        threshold = float(get_environment_variable("THRESHOLD_SEMANTIC_SEARCH", "0.5"))
+    scores = []
+    for model in (reference_model, candidate_model):
+        scores.append(encode_texts(model, texts) @ encode_texts(model, keywords).T)
+    reference, candidate = scores
+    drift = np.abs(candidate - reference)
+    return {
+        "texts": len(texts),
+        "keywords": len(keywords),
+        "mean_abs_drift": float(drift.mean()),
+        "max_abs_drift": float(drift.max()),
+        "top_keyword_agreement": float(
+            np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1))
+        ),
+        "filter_flips": int(
+            np.sum((reference.max(axis=1) >= threshold) != (candidate.max(axis=1) >= threshold))
+        ),
+    }
@@ -0,0 +1,126 @@
+"""
+Pool de processus d'encodage pour les gros lots d'embeddings sur CPU
+
+Un seul processus SentenceTransformer laisse des coeurs inoccupés (le parallélisme
+intra-op de torch passe mal à l'échelle au-delà de quelques threads pour MiniLM).
+Le pool répartit un lot sur EMBEDDING_WORKERS processus, chacun limité à
+EMBEDDING_THREADS_PER_WORKER threads torch, avec le modèle chargé une fois par processus
+et gardé chaud d'un appel à l'autre.
+
+Répartition : les textes sont triés par longueur en tokens puis découpés en paquets de
+longueurs voisines (peu de padding dans chaque lot), les paquets les plus longs étant
+distribués en premier (équilibrage dynamique entre processus).
+
+Configuration .env :
+    EMBEDDING_WORKERS=0                   0 : encodage dans le processus courant
+    EMBEDDING_THREADS_PER_WORKER=1        threads torch par processus
+    EMBEDDING_POOL_MIN_BATCH=256          en dessous, encodage dans le processus courant
+    EMBEDDING_POOL_CHUNK=64               textes par paquet envoyé à un processus
+"""
+
+import atexit
+import multiprocessing
+from functools import lru_cache
+
+import numpy as np
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable
+
+_worker_model = None
+
+
+def _init_worker(threads: int):
+    """Initialisation d'un processus du pool : threads torch bornés, modèle chargé une fois"""
+    global _worker_model
+    import torch
+
+    from app.services.model_service import init_sentence_model
+
+    _worker_model = init_sentence_model()
+    # après init_sentence_model, qui applique EMBEDDING_THREADS au processus
+    torch.set_num_threads(threads)
+
+
+def _encode_chunk(chunk: tuple[list[int], list[str]]) -> tuple[list[int], np.ndarray]:
+    from app.services.embeddings import encode_texts
+
+    indices, texts = chunk
+    return indices, encode_texts(_worker_model, texts, batch_size=len(texts))
+
+
+def text_lengths(texts: list[str], model=None) -> list[int]:
+    """Longueur en tokens (tokenizer du modèle s'il est fourni), sinon en caractères"""
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return [len(text) for text in texts]
+    return [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+
+def length_sorted_chunks(lengths: list[int], chunk_size: int) -> list[list[int]]:
+    """Indices regroupés par paquets de longueurs voisines, paquets les plus longs d'abord"""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    return [order[start : start + chunk_size] for start in range(0, len(order), chunk_size)]
+
+
+class EmbeddingPool:
+    """Processus d'encodage gardés chauds (modèle chargé à l'initialisation de chaque processus)"""
+
+    def __init__(self, workers: int, threads_per_worker: int = 1, chunk_size: int = 64):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.chunk_size = chunk_size
+        # spawn : pas de fork d'un processus qui a déjà initialisé torch et ses threads
+        self._pool = multiprocessing.get_context("spawn").Pool(
+            workers, initializer=_init_worker, initargs=(threads_per_worker,)
+        )
+        logger.info(
+            Fore.CYAN
+            + f"Pool d'embeddings : {workers} processus x {threads_per_worker} thread(s)"
+        )
+
+    def encode(self, texts: list[str], model=None) -> np.ndarray:
+        """Vecteurs normalisés des textes, dans l'ordre des textes"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        chunks = [
+            (indices, [texts[i] for i in indices])
+            for indices in length_sorted_chunks(text_lengths(texts, model), self.chunk_size)
+        ]
+        vectors = None
+        for indices, encoded in self._pool.imap_unordered(_encode_chunk, chunks):
+            if vectors is None:
+                vectors = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+            vectors[indices] = encoded
+        return vectors
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+
+def embedding_workers() -> int:
+    return int(get_environment_variable("EMBEDDING_WORKERS", "0"))
+
+
+def use_embedding_pool(batch_size: int) -> bool:
+    """Le lot est assez gros pour être réparti sur le pool (EMBEDDING_WORKERS > 0)"""
+    return embedding_workers() > 0 and batch_size >= int(
+        get_environment_variable("EMBEDDING_POOL_MIN_BATCH", "256")
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embedding_pool() -> EmbeddingPool:
+    """Pool partagé par l'exécution, démarré au premier gros lot et fermé à la sortie"""
+    pool = EmbeddingPool(
+        embedding_workers(),
+        threads_per_worker=int(get_environment_variable("EMBEDDING_THREADS_PER_WORKER", "1")),
+        chunk_size=int(get_environment_variable("EMBEDDING_POOL_CHUNK", "64")),
+    )
+    atexit.register(pool.close)
+    return pool
@@ -0,0 +1,244 @@
+"""
+Mesure du débit d'embeddings et réglage automatique par hôte
+
+    python -m app --tune-embeddings [--tune-models all-MiniLM-L6-v2,...] [--tune-batch-sizes 16,32,64]
+                                    [--tune-threads 1,2,4,8] [--tune-devices cpu,cuda] [--tune-texts 512]
+
+Chaque modèle candidat est chargé par le chemin réel (init_sentence_model, EMBEDDING_BACKEND
+compris) dans un processus dédié, pour isoler temps de chargement et mémoire maximale (RSS).
+Le corpus est un échantillon des articles sauvegardés (préparés comme par le filtre), ou un
+corpus synthétique si la base en contient trop peu. Pour chaque combinaison nombre de threads
+torch / taille de lot, le débit (textes/s) est mesuré.
+
+La meilleure combinaison (débit maximal sous EMBEDDING_TUNE_MAX_MEMORY_MB) est écrite dans
+EMBEDDING_TUNING_FILE ; init_sentence_model et encode_texts la lisent. Une variable définie
+dans l'environnement ou le .env reste prioritaire sur le fichier.
+
+Configuration .env :
+    EMBEDDING_TUNING_FILE=./data/embedding_tuning.json
+    EMBEDDING_TUNE_MAX_MEMORY_MB=       mémoire maximale acceptée (vide : sans limite)
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable
+
+# réglages écrits dans le fichier de tuning (même nom que la variable d'environnement)
+TUNED_SETTINGS = ("MODEL_EMBEDDINGS", "EMBEDDING_DEVICE", "EMBEDDING_THREADS", "EMBEDDING_BATCH_SIZE")
+DEFAULT_MODEL_EMBEDDINGS = "all-MiniLM-L6-v2"
+MIN_SAMPLE_ARTICLES = 100
+_SYNTHETIC_WORDS = (
+    "security vulnerability patch release python django model agent inference kernel "
+    "cloud container cluster database query latency benchmark framework library update "
+    "attack exploit researchers open source performance memory compiler runtime network"
+).split()
+
+
+def tuning_file() -> Path:
+    return Path(get_environment_variable("EMBEDDING_TUNING_FILE", "./data/embedding_tuning.json"))
+
+
+@lru_cache(maxsize=1)
+def _tuned_settings(path: str, mtime: float) -> dict:
+    return json.loads(Path(path).read_text()).get("recommended", {})
+
+
+def embedding_setting(name: str, default: str | None = None) -> str | None:
+    """Réglage d'embeddings : environnement / .env, sinon fichier de tuning, sinon default"""
+    value = get_environment_variable(name)
+    if value:
+        return value
+    path = tuning_file()
+    if path.exists():
+        tuned = _tuned_settings(str(path), path.stat().st_mtime)
+        if tuned.get(name) is not None:
+            return str(tuned[name])
+    return default
+
+
+def synthetic_corpus(count: int, seed: int = 0) -> list[str]:
+    """Textes de longueurs variées (titre court, contenu de 20 à 400 mots)"""
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choices(_SYNTHETIC_WORDS, k=rng.randint(20, 400))) for _ in range(count)
+    ]
+
+
+def sample_corpus(count: int, session_factory=None) -> tuple[list[str], str]:
+    """Titre + résumé des articles sauvegardés les plus récents, sinon corpus synthétique"""
+    from app.db.db import Article
+
+    if session_factory is None:
+        from app.db.db import SessionLocal
+
+        session_factory = SessionLocal
+    try:
+        with session_factory() as session:
+            rows = (
+                session.query(Article.title, Article.summary)
+                .order_by(Article.id.desc())
+                .limit(count)
+                .all()
+            )
+    except Exception as e:
+        logger.warning(Fore.YELLOW + f"Lecture des articles impossible ({e}) : corpus synthétique")
+        rows = []
+    if len(rows) < min(count, MIN_SAMPLE_ARTICLES):
+        return synthetic_corpus(count), "synthétique"
+    texts = [f"{title} {summary}" for title, summary in rows]
+    return (texts * (count // len(texts) + 1))[:count], "articles sauvegardés"
+
+
+def _peak_memory_mb() -> float:
+    # ru_maxrss : Ko sous Linux, octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def _measure_model(model_name: str, device: str, texts: list[str], threads: list[int], batch_sizes: list[int]) -> list[dict]:
+    """Exécuté dans un processus dédié : chargement par init_sentence_model puis grille threads x lots"""
+    import torch
+
+    os.environ["MODEL_EMBEDDINGS"] = model_name
+    os.environ["EMBEDDING_DEVICE"] = device
+    from app.services.embeddings import encode_texts
+    from app.services.model_service import init_sentence_model
+    from app.services.text_prep import get_text_preparer
+
+    start = time.perf_counter()
+    model = init_sentence_model()
+    load_time = time.perf_counter() - start
+    preparer = get_text_preparer(model)
+    prepared = [chunk for text in texts for chunk in preparer.prepare("", text)]
+
+    results = []
+    for thread_count in threads:
+        torch.set_num_threads(thread_count)
+        for batch_size in batch_sizes:
+            encode_texts(model, prepared[:batch_size], batch_size=batch_size)  # préchauffage
+            start = time.perf_counter()
+            encode_texts(model, prepared, batch_size=batch_size)
+            duration = time.perf_counter() - start
+            results.append(
+                {
+                    "model": model_name,
+                    "device": device,
+                    "threads": thread_count,
+                    "batch_size": batch_size,
+                    "texts_per_second": round(len(prepared) / duration, 1),
+                    "load_seconds": round(load_time, 2),
+                    "peak_memory_mb": round(_peak_memory_mb(), 1),
+                }
+            )
+    return results
+
+
+def run_tuning(
+    models: list[str],
+    batch_sizes: list[int],
+    threads: list[int],
+    devices: list[str],
+    texts: list[str],
+) -> list[dict]:
+    """Mesures de toutes les combinaisons, un processus par (modèle, device)"""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for model_name in models:
+        for device in devices:
+            logger.info(Fore.CYAN + f"Mesure de {model_name} sur {device}...")
+            try:
+                with context.Pool(1) as pool:
+                    results.extend(
+                        pool.apply(_measure_model, (model_name, device, texts, threads, batch_sizes))
+                    )
+            except Exception as e:
+                logger.warning(Fore.YELLOW + f"{model_name} sur {device} ignoré : {e}")
+    return results
+
+
+def recommend(results: list[dict], max_memory_mb: float | None = None) -> dict | None:
+    """Meilleur débit sous la limite mémoire (à débit égal, la moins gourmande)"""
+    eligible = [
+        r for r in results if max_memory_mb is None or r["peak_memory_mb"] <= max_memory_mb
+    ]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda r: (r["texts_per_second"], -r["peak_memory_mb"]))
+
+
+def write_tuning_file(path: Path, best: dict, results: list[dict], corpus: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    content = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "host": {
+            "node": platform.node(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "corpus": corpus,
+        "recommended": {
+            "MODEL_EMBEDDINGS": best["model"],
+            "EMBEDDING_DEVICE": best["device"],
+            "EMBEDDING_THREADS": best["threads"],
+            "EMBEDDING_BATCH_SIZE": best["batch_size"],
+        },
+        "results": results,
+    }
+    path.write_text(json.dumps(content, indent=2, ensure_ascii=False))
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def tune_embeddings(args) -> dict | None:
+    """Commande --tune-embeddings : mesures, tableau des résultats, écriture du fichier de tuning"""
+    import torch
+
+    models = (args.tune_models or get_environment_variable("MODEL_EMBEDDINGS", DEFAULT_MODEL_EMBEDDINGS)).split(",")
+    devices = (args.tune_devices or ("cpu,cuda" if torch.cuda.is_available() else "cpu")).split(",")
+    threads = _int_list(args.tune_threads) if args.tune_threads else sorted(
+        {1, 2, 4, 8, os.cpu_count() or 1} & set(range(1, (os.cpu_count() or 1) + 1))
+    )
+    texts, corpus = sample_corpus(args.tune_texts)
+    logger.info(
+        Fore.CYAN
+        + f"Tuning embeddings : {len(texts)} textes ({corpus}), modèles {models}, devices {devices}, "
+        f"threads {threads}, lots {args.tune_batch_sizes}"
+    )
+    results = run_tuning(models, _int_list(args.tune_batch_sizes), threads, devices, texts)
+
+    print(f"{'modèle':<40} {'device':<6} {'threads':>7} {'lot':>5} {'textes/s':>9} {'chargement':>10} {'mémoire':>9}")
+    for r in sorted(results, key=lambda r: -r["texts_per_second"]):
+        print(
+            f"{r['model'][:40]:<40} {r['device']:<6} {r['threads']:>7} {r['batch_size']:>5} "
+            f"{r['texts_per_second']:>9.1f} {r['load_seconds']:>9.2f}s {r['peak_memory_mb']:>7.0f}Mo"
+        )
+
+    max_memory = get_environment_variable("EMBEDDING_TUNE_MAX_MEMORY_MB")
+    best = recommend(results, float(max_memory) if max_memory else None)
+    if best is None:
+        logger.error("Aucune combinaison mesurée (ou sous la limite mémoire) : fichier de tuning inchangé")
+        return None
+    path = tuning_file()
+    write_tuning_file(path, best, results, corpus)
+    logger.info(
+        Fore.GREEN
+        + f"Recommandé : {best['model']} sur {best['device']}, {best['threads']} threads, lots de "
+        f"{best['batch_size']} ({best['texts_per_second']} textes/s) -> {path}"
+    )
+    return best
@@ -0,0 +1,168 @@
+"""
+Embeddings des articles, calculés une seule fois par exécution
+
+Le filtre sémantique (filter_nodes) encode chaque article ; les étapes suivantes
+(nouveauté, regroupement par sujet, indexation à la sauvegarde) relisent ces vecteurs
+depuis ce cache au lieu de les recalculer. Les vecteurs sont normalisés L2 (float32) :
+le produit scalaire est la similarité cosinus.
+
+Le cache est indexé par lien et par empreinte du texte : un article dont le contenu
+change (commentaires Reddit...) est ré-encodé. EMBEDDING_CACHE_SIZE borne sa taille.
+
+Les textes sont préparés dans le budget de tokens du modèle avant encodage (text_prep) ;
+en mode chunks, le vecteur d'un article est la moyenne normalisée de ceux de ses fenêtres,
+conservés aussi pour la similarité maximale du filtre (encode_article_chunks).
+"""
+
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
+from app.core.utils import get_environment_variable
+from app.services.embedding_pool import get_embedding_pool, use_embedding_pool
+from app.services.text_prep import get_text_preparer
+
+
+def article_text(article: dict) -> str:
+    """Texte encodé pour un article : titre et contenu"""
+    return f"{article.get('title') or ''} {article.get('summary') or ''}".strip()
+
+
+def _cache_key(article: dict) -> str:
+    digest = hashlib.sha1(article_text(article).encode("utf-8")).hexdigest()
+    return f"{article.get('link') or ''}\x00{digest}"
+
+
+class EmbeddingCache:
+    """Cache LRU des embeddings d'articles (clé : lien + empreinte du texte)"""
+
+    def __init__(self, max_size: int | None = None):
+        self.max_size = max_size or int(
+            get_environment_variable("EMBEDDING_CACHE_SIZE", "20000")
+        )
+        self._vectors: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._chunks: dict[str, np.ndarray] = {}
+        self._by_link: dict[str, str] = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._vectors)
+
+    def get(self, article: dict) -> np.ndarray | None:
+        key = _cache_key(article)
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is not None:
+                self._vectors.move_to_end(key)
+            return vector
+
+    def get_by_link(self, link: str) -> np.ndarray | None:
+        """Dernier embedding calculé pour ce lien (le résumé LLM a remplacé le contenu)"""
+        with self._lock:
+            key = self._by_link.get(link)
+            return self._vectors.get(key) if key else None
+
+    def get_chunks(self, article: dict) -> np.ndarray | None:
+        """Vecteurs des fenêtres de l'article (mode chunks), sinon son seul vecteur"""
+        key = _cache_key(article)
+        with self._lock:
+            if key not in self._vectors:
+                return None
+            return self._chunks.get(key, self._vectors[key][None, :])
+
+    def put(self, article: dict, vector: np.ndarray, chunks: np.ndarray | None = None):
+        key = _cache_key(article)
+        with self._lock:
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+            if chunks is not None and len(chunks) > 1:
+                self._chunks[key] = chunks
+            else:
+                self._chunks.pop(key, None)
+            if article.get("link"):
+                self._by_link[article["link"]] = key
+            while len(self._vectors) > self.max_size:
+                old_key, _ = self._vectors.popitem(last=False)
+                self._chunks.pop(old_key, None)
+                link = old_key.split("\x00", 1)[0]
+                if self._by_link.get(link) == old_key:
+                    del self._by_link[link]
+
+    def clear(self):
+        with self._lock:
+            self._vectors.clear()
+            self._chunks.clear()
+            self._by_link.clear()
+
+
+embedding_cache = EmbeddingCache()
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def encode_texts(model, texts: list[str], batch_size: int | None = None) -> np.ndarray:
+    """Encodage par lots (EMBEDDING_BATCH_SIZE, 32 par défaut), vecteurs normalisés L2"""
+    if batch_size is None:
+        from app.services.embedding_tuning import embedding_setting
+
+        batch_size = int(embedding_setting("EMBEDDING_BATCH_SIZE", "32"))
+    vectors = model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return normalize(vectors)
+
+
+def encode_article_chunks(
+    articles: list[dict], model=None, cache: EmbeddingCache | None = None
+) -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    Embeddings normalisés des articles (une ligne par article) et vecteurs de leurs
+    fenêtres (une matrice par article, une seule ligne hors mode chunks). Seuls les
+    articles absents du cache sont encodés, en un seul lot (réparti sur le pool de
+    processus d'encodage s'il est activé, voir embedding_pool).
+    """
+    # un cache vide est faux (len 0) : test explicite
+    cache = embedding_cache if cache is None else cache
+    chunks: list[np.ndarray | None] = [cache.get_chunks(article) for article in articles]
+    missing = [i for i, article_chunks in enumerate(chunks) if article_chunks is None]
+    if missing:
+        if model is None:
+            from app.services.model_service import init_sentence_model
+
+            model = init_sentence_model()
+        preparer = get_text_preparer(model)
+        prepared = [preparer.prepare_article(articles[i]) for i in missing]
+        texts = [text for article_texts in prepared for text in article_texts]
+        if use_embedding_pool(len(texts)):
+            encoded = get_embedding_pool().encode(texts, model)
+        else:
+            encoded = encode_texts(model, texts)
+        start = 0
+        for i, article_texts in zip(missing, prepared):
+            article_chunks = encoded[start : start + len(article_texts)]
+            start += len(article_texts)
+            vector = normalize(article_chunks.mean(axis=0, keepdims=True))[0]
+            cache.put(articles[i], vector, article_chunks)
+            chunks[i] = article_chunks
+    if not chunks:
+        return np.empty((0, 0), dtype=np.float32), []
+    # une seule fenêtre : le vecteur de l'article ; sinon leur moyenne normalisée
+    vectors = normalize(np.vstack([c.mean(axis=0) for c in chunks]))
+    return vectors, chunks
+
+
+def encode_articles(
+    articles: list[dict], model=None, cache: EmbeddingCache | None = None
+) -> np.ndarray:
+    """Embeddings normalisés des articles (une ligne par article), voir encode_article_chunks"""
+    return encode_article_chunks(articles, model, cache)[0]
@@ -10,6 +10,8 @@ from app.services.fetchers.base_fetcher import BaseFetcher
 
 class FetcherFactory:
     _fetchers = {}
+    # fetchers déjà créés (sessions Bluesky / Reddit réutilisées d'une exécution à l'autre)
+    _instances = {}
 
     @classmethod
     def register_fetcher(cls, source_type: SourceType, fetcher_class: type):
@@ -21,6 +23,14 @@ class FetcherFactory:
             raise ValueError(f"No fetcher registered for {source_type}")
         return cls._fetchers[source_type](**kwargs)
 
+    @classmethod
+    def get_fetcher(cls, source_type: SourceType, **kwargs) -> BaseFetcher:
+        """Fetcher partagé pour ces paramètres, créé (connexion, login) au premier appel"""
+        key = (source_type, cls._fetchers.get(source_type), tuple(sorted(kwargs.items())))
+        if key not in cls._instances:
+            cls._instances[key] = cls.create_fetcher(source_type, **kwargs)
+        return cls._instances[key]
+
 
 class FetcherRegistry:
     """Registry qui auto-découvre les sous-classes de BaseFetcher."""
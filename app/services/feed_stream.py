@@ -0,0 +1,172 @@
+"""
+Lecture en flux des documents RSS/Atom
+
+Le document est téléchargé par blocs et analysé au fil de l'eau (xml.etree.XMLPullParser) :
+chaque item/entry est restitué dès sa balise fermante puis libéré, sans jamais charger
+l'arbre complet. L'appelant peut ainsi s'arrêter dès que les entrées dépassent la date
+limite (flux triés par date) : le reste du document n'est ni téléchargé ni analysé.
+
+Les entrées produites sont des FeedParserDict avec les champs utilisés par RSSFetcher
+(title, link, summary, content, published_parsed, updated_parsed), HTML assaini
+comme le fait feedparser.
+"""
+
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable, Iterator
+
+import feedparser
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+
+# fonctions internes de feedparser (6.x) : en leur absence, RSSFetcher revient à feedparser.parse
+try:
+    from feedparser.datetimes import _parse_date
+    from feedparser.sanitizer import _sanitize_html
+
+    STREAMING_SUPPORTED = True
+except ImportError:
+    STREAMING_SUPPORTED = False
+    logger.warning(
+        Fore.YELLOW
+        + f"feedparser {feedparser.__version__} : lecture en flux indisponible, analyse complète utilisée"
+    )
+
+CHUNK_SIZE = 64 * 1024
+XHTML_NS = "{http://www.w3.org/1999/xhtml}"
+
+_ENTRY_TAGS = frozenset(("item", "entry"))
+# balises de date par ordre de priorité (RSS 2.0, Atom, Dublin Core)
+_PUBLISHED_TAGS = ("pubDate", "published", "issued", "date")
+_UPDATED_TAGS = ("updated", "modified")
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_document_chunks(
+    url: str, max_bytes: int, agent: str, timeout: float = 30, stats: dict | None = None
+) -> Iterator[bytes]:
+    """
+    Blocs d'octets du document (URL http(s)/file ou chemin local), au plus max_bytes octets.
+    La connexion est fermée dès que le consommateur abandonne le générateur.
+    stats["bytes"] reçoit le nombre d'octets lus.
+    """
+    if "://" not in url:
+        stream = open(url, "rb")
+    else:
+        request = urllib.request.Request(url, headers={"User-Agent": agent})
+        stream = urllib.request.urlopen(request, timeout=timeout)
+    stats = stats if stats is not None else {}
+    stats["bytes"] = 0
+    with stream:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            remaining = max_bytes - stats["bytes"] if max_bytes > 0 else len(chunk)
+            if len(chunk) > remaining:
+                stats["bytes"] += remaining
+                yield chunk[:remaining]
+                logger.warning(
+                    Fore.YELLOW
+                    + f"Document {url} tronqué à {max_bytes} octets (RSS_MAX_BYTES)"
+                )
+                return
+            stats["bytes"] += len(chunk)
+            yield chunk
+
+
+def _inner_xhtml(elem: ET.Element) -> str:
+    """Contenu Atom type="xhtml" : sérialisation des enfants du <div> englobant"""
+    container = elem[0] if len(elem) and _local_name(elem[0].tag) == "div" else elem
+    for node in container.iter():
+        if node.tag.startswith(XHTML_NS):
+            node.tag = node.tag[len(XHTML_NS) :]
+    return (container.text or "") + "".join(
+        ET.tostring(child, encoding="unicode") for child in container
+    )
+
+
+def _element_text(elem: ET.Element) -> str:
+    if elem.get("type") == "xhtml":
+        return _inner_xhtml(elem)
+    return elem.text or ""
+
+
+def _entry_link(elem: ET.Element) -> str | None:
+    for child in elem:
+        if _local_name(child.tag) != "link":
+            continue
+        href = child.get("href")
+        if href is None:
+            return (child.text or "").strip() or None
+        if child.get("rel", "alternate") == "alternate":
+            return href
+    return None
+
+
+def element_to_entry(elem: ET.Element) -> feedparser.FeedParserDict:
+    """Convertit un élément item (RSS) ou entry (Atom) en entrée au format feedparser"""
+    fields: dict[str, ET.Element] = {}
+    for child in elem:
+        fields.setdefault(_local_name(child.tag), child)
+    entry = feedparser.FeedParserDict()
+
+    if "title" in fields:
+        entry["title"] = _element_text(fields["title"]).strip()
+    link = _entry_link(elem)
+    if link:
+        entry["link"] = link
+
+    summary = fields.get("description", fields.get("summary"))
+    if summary is not None:
+        entry["summary"] = _sanitize_html(_element_text(summary), "utf-8", "text/html")
+    # content:encoded (RSS) ou content (Atom)
+    content = fields.get("encoded", fields.get("content"))
+    if content is not None:
+        entry["content"] = [
+            feedparser.FeedParserDict(
+                value=_sanitize_html(_element_text(content), "utf-8", "text/html")
+            )
+        ]
+
+    for key, tags in (("published", _PUBLISHED_TAGS), ("updated", _UPDATED_TAGS)):
+        for tag in tags:
+            if tag in fields and fields[tag].text:
+                parsed = _parse_date(fields[tag].text.strip())
+                if parsed:
+                    entry[key] = fields[tag].text.strip()
+                    entry[f"{key}_parsed"] = parsed
+                    break
+    return entry
+
+
+def iter_feed_entries(chunks: Iterable[bytes]) -> Iterator[feedparser.FeedParserDict]:
+    """
+    Entrées du flux, produites au fil de l'analyse incrémentale des blocs.
+    Chaque élément est libéré (clear + détaché de son parent) une fois converti.
+    Lève xml.etree.ElementTree.ParseError si le document n'est pas du XML bien formé.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: list[ET.Element] = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                continue
+            stack.pop()
+            # on ne traite que les entrées de premier niveau (pas d'entrées imbriquées)
+            if _local_name(elem.tag) in _ENTRY_TAGS and not any(
+                _local_name(parent.tag) in _ENTRY_TAGS for parent in stack
+            ):
+                yield element_to_entry(elem)
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
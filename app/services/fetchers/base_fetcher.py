@@ -3,6 +3,9 @@ from app.services.models import Source
 
 
 class BaseFetcher(ABC):
+    # octets transférés lors du dernier fetch_articles, si connus (suivi de santé des sources)
+    last_bytes: int | None = None
+
     @abstractmethod
     def fetch_articles(self, source: Source, max_days: int) -> list[dict]:
         pass
@@ -1,4 +1,3 @@
-import aiohttp
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
@@ -63,7 +62,7 @@ class BlueskyFetcher(BaseFetcher):
         source.url peut être :
         - Un handle utilisateur : "@user.bsky.social"
         - Un DID : "did:plc:..."
-        - "firehose" pour le feed public général
+        - "firehose" pour les posts ingérés en continu (file locale Jetstream)
         """
         color = Fore.LIGHTMAGENTA_EX
         print_color(color, "=" * 60)
@@ -74,9 +73,8 @@ class BlueskyFetcher(BaseFetcher):
 
         try:
             if source.url == "firehose" or source.url.startswith("firehose"):
-                # Feed public général
-                # articles = self._fetch_public_feed(session, max_days)
-                ...
+                # Posts reçus en continu par l'ingestion Jetstream, lus en local
+                articles = self._fetch_stream_queue(max_days)
             elif source.url.startswith("@") or source.url.startswith("did:"):
                 # Posts d'un utilisateur spécifique
                 articles = self._fetch_user_posts(source.url, max_days)
@@ -91,44 +89,17 @@ class BlueskyFetcher(BaseFetcher):
 
         except Exception as e:
             logger.error(f"Erreur lors de la récupération Bluesky: {e}")
+            raise
 
         return articles
 
-    def _fetch_public_feed(
-        self, session: aiohttp.ClientSession, max_days: int
-    ) -> list[dict]:
+    def _fetch_stream_queue(self, max_days: int) -> list[dict]:
         """
-        Récupère le feed public Bluesky
+        Lit la file locale alimentée par l'ingestion Jetstream (python -m app --bluesky-stream)
         """
-        articles = []
-        cutoff_date = datetime.now() - timedelta(days=max_days)
-        LIMIT = 10
-        # Utilise l'endpoint public feed
-        url = f"{self.base_url}/xrpc/app.bsky.feed.getTimeline"
-        params = {"algorithm": "reverse-chronological", "limit": LIMIT}
-
-        with session.get(url, headers=self.headers, params=params) as response:
-            if response.status == 200:
-                data = response.json()
-                feed_items = data.get("feed", [])
-
-                for item in feed_items:
-                    post = item.get("post", {})
-                    record = post.get("record", {})
-
-                    # Filtrage par date
-                    created_at = record.get("createdAt")
-                    if created_at:
-                        post_date = datetime.fromisoformat(
-                            created_at.replace("Z", "+00:00")
-                        )
-                        if post_date.replace(tzinfo=None) > cutoff_date:
-                            articles.append(self._format_bluesky_post(post, item))
+        from app.services.bluesky_jetstream import BlueskyStreamQueue
 
-            else:
-                print(f"Erreur API Bluesky public feed: {response.status}")
-
-        return articles
+        return BlueskyStreamQueue().drain(max_days)
 
     def _fetch_user_posts(self, user_identifier: str, max_days: int) -> list[dict]:
         """
@@ -177,9 +148,11 @@ class BlueskyFetcher(BaseFetcher):
 
         return articles
 
-    def _format_bluesky_post(self, post, feed_item: dict) -> dict:
+    @staticmethod
+    def _format_bluesky_post(post, feed_item: dict) -> dict:
         """
         Formate un post Bluesky au format unifié
+        post : PostView atproto ou équivalent construit depuis un évènement Jetstream
         """
         record = post.record
         author = post.author
@@ -189,10 +162,12 @@ class BlueskyFetcher(BaseFetcher):
 
         # Gestion des liens/embeds
         embed = record.embed
+        external_url = None
         if embed:
             # if embed.get("$type") == "app.bsky.embed.external":
             if embed.py_type == "app.bsky.embed.external":
                 external = embed.external
+                external_url = external.uri
                 if external.title:
                     text += f"\n\n🔗 {external.title}"
                 if external.description:
@@ -264,6 +239,7 @@ class BlueskyFetcher(BaseFetcher):
             else text,  # Titre = début du texte
             "summary": text,
             "link": at_url,
+            "external_url": external_url,  # lien partagé (dédoublonnage inter-sources)
             "published": published.isoformat(),
             "source_type": "bluesky",
             "source_name": f"@{author.handle or 'unknown'}",
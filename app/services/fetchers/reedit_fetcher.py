@@ -80,6 +80,8 @@ class RedditFetcher(BaseFetcher):
                         "title": post.title,
                         "summary": content,
                         "link": f"https://reddit.com{post.permalink}",
+                        # lien partagé par un post de type lien (dédoublonnage inter-sources)
+                        "external_url": None if post.is_self else post.url,
                         "published": post_date.isoformat(),
                         "source_type": "reddit",
                         "source_name": f"r/{source.subreddit}",
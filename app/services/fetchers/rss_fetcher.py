@@ -1,4 +1,5 @@
 import feedparser
+import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 import logging
 
@@ -6,12 +7,31 @@ logging.basicConfig(level=logging.INFO)
 
 from app.core.logger import logger, Fore
 from app.core import measure_time
+from app.core.utils import get_environment_variable, is_env_enabled
 
 from app.services.decorators import fetcher_class
 from app.services.fetchers.base_fetcher import BaseFetcher
 from app.services.models import Source, SourceType
+from app.services.feed_stream import (
+    STREAMING_SUPPORTED,
+    iter_document_chunks,
+    iter_feed_entries,
+)
+from app.services.text_utils import html_to_text
 from app.core.logger import print_color
 
+AGENT = "ReaderRSS/1.0"
+RESOLVE_RELATIVE_URIS = False
+SANITIZE_HTML = True
+
+
+def is_streaming_parse_enabled() -> bool:
+    return STREAMING_SUPPORTED and is_env_enabled("RSS_STREAMING_PARSE", False)
+
+
+class FeedFetchError(Exception):
+    """Flux RSS/Atom inaccessible ou illisible"""
+
 
 @fetcher_class
 class RSSFetcher(BaseFetcher):
@@ -35,9 +55,18 @@ class RSSFetcher(BaseFetcher):
 
     def strip_html(self, text: str) -> str:
         """Supprime les balises HTML d'un texte pour n'avoir que du texte brut."""
-        from bs4 import BeautifulSoup
+        # même texte que BeautifulSoup(text, "html.parser").get_text(), sans construire de DOM
+        return html_to_text(text)
 
-        return BeautifulSoup(text, "html.parser").get_text()
+    @staticmethod
+    def _published_time(entry) -> datetime | None:
+        """Date de publication d'une entrée (priorité à published, sinon updated)"""
+        # logger.info(Fore.RED + f"DATE published_parsed {entry.published_parsed} -> {entry.published_parsed[:6]}")
+        if hasattr(entry, "published_parsed"):
+            return datetime(*entry.published_parsed[:6])
+        if hasattr(entry, "updated_parsed"):
+            return datetime(*entry.updated_parsed[:6])
+        return None
 
     def add_article_with_entry_syndication(
         self, entry, articles, cutoff_date, recent_in_feed
@@ -51,13 +80,7 @@ class RSSFetcher(BaseFetcher):
             cutoff_date: La date limite pour qu'un article soit considéré comme récent.
             recent_in_feed: Le compteur d'articles récents dans le flux actuel.
         """
-        # Récupération de la date de publication (priorité à published, sinon updated)
-        published_time = None
-        # logger.info(Fore.RED + f"DATE published_parsed {entry.published_parsed} -> {entry.published_parsed[:6]}")
-        if hasattr(entry, "published_parsed"):
-            published_time = datetime(*entry.published_parsed[:6])
-        elif hasattr(entry, "updated_parsed"):
-            published_time = datetime(*entry.updated_parsed[:6])
+        published_time = self._published_time(entry)
 
         # Vérification de la date
         is_recent = published_time and (published_time >= cutoff_date)
@@ -66,35 +89,100 @@ class RSSFetcher(BaseFetcher):
             f"(publié le {published_time}) : {'récent' if is_recent else 'trop ancien' if published_time else 'date inconnue'}"
         )
 
-        if is_recent:
-            # Normalisation des champs (RSS/Atom)
-            title = getattr(entry, "title", "Sans titre")
-            summary = self.get_summary(entry)
-            summary = self.strip_html(summary)  # Nettoyage du HTML
-            logger.debug(f"Résumé brut (après nettoyage) : {summary}")
-            link = getattr(entry, "link", "#")
-            if isinstance(link, list):  # Cas Atom où link est un objet
-                link = link[0].href if link else "#"
-            logger.info(Fore.GREEN + f"🆕 Article récent : {title} ({link})")
-            articles.append(
-                {
-                    "title": title,
-                    "summary": summary,
-                    "link": link,
-                    "published": published_time.isoformat() if published_time else None,
-                    "score": "0 %",
-                    "source": SourceType.RSS,
-                }
+        # Entrée ancienne : aucun travail sur le contenu (extraction, nettoyage HTML)
+        if not is_recent:
+            return recent_in_feed
+
+        # Normalisation des champs (RSS/Atom)
+        title = getattr(entry, "title", "Sans titre")
+        summary = self.get_summary(entry)
+        summary = self.strip_html(summary)  # Nettoyage du HTML
+        logger.debug(f"Résumé brut (après nettoyage) : {summary}")
+        link = getattr(entry, "link", "#")
+        if isinstance(link, list):  # Cas Atom où link est un objet
+            link = link[0].href if link else "#"
+        logger.info(Fore.GREEN + f"🆕 Article récent : {title} ({link})")
+        articles.append(
+            {
+                "title": title,
+                "summary": summary,
+                "link": link,
+                "published": published_time.isoformat() if published_time else None,
+                "score": "0 %",
+                "source": SourceType.RSS,
+            }
+        )
+        return recent_in_feed + 1
+
+    @staticmethod
+    def _raise_for_dead_feed(feed):
+        """
+        feedparser ne lève pas d'exception : HTTP en erreur ou document illisible
+        sans aucune entrée sont remontés comme des échecs (suivi de santé des sources).
+        """
+        status = feed.get("status", 200)
+        if status >= 400:
+            raise FeedFetchError(f"HTTP {status}")
+        if feed.get("bozo") and not feed.entries:
+            raise FeedFetchError(
+                f"flux illisible : {feed.get('bozo_exception')}"
+            ) from feed.get("bozo_exception")
+
+    def _parse_feed(self, source: Source, cutoff_date: datetime, articles: list) -> int:
+        """Analyse complète du document par feedparser, retourne le nombre d'entrées lues"""
+        feed = feedparser.parse(
+            source.url,
+            resolve_relative_uris=RESOLVE_RELATIVE_URIS,
+            sanitize_html=SANITIZE_HTML,
+            agent=AGENT,
+        )  # voir Etag et modified pour ne pas tout recharger
+        self._raise_for_dead_feed(feed)
+        content_length = feed.get("headers", {}).get("content-length")
+        self.last_bytes = int(content_length) if content_length else None
+
+        recent_in_feed = 0
+        for entry in feed.entries:
+            recent_in_feed = self.add_article_with_entry_syndication(
+                entry, articles, cutoff_date, recent_in_feed
             )
-            recent_in_feed += 1
-        return recent_in_feed
+        return len(feed.entries)
+
+    def _parse_feed_streaming(
+        self, source: Source, cutoff_date: datetime, articles: list
+    ) -> int:
+        """
+        Analyse incrémentale : s'arrête après RSS_STREAM_OLD_RUN entrées consécutives
+        plus anciennes que cutoff_date (flux triés par date), le reste du document
+        n'est pas téléchargé. Retourne le nombre d'entrées lues.
+        """
+        max_bytes = int(get_environment_variable("RSS_MAX_BYTES", str(5 * 1024 * 1024)))
+        old_run_limit = int(get_environment_variable("RSS_STREAM_OLD_RUN", "5"))
+        stats = {}
+        chunks = iter_document_chunks(source.url, max_bytes, AGENT, stats=stats)
+        nb_entries = recent_in_feed = old_run = 0
+        try:
+            for entry in iter_feed_entries(chunks):
+                nb_entries += 1
+                recent_in_feed = self.add_article_with_entry_syndication(
+                    entry, articles, cutoff_date, recent_in_feed
+                )
+                published_time = self._published_time(entry)
+                if published_time is None:
+                    continue  # entrée sans date : ne rompt ni ne prolonge la série
+                old_run = old_run + 1 if published_time < cutoff_date else 0
+                if old_run_limit and old_run >= old_run_limit:
+                    logger.info(
+                        f"Arrêt de la lecture de {source.url} après {old_run} entrées anciennes consécutives"
+                    )
+                    break
+        finally:
+            chunks.close()  # ferme la connexion si la lecture est interrompue
+            self.last_bytes = stats.get("bytes")
+        return nb_entries
 
     @measure_time
     def fetch_articles(self, source: Source, max_days: int) -> list[dict]:
         """Votre logique RSS existante"""
-        AGENT = "ReaderRSS/1.0"
-        RESOLVE_RELATIVE_URIS = False
-        SANITIZE_HTML = True
         articles = []
         cutoff_date = datetime.now() - timedelta(days=max_days)
         logger.info(
@@ -105,22 +193,23 @@ class RSSFetcher(BaseFetcher):
         print_color(color, "=" * 60)
         print_color(color, f"RSS Fetcher fetch_articles {source.url}")
         print_color(color, "=" * 60)
-        feed = feedparser.parse(
-            source.url,
-            resolve_relative_uris=RESOLVE_RELATIVE_URIS,
-            sanitize_html=SANITIZE_HTML,
-            agent=AGENT,
-        )  # voir Etag et modified pour ne pas tout recharger
-
-        recent_in_feed = 0
 
-        for entry in feed.entries:
-            recent_in_feed = self.add_article_with_entry_syndication(
-                entry, articles, cutoff_date, recent_in_feed
-            )
+        if is_streaming_parse_enabled():
+            try:
+                nb_entries = self._parse_feed_streaming(source, cutoff_date, articles)
+            except ET.ParseError as e:
+                # XML mal formé (entités HTML non déclarées...) : feedparser est plus tolérant
+                logger.warning(
+                    Fore.YELLOW
+                    + f"Lecture en flux impossible pour {source.url} ({e}), repli sur feedparser"
+                )
+                articles = []
+                nb_entries = self._parse_feed(source, cutoff_date, articles)
+        else:
+            nb_entries = self._parse_feed(source, cutoff_date, articles)
 
         logger.info(
-            f"{len(feed.entries)} articles trouvés dans ce flux, {recent_in_feed} récents !"
+            f"{nb_entries} articles trouvés dans ce flux, {len(articles)} récents !"
         )
 
         logger.debug(Fore.CYAN + f"{len(articles)} articles récents récupérés")
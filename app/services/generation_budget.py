@@ -0,0 +1,141 @@
+"""
+Budget de temps des résumés LLM : échéance par article, budget de l'exécution, repli extractif
+
+Un article pathologique peut faire générer le LLM local très lentement, voire le bloquer :
+llm.invoke n'a pas d'échéance et retarde toute l'exécution (et l'envoi du mail). La génération
+est lue en flux (llm.stream) et interrompue à l'échéance de l'article :
+
+    échéance atteinte, sortie partielle utilisable   sortie partielle gardée (phrases complètes)
+    échéance atteinte, sortie trop courte            résumé extractif du contenu (TextRank)
+    budget de l'exécution épuisé                     résumé extractif, sans appel LLM
+
+L'échéance d'un article est bornée par ce qu'il reste du budget de l'exécution : la durée
+totale des résumés est prévisible. Les résumés de repli sont marqués ("summary_status" :
+partial ou extractive, complete sinon).
+
+Configuration .env :
+    SUMMARY_ARTICLE_DEADLINE=120      secondes par article (0 : sans échéance, llm.invoke)
+    SUMMARY_RUN_BUDGET=0              secondes pour tous les résumés de l'exécution (0 : sans limite)
+    SUMMARY_MIN_PARTIAL_CHARS=120     sortie partielle plus courte : repli extractif
+    SUMMARY_FALLBACK_TOKENS=80        taille du résumé extractif de repli
+"""
+
+import queue
+import re
+import threading
+import time
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.utils import get_environment_variable
+
+STATUS_COMPLETE = "complete"
+STATUS_PARTIAL = "partial"
+STATUS_EXTRACTIVE = "extractive"
+_DONE = object()
+# fin de la dernière phrase complète d'une sortie interrompue
+_LAST_SENTENCE_RE = re.compile(r"^.*[.!?…](?=\s|$)", re.DOTALL)
+
+
+class GenerationTimeout(Exception):
+    """Échéance atteinte avant la fin de la génération, avec la sortie partielle"""
+
+    def __init__(self, partial: str = "", seconds: float = 0.0):
+        super().__init__(f"échéance de génération atteinte après {seconds:.1f}s")
+        self.partial = partial
+        self.seconds = seconds
+
+
+def stream_with_deadline(llm, prompt, timeout: float) -> str:
+    """
+    Génération lue en flux dans un thread, interrompue à l'échéance (GenerationTimeout). Le thread
+    abandonné s'arrête au morceau suivant et ferme le flux (connexion HTTP fermée : le serveur
+    annule la génération) ; la requête porte l'échéance comme délai de lecture, un flux bloqué
+    sans aucun morceau est coupé par le client HTTP.
+    """
+    chunks: queue.Queue = queue.Queue()
+    stop = threading.Event()
+
+    def produce():
+        stream = None
+        try:
+            stream = llm.stream(prompt, timeout=timeout)
+            for chunk in stream:
+                if stop.is_set():
+                    break
+                chunks.put(chunk.content)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+        chunks.put(_DONE)
+
+    start = time.monotonic()
+    threading.Thread(target=produce, daemon=True, name="llm-stream").start()
+    parts = []
+    while True:
+        remaining = timeout - (time.monotonic() - start)
+        try:
+            if remaining <= 0:
+                raise queue.Empty
+            item = chunks.get(timeout=remaining)
+        except queue.Empty:
+            stop.set()
+            raise GenerationTimeout("".join(parts), time.monotonic() - start)
+        if item is _DONE:
+            return "".join(parts)
+        if isinstance(item, Exception):
+            raise item
+        parts.append(item)
+
+
+class SummaryBudget:
+    """Échéance par article bornée par le reste du budget de l'exécution"""
+
+    def __init__(self, article_seconds: float = 120, run_seconds: float = 0):
+        self.article_seconds = article_seconds
+        self.run_seconds = run_seconds
+        self.start = time.monotonic()
+
+    @classmethod
+    def from_env(cls) -> "SummaryBudget":
+        return cls(
+            article_seconds=float(get_environment_variable("SUMMARY_ARTICLE_DEADLINE", "120")),
+            run_seconds=float(get_environment_variable("SUMMARY_RUN_BUDGET", "0")),
+        )
+
+    def remaining(self) -> float | None:
+        if self.run_seconds <= 0:
+            return None
+        return max(0.0, self.run_seconds - (time.monotonic() - self.start))
+
+    def exhausted(self) -> bool:
+        return self.remaining() == 0
+
+    def article_deadline(self) -> float | None:
+        """Secondes accordées à l'article suivant, None : sans échéance"""
+        remaining = self.remaining()
+        limits = [self.article_seconds] if self.article_seconds > 0 else []
+        if remaining is not None:
+            limits.append(remaining)
+        return min(limits) if limits else None
+
+
+def extractive_summary(title: str, content: str, max_tokens: int | None = None) -> str:
+    from app.services.compression import ExtractiveCompressor
+
+    if max_tokens is None:
+        max_tokens = int(get_environment_variable("SUMMARY_FALLBACK_TOKENS", "80"))
+    return ExtractiveCompressor(max_tokens=max_tokens, method="textrank").compress(title, content)[0]
+
+
+def fallback_summary(title: str, content: str, partial: str = "") -> tuple[str, str]:
+    """(résumé, statut) d'un article dont la génération n'a pas abouti"""
+    min_chars = int(get_environment_variable("SUMMARY_MIN_PARTIAL_CHARS", "120"))
+    match = _LAST_SENTENCE_RE.match((partial or "").strip())
+    if match and len(match.group(0)) >= min_chars:
+        return match.group(0), STATUS_PARTIAL
+    return extractive_summary(title, content), STATUS_EXTRACTIVE
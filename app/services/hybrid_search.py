@@ -0,0 +1,161 @@
+"""
+Recherche hybride plein texte (FTS5) + sémantique (embeddings) : /search?mode=hybrid
+
+La recherche FTS retrouve les identifiants exacts (CVE, numéros de version) mais pas les
+reformulations, la recherche vectorielle l'inverse. Les deux requêtes sont lancées en
+parallèle (FTS via aiosqlite, vecteurs dans le threadpool) : la latence totale reste
+proche de la plus lente des deux. Les classements sont fusionnés par Reciprocal Rank
+Fusion : score(article) = somme sur les classements de 1 / (k + rang), sans avoir à
+rendre comparables le rank FTS et la similarité cosinus.
+
+Configuration .env :
+    HYBRID_RRF_K=60              constante k de la RRF (valeur usuelle)
+    HYBRID_CANDIDATES=50         candidats demandés à chacune des deux recherches
+"""
+
+import asyncio
+import html
+import re
+import time
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable
+from app.services.models import SourceType
+
+# termes de la requête, avec les séparateurs internes des identifiants (CVE-2025-1234, 3.12.1)
+FTS_TOKEN_RE = re.compile(r"\w(?:[\w.\-:/]*\w)?")
+
+
+def fts_match_query(query: str) -> str:
+    """
+    Requête MATCH FTS5 tolérante : chaque terme entre guillemets (CVE-2025-1234, 3.12...
+    restent des phrases exactes au lieu d'opérateurs FTS), termes reliés par OR.
+    """
+    terms = FTS_TOKEN_RE.findall(query)
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], k: int = 60) -> list[tuple[int, float]]:
+    """(id, score RRF) du meilleur au moins bon ; à égalité, ordre de première apparition"""
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, article_id in enumerate(ranking, start=1):
+            scores[article_id] = scores.get(article_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def highlight_terms(text: str, query: str) -> str:
+    """Surligne (<mark>) les termes de la requête, pour les articles trouvés par les vecteurs seuls"""
+    terms = sorted(set(FTS_TOKEN_RE.findall(query)), key=len, reverse=True)
+    text = html.escape(text or "", quote=False)
+    if not terms:
+        return text
+    pattern = re.compile(
+        r"\b(" + "|".join(re.escape(html.escape(term, quote=False)) for term in terms) + r")\b",
+        re.IGNORECASE,
+    )
+    return pattern.sub(r"<mark>\1</mark>", text)
+
+
+async def _timed(timings: dict, name: str, awaitable):
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = (time.perf_counter() - start) * 1000
+
+
+async def _fts_ranking(session, query, date_min, date_max, limit) -> list:
+    from app.db.db import ArticleFTS
+
+    match = fts_match_query(query)
+    if not match:
+        return []
+    return await ArticleFTS.search(
+        session=session, query=match, date_min=date_min, date_max=date_max, limit=limit
+    )
+
+
+def _vector_ranking(query: str, limit: int) -> list[int]:
+    from app.services.semantic_search import semantic_search_ids
+
+    try:
+        return [article_id for article_id, _ in semantic_search_ids(query, limit)]
+    except Exception as e:
+        # modèle ou index indisponible : la recherche reste plein texte
+        logger.warning(Fore.YELLOW + f"Recherche vectorielle indisponible : {e}")
+        return []
+
+
+async def hybrid_search(
+    session, query: str, date_min=None, date_max=None, limit: int = 10
+) -> tuple[list[dict], dict[str, float]]:
+    """
+    Articles les mieux classés par fusion RRF des recherches FTS et vectorielle,
+    et durées (ms) de chaque étape : fts, vector, fusion.
+    """
+    from app.db.db import Article
+
+    rrf_k = int(get_environment_variable("HYBRID_RRF_K", "60"))
+    candidates = max(limit, int(get_environment_variable("HYBRID_CANDIDATES", "50")))
+    timings: dict[str, float] = {}
+
+    fts_rows, vector_ids = await asyncio.gather(
+        _timed(timings, "fts", _fts_ranking(session, query, date_min, date_max, candidates)),
+        _timed(timings, "vector", run_in_threadpool(_vector_ranking, query, candidates)),
+    )
+
+    start = time.perf_counter()
+    highlighted = {row.id: row for row in fts_rows}
+    # articles trouvés par les vecteurs seuls : lus en base, avec les mêmes filtres de date
+    statement = select(Article).where(Article.id.in_(set(vector_ids) - set(highlighted)))
+    if date_min:
+        statement = statement.where(Article.published >= str(date_min))
+    if date_max:
+        statement = statement.where(Article.published <= str(date_max))
+    vector_only = {article.id: article for article in (await session.execute(statement)).scalars()}
+    vector_ids = [i for i in vector_ids if i in highlighted or i in vector_only]
+
+    fused = reciprocal_rank_fusion([list(highlighted), vector_ids], k=rrf_k)[:limit]
+    best_possible = 2.0 / (rrf_k + 1)
+    articles = []
+    for article_id, score in fused:
+        if article_id in highlighted:
+            row = highlighted[article_id]
+            article = {
+                "title": row.title,
+                "link": row.link,
+                "summary": row.content,
+                "published": row.published,
+                "source": SourceType(row.source.lower()) if row.source else None,
+            }
+        else:
+            row = vector_only[article_id]
+            article = {
+                "title": highlight_terms(row.title, query),
+                "link": row.link,
+                "summary": highlight_terms(row.summary, query),
+                "published": row.published,
+                "source": row.source,
+            }
+        article["score"] = round(100.0 * score / best_possible, 1)
+        articles.append(article)
+    timings["fusion"] = (time.perf_counter() - start) * 1000
+
+    logger.debug(
+        f"Recherche hybride '{query}' : {len(highlighted)} FTS, {len(vector_ids)} vecteurs, "
+        f"{len(articles)} fusionnés"
+    )
+    return articles, timings
+
+
+def server_timing_header(timings: dict[str, float]) -> str:
+    """En-tête Server-Timing (durées en ms, affichées par les devtools du navigateur)"""
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
@@ -0,0 +1,189 @@
+"""
+Pré-filtre lexical du filtre de pertinence (cascade avant les embeddings)
+
+Un automate multi-motifs (expression régulière construite sur le trie des motifs : un seul
+passage sur le texte, préfixes communs partagés) recherche les mots-clés FILTER_KEYWORDS et
+leurs synonymes dans le titre et le contenu normalisés (minuscules, sans accents).
+Score lexical = LEXICAL_TITLE_WEIGHT par mot-clé trouvé dans le titre + 1 par mot-clé trouvé
+dans le contenu (mots-clés distincts, un synonyme compte pour son mot-clé)
+- LEXICAL_NEGATIVE_WEIGHT par terme de bruit CASCADE_NEGATIVE_KEYWORDS trouvé (offre d'emploi,
+contenu sponsorisé...).
+
+    score <= CASCADE_REJECT_SCORE   rejet direct (bruit évident : terme de bruit, aucun mot-clé)
+    score >= CASCADE_ACCEPT_SCORE   acceptation directe
+    entre les deux                  zone ambiguë : filtre sémantique (embeddings)
+
+Un article sans aucun mot-clé (score 0) n'est pas rejeté par défaut : une reformulation
+("OpenAI ships GPT-5" pour "genai") n'est reconnue que par les embeddings. Seul un signal
+négatif (terme de bruit) permet le rejet direct.
+
+Synonymes : SYNONYMS ci-dessous pour les mots-clés courants, complétés par FILTER_SYNONYMS_FILE
+(JSON {"mot-clé": ["synonyme", ...]}).
+
+Configuration .env :
+    CASCADE_FILTER=false
+    CASCADE_REJECT_SCORE=-1
+    CASCADE_ACCEPT_SCORE=4
+    CASCADE_NEGATIVE_KEYWORDS=sponsored,giveaway,offre d'emploi
+    LEXICAL_TITLE_WEIGHT=2
+    LEXICAL_NEGATIVE_WEIGHT=2
+    FILTER_SYNONYMS_FILE=mysynonyms.json
+"""
+
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.utils import get_environment_variable, is_env_enabled
+
+# synonymes par défaut, appliqués aux mots-clés présents dans FILTER_KEYWORDS
+SYNONYMS = {
+    "ai agent": ["ai agents", "agentic", "agent ia", "agents ia", "autonomous agent"],
+    "genai": ["generative ai", "ia generative", "llm", "llms", "large language model"],
+    "artificial intelligence": ["intelligence artificielle", "machine learning", "deep learning"],
+    "ia": ["intelligence artificielle", "artificial intelligence"],
+    "intelligence artificielle": ["artificial intelligence", "machine learning"],
+    "python": ["cpython", "pypi", "pep"],
+    "django": ["django rest framework", "drf"],
+    "cybersécurité": ["cybersecurity", "securite informatique", "ransomware", "malware", "infosec"],
+    "cve": ["vulnerability", "vulnerabilite", "zero-day", "0-day", "exploit", "faille"],
+    "alerte sécurité": ["security advisory", "bulletin de securite", "cert-fr"],
+}
+
+
+def normalize_text(text: str) -> str:
+    """Minuscules sans accents : 'Cybersécurité' -> 'cybersecurite'"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def _trie_regex(patterns: list[str]) -> str:
+    """Alternative régulière factorisée sur le trie des motifs (pas de retour arrière entre motifs)"""
+    trie: dict = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not end:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if end else "")
+
+    return build(trie)
+
+
+class LexicalMatcher:
+    """Recherche des mots-clés (et synonymes) en un seul passage par texte"""
+
+    def __init__(self, keywords: list[str], synonyms: dict[str, list[str]] | None = None):
+        synonyms = {normalize_text(k): v for k, v in (synonyms or {}).items()}
+        self.keyword_of: dict[str, str] = {}
+        for keyword in keywords:
+            key = normalize_text(keyword).strip()
+            if not key:
+                continue
+            for pattern in [key, *(normalize_text(s).strip() for s in synonyms.get(key, []))]:
+                self.keyword_of.setdefault(pattern, keyword)
+        self._regex = (
+            re.compile(r"(?<!\w)(" + _trie_regex(list(self.keyword_of)) + r")(?!\w)")
+            if self.keyword_of
+            else None
+        )
+
+    def keywords_in(self, text: str) -> set[str]:
+        """Mots-clés (forme FILTER_KEYWORDS) présents dans le texte"""
+        if self._regex is None:
+            return set()
+        return {self.keyword_of[match] for match in self._regex.findall(normalize_text(text))}
+
+    def score(self, article: dict, title_weight: float = 2.0) -> tuple[float, set[str]]:
+        in_title = self.keywords_in(article.get("title") or "")
+        in_body = self.keywords_in(article.get("summary") or "")
+        return title_weight * len(in_title) + len(in_body), in_title | in_body
+
+
+def load_synonyms(path: str | None = None) -> dict[str, list[str]]:
+    """Synonymes par défaut complétés par ceux du fichier FILTER_SYNONYMS_FILE"""
+    synonyms = {k: list(v) for k, v in SYNONYMS.items()}
+    path = path or get_environment_variable("FILTER_SYNONYMS_FILE")
+    if path and Path(path).exists():
+        for keyword, values in json.loads(Path(path).read_text(encoding="utf-8")).items():
+            synonyms.setdefault(keyword, []).extend(values)
+    return synonyms
+
+
+@lru_cache(maxsize=4)
+def get_lexical_matcher(keywords: tuple[str, ...]) -> LexicalMatcher:
+    return LexicalMatcher(list(keywords), load_synonyms())
+
+
+def is_cascade_filter_enabled() -> bool:
+    return is_env_enabled("CASCADE_FILTER", False)
+
+
+def negative_keywords() -> tuple[str, ...]:
+    """Termes de bruit (CASCADE_NEGATIVE_KEYWORDS, séparés par des virgules)"""
+    value = get_environment_variable("CASCADE_NEGATIVE_KEYWORDS", "")
+    return tuple(keyword.strip() for keyword in value.split(",") if keyword.strip())
+
+
+def cascade_split(
+    articles: list[dict],
+    keywords: list[str],
+    threshold: float,
+    reject_score: float | None = None,
+    accept_score: float | None = None,
+) -> tuple[list[dict], list[dict], list[dict]]:
+    """
+    (acceptés, ambigus, rejetés) selon le score lexical. Chaque article reçoit son score
+    lexical ("lexical_score") ; les acceptés reçoivent aussi leur score de pertinence
+    ("score", au moins threshold), les mots-clés trouvés et le palier de décision, les
+    rejetés les termes de bruit trouvés ("noise_keywords").
+    """
+    if reject_score is None:
+        reject_score = float(get_environment_variable("CASCADE_REJECT_SCORE", "-1"))
+    if accept_score is None:
+        accept_score = float(get_environment_variable("CASCADE_ACCEPT_SCORE", "4"))
+    title_weight = float(get_environment_variable("LEXICAL_TITLE_WEIGHT", "2"))
+    negative_weight = float(get_environment_variable("LEXICAL_NEGATIVE_WEIGHT", "2"))
+    matcher = get_lexical_matcher(tuple(keywords))
+    noise = negative_keywords()
+    noise_matcher = get_lexical_matcher(noise) if noise else None
+
+    accepted, ambiguous, rejected = [], [], []
+    for article in articles:
+        score, matched = matcher.score(article, title_weight)
+        noisy = (
+            noise_matcher.keywords_in(f"{article.get('title') or ''}\n{article.get('summary') or ''}")
+            if noise_matcher
+            else set()
+        )
+        score -= negative_weight * len(noisy)
+        article["lexical_score"] = score
+        if score >= accept_score:
+            article["score"] = f"{lexical_similarity(score, accept_score, threshold) * 100:.1f}"
+            article["matched_keywords"] = sorted(matched)
+            article["filter_tier"] = "lexical"
+            accepted.append(article)
+        elif score <= reject_score:
+            article["noise_keywords"] = sorted(noisy)
+            rejected.append(article)
+        else:
+            ambiguous.append(article)
+    return accepted, ambiguous, rejected
+
+
+def lexical_similarity(score: float, accept_score: float, threshold: float) -> float:
+    """
+    Score de pertinence (0..1) d'un article accepté par le palier lexical, comparable à
+    la similarité du filtre : au moins le seuil, 1 à partir de deux fois le score d'acceptation.
+    """
+    return max(threshold, min(1.0, score / (2 * accept_score))) if accept_score > 0 else 1.0
@@ -0,0 +1,152 @@
+"""
+Cascade LLM à deux niveaux pour le résumé des articles
+
+Un post Bluesky d'une ou deux phrases n'a pas besoin d'un modèle 7B. Avec LLM_CASCADE=true :
+
+    contenu court (<= LLM_CASCADE_SHORT_TOKENS)   résumé par le petit modèle (LLM_SMALL_MODEL)
+    contenu long                                 tri oui/non par le petit modèle ("mérite un résumé
+                                                 complet ?"), seuls les "oui" vont au grand modèle
+                                                 (LLM_MODEL) ; les "non" reçoivent un résumé
+                                                 extractif (noeud summarize, sans appel LLM)
+
+Une réponse de tri illisible vaut "oui" (le grand modèle tranche). Le nombre d'appels et la
+latence de chaque niveau (petit résumé, tri, grand résumé) sont relevés et affichés en fin de
+noeud summarize.
+
+Configuration .env :
+    LLM_CASCADE=false
+    LLM_SMALL_MODEL=qwen2.5:0.5b
+    LLM_SMALL_BASE_URL=             API du petit modèle (défaut : OLLAMA_BASE_URL)
+    LLM_CASCADE_SHORT_TOKENS=80
+    LLM_CASCADE_TRIAGE=true         false : les contenus longs vont directement au grand modèle
+"""
+
+import re
+import time
+from typing import Callable
+
+import numpy as np
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable, is_env_enabled
+
+TIERS = ("small_summary", "triage", "large_summary")
+_YES_RE = re.compile(r"\b(oui|yes)\b", re.IGNORECASE)
+_NO_RE = re.compile(r"\b(non|no)\b", re.IGNORECASE)
+
+
+def parse_triage(answer: str) -> bool:
+    """Réponse du tri : "non" seul rejette, tout le reste (oui, illisible) accepte"""
+    return not (_NO_RE.search(answer or "") and not _YES_RE.search(answer or ""))
+
+
+class TierStats:
+    """Appels et latences par niveau de la cascade sur une exécution"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {tier: [] for tier in TIERS}
+        self.rejected = 0
+
+    def record(self, tier: str, seconds: float):
+        self.latencies[tier].append(seconds)
+
+    def calls(self, tier: str) -> int:
+        return len(self.latencies[tier])
+
+    def report(self):
+        for tier, latencies in self.latencies.items():
+            if not latencies:
+                continue
+            logger.info(
+                Fore.CYAN
+                + f"Cascade LLM {tier} : {len(latencies)} appels, total {sum(latencies):.1f}s, "
+                f"p50 {np.percentile(latencies, 50):.2f}s, max {max(latencies):.2f}s"
+            )
+        if self.latencies["triage"]:
+            logger.info(
+                Fore.CYAN
+                + f"Cascade LLM : {self.rejected}/{self.calls('triage')} contenus longs écartés par le tri"
+            )
+
+
+class LLMCascade:
+    """Petit modèle pour les contenus courts et le tri, grand modèle pour les résumés complets"""
+
+    def __init__(
+        self,
+        small_llm,
+        large_llm,
+        summarize: Callable[..., str],
+        short_tokens: int = 80,
+        triage: bool = True,
+        token_counter: Callable[[str], int] | None = None,
+    ):
+        from app.services.compression import get_token_counter
+
+        self.small_llm = small_llm
+        self.large_llm = large_llm
+        self._summarize = summarize
+        self.short_tokens = short_tokens
+        self.triage = triage
+        self.count_tokens = token_counter or get_token_counter()
+        self.stats = TierStats()
+
+    @classmethod
+    def from_env(cls, summarize: Callable[..., str]) -> "LLMCascade":
+        from app.services.model_service import init_llm_chat, init_small_llm_chat
+
+        return cls(
+            small_llm=init_small_llm_chat(),
+            large_llm=init_llm_chat(),
+            summarize=summarize,
+            short_tokens=int(get_environment_variable("LLM_CASCADE_SHORT_TOKENS", "80")),
+            triage=is_env_enabled("LLM_CASCADE_TRIAGE", True),
+        )
+
+    def _timed(self, tier: str, call: Callable[[], str]) -> str:
+        start = time.perf_counter()
+        try:
+            return call()
+        finally:
+            self.stats.record(tier, time.perf_counter() - start)
+
+    def worth_full_summary(self, theme: str, title: str, content: str, deadline=None) -> bool:
+        from app.services.generation_budget import stream_with_deadline
+        from app.services.model_service import set_triage_prompt
+
+        prompt = set_triage_prompt(theme, title, content)
+        answer = self._timed(
+            "triage",
+            lambda: self.small_llm.invoke(prompt).content
+            if deadline is None
+            else stream_with_deadline(self.small_llm, prompt, deadline),
+        )
+        return parse_triage(answer)
+
+    def summarize(self, theme: str, title: str, content: str, deadline=None) -> str | None:
+        """
+        Résumé par le niveau adapté, None si le tri écarte l'article (le noeud summarize lui
+        donne alors un résumé extractif). L'échéance (secondes) couvre le tri et le résumé.
+        """
+        start = time.monotonic()
+        if self.count_tokens(f"{title} {content}") <= self.short_tokens:
+            return self._timed(
+                "small_summary", lambda: self._summarize(title, content, self.small_llm, deadline)
+            )
+        if self.triage and not self.worth_full_summary(theme, title, content, deadline):
+            self.stats.rejected += 1
+            logger.info(Fore.YELLOW + f"Tri : résumé complet non justifié pour « {title} »")
+            return None
+        if deadline is not None:
+            deadline = max(0.0, deadline - (time.monotonic() - start))
+        return self._timed(
+            "large_summary", lambda: self._summarize(title, content, self.large_llm, deadline)
+        )
+
+
+def is_llm_cascade_enabled() -> bool:
+    return is_env_enabled("LLM_CASCADE", False)
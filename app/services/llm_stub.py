@@ -0,0 +1,300 @@
+"""
+Serveur LLM factice compatible OpenAI (chat completions) pour des benchmarks reproductibles
+
+Mesurer summarize_node demande aujourd'hui un Ollama réel et un modèle téléchargé : les
+résultats dépendent du GPU. Ce serveur parle le sous-ensemble de l'API chat completions
+utilisé par ChatOpenAI (POST /v1/chat/completions, en flux SSE ou non, GET /v1/models) et
+simule les temps d'un serveur d'inférence :
+
+    temps jusqu'au premier token = LLM_STUB_TTFT_MS (+/- LLM_STUB_JITTER)
+                                   + tokens du prompt / LLM_STUB_PREFILL_TPS
+    génération                   = LLM_STUB_TPS tokens/s (+/- LLM_STUB_JITTER)
+    LLM_STUB_PARALLEL requêtes traitées à la fois (OLLAMA_NUM_PARALLEL), les autres en file FIFO
+    LLM_STUB_ERROR_RATE          part des requêtes en erreur 503
+    LLM_STUB_STALL_RATE          part des générations bloquées (un token toutes les 10s)
+
+Les tirages aléatoires dépendent de LLM_STUB_SEED, du prompt et de son nombre d'envois :
+deux exécutions identiques donnent les mêmes temps et les mêmes erreurs. Les réponses suivent
+le type de prompt (tableau JSON pour le résumé groupé, "oui" pour le tri, résumé sinon).
+
+Usage :
+    python -m app --llm-stub          # http://127.0.0.1:LLM_STUB_PORT/v1, OLLAMA_BASE_URL à y faire pointer
+
+Configuration .env :
+    LLM_STUB_PORT=11435
+    LLM_STUB_TTFT_MS=300
+    LLM_STUB_PREFILL_TPS=400            0 : temps du prompt ignoré
+    LLM_STUB_TPS=25
+    LLM_STUB_JITTER=0.1                 écart-type relatif des temps
+    LLM_STUB_PARALLEL=1
+    LLM_STUB_OUTPUT_TOKENS=60
+    LLM_STUB_ERROR_RATE=0
+    LLM_STUB_STALL_RATE=0
+    LLM_STUB_SEED=0
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable
+
+CHARS_PER_TOKEN = 4
+STALL_SECONDS_PER_TOKEN = 10.0
+_BATCH_ID_RE = re.compile(r"^\[(\d+)\]", re.MULTILINE)
+_SUMMARY_WORDS = (
+    "Le projet publie une nouvelle version avec des gains de performance mesurés sur plusieurs "
+    "charges de travail, une correction de sécurité importante et une documentation revue pour "
+    "faciliter la migration des utilisateurs existants."
+).split()
+
+
+class StubConfig(NamedTuple):
+    ttft_ms: float = 300
+    prefill_tps: float = 400
+    tokens_per_second: float = 25
+    jitter: float = 0.1
+    parallel: int = 1
+    output_tokens: int = 60
+    error_rate: float = 0.0
+    stall_rate: float = 0.0
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "StubConfig":
+        return cls(
+            ttft_ms=float(get_environment_variable("LLM_STUB_TTFT_MS", "300")),
+            prefill_tps=float(get_environment_variable("LLM_STUB_PREFILL_TPS", "400")),
+            tokens_per_second=float(get_environment_variable("LLM_STUB_TPS", "25")),
+            jitter=float(get_environment_variable("LLM_STUB_JITTER", "0.1")),
+            parallel=int(get_environment_variable("LLM_STUB_PARALLEL", "1")),
+            output_tokens=int(get_environment_variable("LLM_STUB_OUTPUT_TOKENS", "60")),
+            error_rate=float(get_environment_variable("LLM_STUB_ERROR_RATE", "0")),
+            stall_rate=float(get_environment_variable("LLM_STUB_STALL_RATE", "0")),
+            seed=int(get_environment_variable("LLM_STUB_SEED", "0")),
+        )
+
+
+class FifoSlots:
+    """Places de traitement parallèle attribuées dans l'ordre d'arrivée"""
+
+    def __init__(self, count: int):
+        self._free = max(1, count)
+        self._waiting: deque = deque()
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        with self._condition:
+            ticket = object()
+            self._waiting.append(ticket)
+            while self._waiting[0] is not ticket or self._free == 0:
+                self._condition.wait()
+            self._waiting.popleft()
+            self._free -= 1
+            self._condition.notify_all()
+
+    def __exit__(self, *exc):
+        with self._condition:
+            self._free += 1
+            self._condition.notify_all()
+
+
+def prompt_text(messages: list[dict]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content") or ""
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(content)
+    return "\n".join(parts)
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def fake_completion(prompt: str, max_tokens: int) -> list[str]:
+    """Morceaux (tokens) de la réponse, selon le type de prompt"""
+    stripped = prompt.rstrip()
+    if stripped.endswith("JSON :"):
+        ids = [int(i) for i in _BATCH_ID_RE.findall(prompt)]
+        text = json.dumps(
+            [{"id": i, "summary": f"Résumé simulé du contenu {i}."} for i in ids], ensure_ascii=False
+        )
+        return [text[start : start + CHARS_PER_TOKEN] for start in range(0, len(text), CHARS_PER_TOKEN)]
+    if stripped.endswith("Réponse :"):
+        return ["oui"]
+    words = [_SUMMARY_WORDS[i % len(_SUMMARY_WORDS)] for i in range(max_tokens)]
+    return [f"{word} " for word in words[:-1]] + [f"{words[-1]}."]
+
+
+class LLMStub:
+    """État partagé du serveur : configuration, places, tirages et statistiques"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.slots = FifoSlots(config.parallel)
+        self.stats = Counter()
+        self.ttft: list[float] = []
+        self._attempts = Counter()
+        self._lock = threading.Lock()
+
+    def rng(self, prompt: str) -> random.Random:
+        with self._lock:
+            self._attempts[prompt] += 1
+            attempt = self._attempts[prompt]
+        return random.Random(f"{self.config.seed}:{attempt}:{prompt}")
+
+    def jittered(self, rng: random.Random, value: float) -> float:
+        return max(0.0, rng.gauss(value, value * self.config.jitter))
+
+    def record(self, **counts):
+        with self._lock:
+            self.stats.update(counts)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    stub: LLMStub = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        stub, config = self.stub, self.stub.config
+        prompt = prompt_text(request.get("messages", []))
+        prompt_tokens = estimate_tokens(prompt)
+        rng = stub.rng(prompt)
+        stub.record(requests=1, prompt_tokens=prompt_tokens)
+
+        if rng.random() < config.error_rate:
+            stub.record(errors=1)
+            self._send_json(503, {"error": {"message": "surcharge simulée", "type": "server_error"}})
+            return
+
+        max_tokens = min(request.get("max_tokens") or config.output_tokens, config.output_tokens)
+        chunks = fake_completion(prompt, max(1, max_tokens))
+        stalled = rng.random() < config.stall_rate
+        ttft = self.stub.jittered(rng, config.ttft_ms / 1000)
+        if config.prefill_tps > 0:
+            ttft += prompt_tokens / config.prefill_tps
+        token_time = (
+            STALL_SECONDS_PER_TOKEN if stalled else 1 / self.stub.jittered(rng, config.tokens_per_second)
+        )
+        completion = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+        }
+
+        # une place de traitement est tenue pendant le prompt et toute la génération
+        with stub.slots:
+            start = time.monotonic()
+            time.sleep(ttft)
+            stub.ttft.append(time.monotonic() - start)
+            if request.get("stream"):
+                self._stream(completion, chunks, token_time)
+            else:
+                time.sleep(token_time * len(chunks))
+                self._send_json(
+                    200,
+                    {
+                        **completion,
+                        "object": "chat.completion",
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": "".join(chunks)},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": len(chunks),
+                            "total_tokens": prompt_tokens + len(chunks),
+                        },
+                    },
+                )
+        stub.record(completion_tokens=len(chunks))
+
+    def _stream(self, completion: dict, chunks: list[str], token_time: float):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta: dict, finish_reason=None):
+            payload = {
+                **completion,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode())
+            self.wfile.flush()
+
+        try:
+            event({"role": "assistant", "content": ""})
+            for chunk in chunks:
+                event({"content": chunk})
+                time.sleep(token_time)
+            event({}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # client parti (échéance atteinte) : la place est libérée
+            self.stub.record(disconnects=1)
+
+
+def start_stub_server(config: StubConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+    """Serveur démarré dans un thread : (serveur, stub, URL de base à donner à ChatOpenAI)"""
+    stub = LLMStub(config or StubConfig.from_env())
+    handler = type("BoundStubHandler", (StubHandler,), {"stub": stub})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="llm-stub").start()
+    base_url = f"http://{host}:{server.server_address[1]}/v1"
+    return server, stub, base_url
+
+
+def run_llm_stub():
+    """Commande --llm-stub : serveur factice au premier plan"""
+    config = StubConfig.from_env()
+    server, _, base_url = start_stub_server(
+        config, port=int(get_environment_variable("LLM_STUB_PORT", "11435"))
+    )
+    logger.info(Fore.GREEN + f"LLM factice sur {base_url} ({config})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
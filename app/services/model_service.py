@@ -1,8 +1,8 @@
 import logging
+from functools import lru_cache
 
 logging.basicConfig(level=logging.INFO)
 
-from sentence_transformers import SentenceTransformer
 from langchain_openai import ChatOpenAI
 # from langchain_ollama import ChatOllama
 
@@ -13,44 +13,56 @@ from app.core.utils import get_environment_variable
 
 # =========================
 # Configuration du modèle LLM inférence
+# (lue à chaque initialisation : le démon prend en compte un .env modifié)
 # =========================
 
-LLM_MODEL = get_environment_variable("LLM_MODEL", "mistral")
-LLM_API = get_environment_variable(
-    "OLLAMA_BASE_URL", "http://localhost:11434/v1"
-)  # si ChatOpenAI
-# LLM_API = get_environment_variable("OLLAMA_BASE_URL", "http://localhost:11434")  # si ChatOllama
-LLM_TEMPERATURE = float(get_environment_variable("LLM_TEMPERATURE", "0.3"))
+DEFAULT_LLM_MODEL = "mistral"
+DEFAULT_LLM_API = "http://localhost:11434/v1"  # si ChatOpenAI
+# DEFAULT_LLM_API = "http://localhost:11434"  # si ChatOllama
 
-TOP_P = float(get_environment_variable("TOP_P", "0.5"))
-MAX_TOKENS_GENERATE = int(get_environment_variable("MAX_TOKENS_GENERATE", "300"))
+
+def llm_api() -> str:
+    return get_environment_variable("OLLAMA_BASE_URL", DEFAULT_LLM_API)
 
 
 # =========================
 # Configuration LLM local / saas
 # =========================
-def init_llm_chat():
+def init_llm_chat(model=None, api=None, max_tokens=None):
+    model = model or get_environment_variable("LLM_MODEL", DEFAULT_LLM_MODEL)
+    api = api or llm_api()
+    temperature = float(get_environment_variable("LLM_TEMPERATURE", "0.3"))
+    top_p = float(get_environment_variable("TOP_P", "0.5"))
     logger.info(
         Fore.GREEN
-        + f"Init LLM Chat Model {LLM_MODEL} via API {LLM_API} (temp={LLM_TEMPERATURE}, top_p={TOP_P})"
+        + f"Init LLM Chat Model {model} via API {api} (temp={temperature}, top_p={top_p})"
     )
     return ChatOpenAI(
-        model=LLM_MODEL,
-        openai_api_base=LLM_API,
+        model=model,
+        openai_api_base=api,
         openai_api_key="dummy-key-ollama",
-        temperature=LLM_TEMPERATURE,
-        top_p=TOP_P,
-        max_tokens=MAX_TOKENS_GENERATE,
+        temperature=temperature,
+        top_p=top_p,
+        max_tokens=max_tokens or int(get_environment_variable("MAX_TOKENS_GENERATE", "300")),
     )
     # return ChatOllama(
-    #     model=LLM_MODEL,
-    #     temperature=LLM_TEMPERATURE,
-    #     base_url=LLM_API,  # http://localhost:11434
-    #     top_p=TOP_P,
+    #     model=model,
+    #     temperature=temperature,
+    #     base_url=api,  # http://localhost:11434
+    #     top_p=top_p,
     #     # num_predict=MAX_TOKENS,
     # )
 
 
+def init_small_llm_chat(max_tokens=None):
+    """Petit modèle rapide de la cascade (LLM_SMALL_MODEL, même API que LLM_MODEL par défaut)"""
+    return init_llm_chat(
+        model=get_environment_variable("LLM_SMALL_MODEL", "qwen2.5:0.5b"),
+        api=get_environment_variable("LLM_SMALL_BASE_URL") or llm_api(),
+        max_tokens=max_tokens,
+    )
+
+
 # =========================
 # Configuration du modèle d'embeddings
 # Modèles disponibles et spécs :
@@ -69,13 +81,30 @@ def get_device_cpu_gpu_info():
     return "cpu"
 
 
+@lru_cache(maxsize=1)
 def init_sentence_model():
-    MODEL_EMBEDDINGS = get_environment_variable("MODEL_EMBEDDINGS")
-    DEVICE_TYPE = get_device_cpu_gpu_info()
+    """Modèle d'embeddings chargé une fois par processus (gardé en mémoire en mode démon)"""
+    from app.services.embedding_backends import get_embedding_backend, load_sentence_model
+    from app.services.embedding_tuning import DEFAULT_MODEL_EMBEDDINGS, embedding_setting
+
+    # .env prioritaire, sinon réglages de python -m app --tune-embeddings
+    MODEL_EMBEDDINGS = embedding_setting("MODEL_EMBEDDINGS", DEFAULT_MODEL_EMBEDDINGS)
+    BACKEND = get_embedding_backend()
+    # backends quantifiés / ONNX : CPU uniquement
+    DEVICE_TYPE = (
+        embedding_setting("EMBEDDING_DEVICE") or get_device_cpu_gpu_info()
+        if BACKEND == "torch"
+        else "cpu"
+    )
+    THREADS = embedding_setting("EMBEDDING_THREADS")
+    if THREADS:
+        import torch
+
+        torch.set_num_threads(int(THREADS))
     logger.info(
-        Fore.GREEN + f"Init SentenceTransformer {MODEL_EMBEDDINGS} sur {DEVICE_TYPE}"
+        Fore.GREEN + f"Init SentenceTransformer {MODEL_EMBEDDINGS} ({BACKEND}) sur {DEVICE_TYPE}"
     )
-    return SentenceTransformer(MODEL_EMBEDDINGS, device=DEVICE_TYPE)
+    return load_sentence_model(MODEL_EMBEDDINGS, backend=BACKEND, device=DEVICE_TYPE)
     # return SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2', device=DEVICE_TYPE)  # bon compromis pour le français/anglais
     # return SentenceTransformer('multi-qa-MiniLM-L6-cos-v1', device=DEVICE_TYPE)  # Optimisé pour la similarité
 
@@ -141,3 +170,55 @@ Résumé :"""
     # **Contenu :** {content}
 
     # **Résumé :**"""
+
+
+def set_triage_prompt(theme, title, content):
+    """Tri par le petit modèle : l'article mérite-t-il un résumé complet ?"""
+    prompt = f"""Tu es un expert en {theme}. L'article ci-dessous apporte-t-il une information technique nouvelle et substantielle (sortie, vulnérabilité, étude, projet avec du code) qui mérite un résumé détaillé ?
+Réponds uniquement par "oui" ou "non".
+
+{title}
+
+Contenu : {content}
+
+Réponse :"""
+
+    return prompt
+
+
+def set_batch_prompt(theme, items):
+    """Prompt de résumé groupé de contenus courts : un objet JSON par contenu"""
+    contents = "\n\n".join(
+        f"[{item_id}] {title}\nContenu : {content}" for item_id, title, content in items
+    )
+    prompt = f"""Tu es un expert en {theme}. Résume **chacun** des {len(items)} contenus courts ci-dessous en **1 à 2 phrases**, en français, avec l'information principale et les détails clés (chiffres, noms, dates).
+Réponds **uniquement** par un tableau JSON, un objet par contenu, dans l'ordre, sans autre texte :
+[{{"id": 1, "summary": "..."}}, {{"id": 2, "summary": "..."}}]
+
+**À résumer :**
+{contents}
+
+JSON :"""
+
+    return prompt
+
+
+def set_topic_prompt(theme, articles, max_chars_per_article=1500):
+    """Prompt de résumé unique pour plusieurs articles traitant du même sujet"""
+    sources = "\n\n".join(
+        f"Source {i} ({getattr(article['source'], 'value', article['source'])}) : {article['title']}\n"
+        f"Contenu : {article['summary'][:max_chars_per_article]}"
+        for i, article in enumerate(articles, start=1)
+    )
+    prompt = f"""Tu es un expert en {theme}. Les {len(articles)} articles ci-dessous, issus de sources différentes, traitent du **même sujet**.
+Rédige **un seul résumé** en **3 phrases maximales**, en français, avec :
+1. L'information principale (qui ? quoi ?), précise s'il y a du code ou un projet avec du code.
+2. Les détails clés (chiffres, noms, dates), en croisant les sources.
+3. L'impact ou la solution proposée, et les divergences éventuelles entre sources.
+
+**À résumer :**
+{sources}
+
+Résumé :"""
+
+    return prompt
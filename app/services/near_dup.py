@@ -0,0 +1,166 @@
+"""
+Regroupement des quasi-doublons entre sources (MinHash + LSH)
+
+Au-delà des doublons exacts (voir dedup.py), une même sortie ou CVE est souvent reprise
+par plusieurs flux avec quelques mots de différence. Chaque article est découpé en
+shingles (k-grammes de mots du titre + texte normalisés), résumé par une signature
+MinHash, puis les signatures sont réparties par bandes dans des tables de hachage (LSH) :
+seuls les articles partageant un seau sont comparés, sans comparaison de toutes les paires.
+
+Les paires dont la similarité de Jaccard estimée dépasse NEAR_DUP_THRESHOLD forment des
+groupes ; seul le représentant (le mieux noté, sinon le plus riche) est conservé pour
+l'embedding et le résumé, les autres sont listés dans son champ "also_covered_by".
+
+Configuration .env :
+    NEAR_DUP_ENABLED=true       active le regroupement dans merge_fetched_articles
+    NEAR_DUP_THRESHOLD=0.6      similarité de Jaccard minimale entre deux articles
+    NEAR_DUP_NUM_PERM=64        taille des signatures MinHash
+    NEAR_DUP_BANDS=16           nombre de bandes LSH (NEAR_DUP_NUM_PERM doit en être multiple)
+"""
+
+import zlib
+from collections import Counter, defaultdict
+
+import numpy as np
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable, is_env_enabled
+from app.services.dedup import normalize_text, richness, source_name
+
+# premier de Mersenne 2^31 - 1 : les produits a * h restent dans un int64
+MERSENNE_PRIME = (1 << 31) - 1
+SHINGLE_SIZE = 3
+# en dessous, un texte (post Bluesky, titre seul) ressemble trop facilement à un autre
+MIN_WORDS = 8
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set[str]:
+    """k-grammes de mots d'un texte normalisé"""
+    words = text.split()
+    if len(words) < k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + k]) for i in range(len(words) - k + 1)}
+
+
+class MinHasher:
+    """Signatures MinHash par permutations universelles (a * h + b) mod p"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self.b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+
+    def signature(self, items: set[str]) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(item.encode("utf-8")) for item in items),
+            dtype=np.int64,
+            count=len(items),
+        ) % MERSENNE_PRIME
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+
+def cluster_near_duplicates(
+    articles: list[dict], threshold: float = 0.6, num_perm: int = 64, bands: int = 16
+) -> list[list[int]]:
+    """
+    Groupes d'indices d'articles quasi identiques (groupes d'un seul article inclus),
+    dans l'ordre du premier article de chaque groupe.
+    """
+    if num_perm % bands:
+        raise ValueError(f"NEAR_DUP_NUM_PERM ({num_perm}) doit être un multiple de NEAR_DUP_BANDS ({bands})")
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm)
+
+    signatures: dict[int, np.ndarray] = {}
+    for i, article in enumerate(articles):
+        text = normalize_text(article)
+        if len(text.split()) >= MIN_WORDS:
+            signatures[i] = hasher.signature(shingles(text))
+
+    buckets: dict[tuple[int, bytes], list[int]] = defaultdict(list)
+    for i, signature in signatures.items():
+        for band in range(bands):
+            buckets[band, signature[band * rows : (band + 1) * rows].tobytes()].append(i)
+
+    parent = list(range(len(articles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    checked: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1 :]:
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                similarity = float(np.mean(signatures[i] == signatures[j]))
+                if similarity >= threshold:
+                    root_i, root_j = find(i), find(j)
+                    if root_i != root_j:
+                        parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    groups: dict[int, list[int]] = {}
+    for i in range(len(articles)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def collapse_near_duplicates(
+    articles: list[dict], threshold: float = 0.6, num_perm: int = 64, bands: int = 16
+) -> tuple[list[dict], Counter]:
+    """
+    Ne garde que le représentant de chaque groupe de quasi-doublons ; les autres membres
+    sont ajoutés à son champ "also_covered_by" (titre, lien, source).
+
+    Returns:
+        (représentants, nombre d'articles regroupés par source)
+    """
+    representatives = []
+    removed = Counter()
+    for group in cluster_near_duplicates(articles, threshold, num_perm, bands):
+        best = max(group, key=lambda i: richness(articles[i]))
+        representative = articles[best]
+        others = [articles[i] for i in group if i != best]
+        if others:
+            representative["also_covered_by"] = (representative.get("also_covered_by") or []) + [
+                {
+                    "title": other.get("title"),
+                    "link": other.get("link"),
+                    "source": source_name(other),
+                }
+                for other in others
+            ]
+            removed.update(source_name(other) for other in others)
+        representatives.append(representative)
+    return representatives, removed
+
+
+def is_near_dup_enabled() -> bool:
+    return is_env_enabled("NEAR_DUP_ENABLED", True)
+
+
+def collapse_fetched_articles(articles: list[dict]) -> list[dict]:
+    """Regroupement configuré par le .env, avec le décompte des articles regroupés par source"""
+    threshold = float(get_environment_variable("NEAR_DUP_THRESHOLD", "0.6"))
+    num_perm = int(get_environment_variable("NEAR_DUP_NUM_PERM", "64"))
+    bands = int(get_environment_variable("NEAR_DUP_BANDS", "16"))
+    representatives, removed = collapse_near_duplicates(
+        articles, threshold, num_perm, bands
+    )
+    if removed:
+        details = ", ".join(f"{source}: {count}" for source, count in removed.items())
+        logger.info(
+            Fore.LIGHTMAGENTA_EX
+            + f"Quasi-doublons : {len(articles)} -> {len(representatives)} articles (regroupés par source : {details})"
+        )
+    return representatives
@@ -0,0 +1,172 @@
+"""
+Planification adaptative du polling des sources (RSS, Reddit, Bluesky)
+
+Chaque source apprend sa fréquence de publication au fil des exécutions (moyenne mobile
+exponentielle de l'intervalle entre nouveaux articles) et reçoit une prochaine échéance
+avec une gigue aléatoire. Une exécution ne relève alors que les sources échues, dans la
+limite d'un budget de requêtes (les plus en retard d'abord).
+
+Configuration .env :
+    POLL_SCHEDULER=true            active la planification (sinon toutes les sources sont relevées)
+    POLL_BUDGET=0                  nombre max de sources relevées par type et par exécution (0 = illimité)
+    POLL_MIN_INTERVAL_HOURS=1      intervalle minimal entre 2 relèves
+    POLL_MAX_INTERVAL_HOURS=168    intervalle maximal (borné par MAX_DAYS)
+    POLL_JITTER=0.1                gigue relative appliquée à l'échéance
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable, is_env_enabled
+from app.services.models import Source
+
+# poids de la dernière observation dans la moyenne mobile
+EWMA_ALPHA = 0.3
+# allongement de l'intervalle quand une relève ne ramène rien de nouveau
+NO_NEWS_BACKOFF = 1.5
+
+
+def is_scheduler_enabled() -> bool:
+    return is_env_enabled("POLL_SCHEDULER", False)
+
+
+def source_key(source: Source) -> str:
+    return f"{source.type.value}:{source.url}"
+
+
+def next_interval_hours(
+    previous_hours: float,
+    elapsed_hours: float,
+    new_items: int,
+    min_hours: float,
+    max_hours: float,
+) -> float:
+    """
+    Met à jour l'intervalle estimé entre 2 publications d'une source.
+
+    Args:
+        previous_hours: intervalle estimé jusqu'ici
+        elapsed_hours: temps écoulé depuis la relève précédente
+        new_items: nombre d'articles nouveaux depuis la relève précédente
+    """
+    if new_items > 0:
+        sample = elapsed_hours / new_items
+        hours = EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * previous_hours
+    else:
+        hours = max(previous_hours, elapsed_hours) * NO_NEWS_BACKOFF
+    return min(max(hours, min_hours), max_hours)
+
+
+class PollingScheduler:
+    """Sélection des sources échues et apprentissage de leur fréquence de publication"""
+
+    def __init__(self, session_factory=None, rng: random.Random | None = None):
+        if session_factory is None:
+            from app.db.db import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.rng = rng or random.Random()
+
+        max_days = int(get_environment_variable("MAX_DAYS", "10"))
+        self.budget = int(get_environment_variable("POLL_BUDGET", "0"))
+        self.min_hours = float(get_environment_variable("POLL_MIN_INTERVAL_HOURS", "1"))
+        # au-delà de MAX_DAYS, des articles sortiraient de la fenêtre sans être vus
+        self.max_hours = min(
+            float(get_environment_variable("POLL_MAX_INTERVAL_HOURS", "168")),
+            max_days * 24,
+        )
+        self.jitter = float(get_environment_variable("POLL_JITTER", "0.1"))
+
+    def select_due(self, sources: list[Source], now: datetime | None = None) -> list[Source]:
+        """Retourne les sources échues, les plus en retard d'abord, dans la limite du budget"""
+        from app.db.db import SourceSchedule
+
+        now = now or datetime.now()
+        keys = [source_key(source) for source in sources]
+        with self.session_factory() as session:
+            schedules = {
+                row.source_key: row
+                for row in session.query(SourceSchedule)
+                .filter(SourceSchedule.source_key.in_(keys))
+                .all()
+            }
+
+        due = []
+        for key, source in zip(keys, sources):
+            schedule = schedules.get(key)
+            if schedule is None or schedule.next_due is None:
+                # jamais relevée : prioritaire
+                due.append((float("inf"), source))
+            elif schedule.next_due <= now:
+                overdue_hours = (now - schedule.next_due).total_seconds() / 3600
+                due.append((overdue_hours / schedule.interval_hours, source))
+
+        due.sort(key=lambda item: item[0], reverse=True)
+        selected = [source for _, source in due]
+        if self.budget > 0:
+            selected = selected[: self.budget]
+
+        logger.info(
+            Fore.LIGHTBLUE_EX
+            + f"Planification : {len(selected)}/{len(sources)} sources à relever "
+            f"({len(due)} échues, budget {self.budget or 'illimité'})"
+        )
+        return selected
+
+    def record_poll(self, source: Source, articles: list[dict], now: datetime | None = None):
+        """Enregistre le résultat d'une relève et calcule la prochaine échéance"""
+        from app.db.db import SourceSchedule
+
+        now = now or datetime.now()
+        published = [a["published"] for a in articles if a.get("published")]
+
+        with self.session_factory() as session:
+            schedule = session.get(SourceSchedule, source_key(source))
+            if schedule is None:
+                # 1re relève : les articles récupérés couvrent la fenêtre MAX_DAYS
+                elapsed_hours = self.max_hours
+                schedule = SourceSchedule(
+                    source_key=source_key(source),
+                    source_type=source.type,
+                    interval_hours=elapsed_hours / max(len(published), 1),
+                    polls=0,
+                    polls_with_news=0,
+                )
+                session.add(schedule)
+            else:
+                elapsed_hours = (now - schedule.last_polled).total_seconds() / 3600
+
+            new_items = [p for p in published if p > (schedule.last_published or "")]
+            schedule.interval_hours = next_interval_hours(
+                schedule.interval_hours,
+                elapsed_hours,
+                len(new_items),
+                self.min_hours,
+                self.max_hours,
+            )
+            jitter = 1 + self.rng.uniform(-self.jitter, self.jitter)
+            schedule.next_due = now + timedelta(hours=schedule.interval_hours * jitter)
+            schedule.last_polled = now
+            schedule.polls += 1
+            if new_items:
+                schedule.polls_with_news += 1
+                schedule.last_published = max(new_items)
+            session.commit()
+
+            logger.debug(
+                f"{source_key(source)} : {len(new_items)} nouveaux, intervalle "
+                f"{schedule.interval_hours:.1f}h, prochaine relève {schedule.next_due}"
+            )
+
+
+def select_due_sources(sources: list[Source]) -> list[Source]:
+    """Filtre les sources échues si la planification est activée, sinon les retourne toutes"""
+    if not is_scheduler_enabled() or not sources:
+        return sources
+    return PollingScheduler().select_due(sources)
@@ -0,0 +1,159 @@
+"""
+Recherche sémantique dans les articles sauvegardés (endpoint /semantic de web.py)
+
+La requête est encodée par le modèle d'embeddings (chargé une fois par worker), avec un
+cache LRU des embeddings de requêtes (SEMANTIC_QUERY_CACHE_SIZE), puis recherchée dans
+l'index des articles (vector_store.ArticleVectorStore.search).
+
+Articles sauvegardés avant l'existence de l'index :
+    python -m app --reindex-articles
+"""
+
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import numpy as np
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable
+from app.services.vector_store import ArticleVectorStore
+
+QUERY_CACHE_SIZE = int(get_environment_variable("SEMANTIC_QUERY_CACHE_SIZE", "1024"))
+REINDEX_BATCH = 256
+
+
+@lru_cache(maxsize=1)
+def get_embedding_model():
+    from app.services.model_service import init_sentence_model
+
+    return init_sentence_model()
+
+
+@lru_cache(maxsize=1)
+def get_article_store() -> ArticleVectorStore:
+    return ArticleVectorStore()
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _embed_normalized_query(query: str) -> np.ndarray:
+    from app.services.embeddings import encode_texts
+
+    vector = encode_texts(get_embedding_model(), [query])[0]
+    vector.setflags(write=False)  # partagé par toutes les requêtes identiques
+    return vector
+
+
+def embed_query(query: str) -> np.ndarray:
+    """Embedding normalisé de la requête, mis en cache (LRU)"""
+    return _embed_normalized_query(_normalize_query(query))
+
+
+def semantic_search_ids(query: str, limit: int = 10) -> list[tuple[int, float]]:
+    """(id article, similarité) des articles les plus proches de la requête"""
+    store = get_article_store()
+    if not store.is_compatible():
+        logger.warning(
+            Fore.YELLOW
+            + "Index des articles construit avec un autre modèle d'embeddings : recherche sémantique indisponible"
+        )
+        return []
+    scores, ids = store.search(embed_query(query), k=limit)
+    return [
+        (int(article_id), float(score))
+        for article_id, score in zip(ids[0], scores[0])
+        if article_id >= 0
+    ]
+
+
+def semantic_search(query: str, limit: int = 10) -> list[dict]:
+    """Articles sauvegardés les plus proches de la requête, du plus proche au moins proche"""
+    from app.db.db import Article, get_db
+
+    hits = semantic_search_ids(query, limit)
+    if not hits:
+        return []
+    with get_db() as session:
+        rows = session.query(Article).filter(Article.id.in_([i for i, _ in hits])).all()
+        by_id = {row.id: row for row in rows}
+        return [
+            {
+                "title": by_id[article_id].title,
+                "link": by_id[article_id].link,
+                "summary": by_id[article_id].summary,
+                "published": by_id[article_id].published,
+                "dt_created": by_id[article_id].dt_created,
+                "score": round(score * 100, 1),
+                "source": by_id[article_id].source,
+                "also_covered_by": by_id[article_id].also_covered_by,
+            }
+            for article_id, score in hits
+            if article_id in by_id
+        ]
+
+
+def _saved_timestamp(dt_created: datetime) -> float:
+    """dt_created est enregistré en UTC sans fuseau par SQLite"""
+    if dt_created.tzinfo is None:
+        dt_created = dt_created.replace(tzinfo=timezone.utc)
+    return dt_created.timestamp()
+
+
+def reindex_articles(session_factory=None, model=None) -> int:
+    """
+    Ajoute à l'index les articles sauvegardés qui n'y sont pas encore, encodés comme à la
+    sauvegarde (TextPreparer du modèle puis encode_article_chunks) et horodatés à leur date
+    de sauvegarde (fenêtre de la détection de nouveauté), puis construit / complète l'index
+    IVF. Retourne le nombre d'articles ajoutés.
+    """
+    from app.db.db import Article
+    from app.services.embeddings import EmbeddingCache, encode_article_chunks
+
+    if session_factory is None:
+        from app.db.db import SessionLocal
+
+        session_factory = SessionLocal
+    store = ArticleVectorStore()
+    if not store.is_compatible():
+        raise ValueError(
+            f"Index {store.directory} construit avec un autre modèle : le supprimer pour le reconstruire"
+        )
+    indexed = set(store.ids.tolist())
+    with session_factory() as session:
+        missing = [
+            (
+                row.id,
+                {"title": row.title, "summary": row.summary, "link": row.link},
+                _saved_timestamp(row.dt_created),
+            )
+            for row in session.query(
+                Article.id, Article.title, Article.summary, Article.link, Article.dt_created
+            ).order_by(Article.dt_created, Article.id)
+            if row.id not in indexed
+        ]
+    if not missing:
+        logger.info("Tous les articles sauvegardés sont déjà indexés")
+        return 0
+
+    model = model or get_embedding_model()
+    for start in range(0, len(missing), REINDEX_BATCH):
+        batch = missing[start : start + REINDEX_BATCH]
+        # cache dédié : l'historique ne remplace pas les embeddings de l'exécution
+        vectors, _ = encode_article_chunks(
+            [article for _, article, _ in batch], model, EmbeddingCache(max_size=REINDEX_BATCH)
+        )
+        store.add(
+            [article_id for article_id, _, _ in batch],
+            vectors,
+            timestamp=[saved for _, _, saved in batch],
+        )
+        logger.info(f"Réindexation : {min(start + REINDEX_BATCH, len(missing))}/{len(missing)}")
+    store.update_ann(force=True)
+    return len(missing)
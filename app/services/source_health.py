@@ -0,0 +1,210 @@
+"""
+Suivi de santé des sources et disjoncteur (circuit breaker) pour les flux morts
+
+Chaque relève enregistre latence, volume transféré, classe d'erreur et nombre d'échecs
+consécutifs (table source_health). Au-delà de CIRCUIT_BREAKER_THRESHOLD échecs consécutifs,
+la source est ignorée pendant un délai qui double à chaque nouvel échec (backoff exponentiel),
+puis retentée une fois à l'échéance : un succès referme le disjoncteur.
+
+Configuration .env :
+    CIRCUIT_BREAKER_THRESHOLD=3        échecs consécutifs avant ouverture (0 = jamais)
+    CIRCUIT_BREAKER_BASE_MINUTES=60    durée d'ouverture initiale
+    CIRCUIT_BREAKER_MAX_HOURS=168      durée d'ouverture maximale
+
+Rapport :
+    python -m app --health-report
+"""
+
+from datetime import datetime, timedelta
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore, print_color
+from app.core.utils import get_environment_variable
+from app.services.models import Source
+from app.services.polling_scheduler import source_key
+
+# poids de la dernière mesure dans la latence moyenne
+LATENCY_EWMA_ALPHA = 0.3
+
+
+def open_duration(
+    consecutive_failures: int, threshold: int, base_minutes: float, max_hours: float
+) -> timedelta | None:
+    """Durée d'ouverture du disjoncteur après consecutive_failures échecs, None s'il reste fermé"""
+    if threshold <= 0 or consecutive_failures < threshold:
+        return None
+    minutes = base_minutes * 2 ** (consecutive_failures - threshold)
+    return timedelta(minutes=min(minutes, max_hours * 60))
+
+
+class SourceHealthTracker:
+    """Enregistre la santé des sources et décide si une source peut être relevée"""
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from app.db.db import SessionLocal
+
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.threshold = int(get_environment_variable("CIRCUIT_BREAKER_THRESHOLD", "3"))
+        self.base_minutes = float(
+            get_environment_variable("CIRCUIT_BREAKER_BASE_MINUTES", "60")
+        )
+        self.max_hours = float(get_environment_variable("CIRCUIT_BREAKER_MAX_HOURS", "168"))
+
+    def open_sources(self, sources: list[Source], now: datetime | None = None) -> set[str]:
+        """Clés des sources dont le disjoncteur est ouvert (à ignorer pour cette exécution)"""
+        from app.db.db import SourceHealth
+
+        now = now or datetime.now()
+        keys = [source_key(source) for source in sources]
+        with self.session_factory() as session:
+            rows = (
+                session.query(SourceHealth.source_key)
+                .filter(SourceHealth.source_key.in_(keys))
+                .filter(SourceHealth.open_until > now)
+                .all()
+            )
+        return {row.source_key for row in rows}
+
+    def _get_or_create(self, session, source: Source):
+        from app.db.db import SourceHealth
+
+        health = session.get(SourceHealth, source_key(source))
+        if health is None:
+            health = SourceHealth(
+                source_key=source_key(source),
+                source_type=source.type,
+                name=source.name,
+                total_bytes=0,
+                consecutive_failures=0,
+                total_failures=0,
+                total_successes=0,
+            )
+            session.add(health)
+        return health
+
+    @staticmethod
+    def _update_latency(health, latency_ms: float):
+        health.last_latency_ms = latency_ms
+        if health.avg_latency_ms is None:
+            health.avg_latency_ms = latency_ms
+        else:
+            health.avg_latency_ms = (
+                LATENCY_EWMA_ALPHA * latency_ms
+                + (1 - LATENCY_EWMA_ALPHA) * health.avg_latency_ms
+            )
+
+    def record_success(
+        self,
+        source: Source,
+        latency_ms: float,
+        nb_bytes: int | None = None,
+        now: datetime | None = None,
+    ):
+        now = now or datetime.now()
+        with self.session_factory() as session:
+            health = self._get_or_create(session, source)
+            self._update_latency(health, latency_ms)
+            health.last_attempt = now
+            health.last_success = now
+            health.last_bytes = nb_bytes
+            health.total_bytes += nb_bytes or 0
+            health.total_successes += 1
+            if health.consecutive_failures >= max(self.threshold, 1):
+                logger.info(Fore.GREEN + f"Disjoncteur refermé pour {source.url}")
+            health.consecutive_failures = 0
+            health.open_until = None
+            session.commit()
+
+    def record_failure(
+        self,
+        source: Source,
+        latency_ms: float,
+        error: Exception,
+        now: datetime | None = None,
+    ):
+        now = now or datetime.now()
+        with self.session_factory() as session:
+            health = self._get_or_create(session, source)
+            self._update_latency(health, latency_ms)
+            health.last_attempt = now
+            health.last_error_class = type(error).__name__
+            health.last_error = str(error)[:500]
+            health.consecutive_failures += 1
+            health.total_failures += 1
+            duration = open_duration(
+                health.consecutive_failures,
+                self.threshold,
+                self.base_minutes,
+                self.max_hours,
+            )
+            if duration:
+                health.open_until = now + duration
+                logger.warning(
+                    Fore.YELLOW
+                    + f"Disjoncteur ouvert pour {source.url} jusqu'au {health.open_until:%d/%m/%Y %H:%M} "
+                    f"({health.consecutive_failures} échecs consécutifs)"
+                )
+            session.commit()
+
+    def report(self, limit: int = 10) -> tuple[list, list]:
+        """Retourne (sources les plus lentes, sources en échec)"""
+        from app.db.db import SourceHealth
+
+        with self.session_factory() as session:
+            slowest = (
+                session.query(SourceHealth)
+                .filter(SourceHealth.avg_latency_ms.isnot(None))
+                .order_by(SourceHealth.avg_latency_ms.desc())
+                .limit(limit)
+                .all()
+            )
+            broken = (
+                session.query(SourceHealth)
+                .filter(SourceHealth.consecutive_failures > 0)
+                .order_by(
+                    SourceHealth.consecutive_failures.desc(),
+                    SourceHealth.last_success.asc(),
+                )
+                .all()
+            )
+            session.expunge_all()
+        return slowest, broken
+
+
+def print_health_report(limit: int = 10):
+    """Affiche les sources les plus lentes et les sources en échec"""
+    slowest, broken = SourceHealthTracker().report(limit)
+
+    color = Fore.LIGHTBLUE_EX
+    print_color(color, "=" * 60)
+    print_color(color, f"Sources les plus lentes (top {limit})")
+    print_color(color, "=" * 60)
+    for health in slowest:
+        size = f"{health.last_bytes / 1024:.0f} Ko" if health.last_bytes else "-"
+        print(
+            f"{health.avg_latency_ms:>9.0f} ms  {size:>8}  "
+            f"{health.total_successes} ok / {health.total_failures} ko  {health.source_key}"
+        )
+
+    color = Fore.LIGHTRED_EX
+    print_color(color, "=" * 60)
+    print_color(color, f"Sources en échec ({len(broken)})")
+    print_color(color, "=" * 60)
+    for health in broken:
+        state = (
+            f"ignorée jusqu'au {health.open_until:%d/%m/%Y %H:%M}"
+            if health.open_until and health.open_until > datetime.now()
+            else "à retenter"
+        )
+        last_success = (
+            f"{health.last_success:%d/%m/%Y}" if health.last_success else "jamais"
+        )
+        print(
+            f"{health.consecutive_failures:>3} échecs  {health.last_error_class}: {health.last_error}\n"
+            f"     {health.source_key} - dernier succès : {last_success} - {state}"
+        )
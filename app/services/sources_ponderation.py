@@ -1,54 +1,94 @@
+"""
+Sélection des articles à résumer : quotas par source, slots flexibles pondérés
+
+Un seul passage sur les articles filtrés garde, par source, les LIMIT_ARTICLES_TO_RESUME
+mieux notés dans un tas borné (O(n log k)) ; quotas et slots flexibles sont ensuite pris
+dans ces candidats, du meilleur score au moins bon.
+
+Avec SELECTION_MMR=true, la sélection est diversifiée par Maximal Marginal Relevance sur les
+embeddings du filtre (cache de l'exécution) : chaque article retenu maximise
+λ * pertinence - (1 - λ) * similarité maximale aux articles déjà retenus. Des articles
+quasi identiques et bien notés ne monopolisent plus le budget LLM.
+
+Configuration .env :
+    LIMIT_ARTICLES_TO_RESUME=15
+    RSS_WEIGHT=50 / REDDIT_WEIGHT=30 / BLUESKY_WEIGHT=20     % garantis par source
+    FRESHNESS_BOOST_THRESHOLD=0.3
+    SELECTION_MMR=false
+    SELECTION_MMR_LAMBDA=0.7          1 : pertinence seule, 0 : diversité seule
+    SELECTION_MMR_CANDIDATES=3        candidats MMR par source : LIMIT_ARTICLES_TO_RESUME x 3
+"""
+
+import heapq
+from itertools import count
 from math import ceil
+from typing import NamedTuple
 import logging
+
+import numpy as np
+
 from app.services.models import SourceType
 
 logging.basicConfig(level=logging.INFO)
 
 from app.core.logger import logger, Fore
-from app.core import get_environment_variable
+from app.core import get_environment_variable, is_env_enabled
 from app.core.logger import print_color
 from app.core.logger import count_by_type_articles
+from app.services.topic_clustering import score_value
+
+# pondération des slots flexibles par source
+WEIGHTS = {"rss": 1.5, "reddit": 1.0, "bluesky": 1.2}
+
+
+class SelectionSettings(NamedTuple):
+    """Réglages .env de la sélection, lus une fois par sélection"""
+
+    limit: int
+    weights: dict  # % garantis par source
+    freshness_threshold: float
+    mmr: bool
+    mmr_lambda: float
+    mmr_candidates: int  # candidats par source = limit * mmr_candidates
+
+    @classmethod
+    def from_env(cls) -> "SelectionSettings":
+        return cls(
+            limit=int(get_environment_variable("LIMIT_ARTICLES_TO_RESUME", 15)),
+            weights={
+                SourceType.RSS: float(get_environment_variable("RSS_WEIGHT", 50)),
+                SourceType.REDDIT: float(get_environment_variable("REDDIT_WEIGHT", 30)),
+                SourceType.BLUESKY: float(get_environment_variable("BLUESKY_WEIGHT", 20)),
+            },
+            freshness_threshold=float(get_environment_variable("FRESHNESS_BOOST_THRESHOLD", 0.3)),
+            mmr=is_env_enabled("SELECTION_MMR", False),
+            mmr_lambda=float(get_environment_variable("SELECTION_MMR_LAMBDA", "0.7")),
+            mmr_candidates=int(get_environment_variable("SELECTION_MMR_CANDIDATES", "3")),
+        )
 
 
-def _calculate_quotas(total_count):
+def _calculate_quotas(total_count, settings: SelectionSettings):
     """Calcul des quotas par source selon % donnés en .env"""
-    rss_min = ceil(
-        total_count * float(get_environment_variable("RSS_WEIGHT", 50)) / 100
-    )
-    reddit_min = ceil(
-        total_count * float(get_environment_variable("REDDIT_WEIGHT", 30)) / 100
-    )
-    bluesky_min = ceil(
-        total_count * float(get_environment_variable("BLUESKY_WEIGHT", 20)) / 100
-    )
-
-    guaranteed_total = rss_min + reddit_min + bluesky_min
-    remaining_slots = max(0, total_count - guaranteed_total)
-
-    return {
-        "rss_min": rss_min,
-        "reddit_min": reddit_min,
-        "bluesky_min": bluesky_min,
-        "flexible": remaining_slots,
+    quotas = {
+        f"{source.value}_min": ceil(total_count * weight / 100)
+        for source, weight in settings.weights.items()
     }
+    guaranteed_total = sum(quotas.values())
+    quotas["flexible"] = max(0, total_count - guaranteed_total)
+    return quotas
 
 
-def _apply_freshness_adjustment(articles_by_source: list[dict], quotas: dict) -> dict:
+def _apply_freshness_adjustment(
+    rss_count: int, total_articles_sources: int, quotas: dict, settings: SelectionSettings
+) -> dict:
     """Ajustement selon la fraîcheur des RSS"""
-
-    total_articles_sources = len(articles_by_source)
-    articles_rss = list(
-        filter(lambda x: x["source"] == SourceType.RSS, articles_by_source)
-    )
-    recent_rss_ratio = len(articles_rss) / max(1, total_articles_sources)
+    recent_rss_ratio = rss_count / max(1, total_articles_sources)
     logger.info(
         Fore.YELLOW
-        + f"Ratio RSS récents : {recent_rss_ratio:.2f} ({len(articles_rss)}/{total_articles_sources})"
+        + f"Ratio RSS récents : {recent_rss_ratio:.2f} ({rss_count}/{total_articles_sources})"
     )
 
-    threshold = float(get_environment_variable("FRESHNESS_BOOST_THRESHOLD", 0.3))
-
-    if recent_rss_ratio < threshold:
+    if recent_rss_ratio < settings.freshness_threshold:
         # Peu de RSS récents → redistribuer vers autres sources
         boost_slots = quotas["rss_min"] // 3
         quotas["rss_min"] -= boost_slots
@@ -57,22 +97,85 @@ def _apply_freshness_adjustment(articles_by_source: list[dict], quotas: dict) ->
     return quotas
 
 
-def _fill_flexible_slots(remaining_articles, flexible_slots, processed_sources: list):
-    """Répartir les slots flexibles avec pondération"""
-    WEIGHTS = {"rss": 1.5, "reddit": 1.0, "bluesky": 1.2}
+def _top_k_by_source(articles: list[dict], k: int) -> dict[SourceType, list[dict]]:
+    """
+    Un seul passage : les k articles les mieux notés de chaque source (tas min borné),
+    triés par score décroissant, à score égal dans l'ordre d'arrivée.
+    """
+    heaps: dict[SourceType, list] = {}
+    order = count()
+    for article in articles:
+        heap = heaps.setdefault(article["source"], [])
+        # -ordre : à score égal, le premier arrivé est le plus grand (gardé)
+        item = (score_value(article), -next(order), article)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+    return {
+        source: [article for *_, article in sorted(heap, key=lambda x: x[:2], reverse=True)]
+        for source, heap in heaps.items()
+    }
+
+
+class _MMR:
+    """Maximal Marginal Relevance sur les embeddings du filtre, vectorisé"""
+
+    def __init__(self, candidates: list[dict], lambda_: float):
+        from app.services.embeddings import embedding_cache
+
+        self.lambda_ = lambda_
+        vectors = [embedding_cache.get(article) for article in candidates]
+        dim = next((len(v) for v in vectors if v is not None), 1)
+        # sans embedding (article non filtré par les vecteurs) : aucune pénalité de similarité
+        self.vectors = np.vstack(
+            [v if v is not None else np.zeros(dim, dtype=np.float32) for v in vectors]
+        )
+        self.max_similarity = np.zeros(len(candidates), dtype=np.float32)
+
+    def pick(self, pool: list[int], k: int, relevance: list[float]) -> list[int]:
+        """k candidats du pool (indices), un par un, en pénalisant la redondance avec les déjà retenus"""
+        relevance = np.asarray(relevance, dtype=np.float32)
+        relevance = relevance / max(float(relevance.max(initial=0)), 1e-9)
+        indices = np.asarray(pool, dtype=np.int64)
+        available = np.ones(len(pool), dtype=bool)
+        picked = []
+        for _ in range(min(k, len(pool))):
+            mmr = self.lambda_ * relevance - (1 - self.lambda_) * self.max_similarity[indices]
+            best = int(np.argmax(np.where(available, mmr, -np.inf)))
+            available[best] = False
+            picked.append(pool[best])
+            np.maximum(
+                self.max_similarity, self.vectors @ self.vectors[pool[best]], out=self.max_similarity
+            )
+        return picked
+
+
+def _fill_flexible_slots(remaining_articles, flexible_slots, processed_sources: list, mmr=None):
+    """
+    Répartir les slots flexibles avec pondération
+
+    remaining_articles : {source: [(indice du candidat, article), ...]}
+    """
     logger.info(Fore.CYAN + f"{processed_sources}")
     # Mélanger et trier par score pondéré
     weighted_articles = []
     for source, articles in remaining_articles.items():
         if source in processed_sources:
-            for article in articles:
-                # logger.info(Fore.GREEN + f" {type(article)} {article.keys()}")
-                logger.info(Fore.GREEN + f"{article['score']}")
-                weighted_score = float(article["score"]) * WEIGHTS[source]
-                weighted_articles.append((weighted_score, article))
-
-    weighted_articles.sort(key=lambda x: x[0], reverse=True)
-    return [article for _, article in weighted_articles[:flexible_slots]]
+            for index, article in articles:
+                weighted_score = score_value(article) * WEIGHTS[source]
+                weighted_articles.append((weighted_score, -index, article))
+
+    if mmr is not None:
+        position = {-neg_index: article for _, neg_index, article in weighted_articles}
+        picked = mmr.pick(
+            [-neg_index for _, neg_index, _ in weighted_articles],
+            flexible_slots,
+            [weighted_score for weighted_score, *_ in weighted_articles],
+        )
+        return [position[index] for index in picked]
+    best = heapq.nlargest(flexible_slots, weighted_articles, key=lambda x: x[:2])
+    return [article for *_, article in best]
 
 
 def _count_by_type_articles(title, articles):
@@ -100,57 +203,66 @@ def select_articles_for_summary(articles_by_source: list[dict]) -> list[dict]:
         f"Nombre d'articles sources {len(articles_by_source)}", articles_by_source
     )
 
-    limit_articles_to_resume = int(
-        get_environment_variable("LIMIT_ARTICLES_TO_RESUME", 15)
-    )
+    settings = SelectionSettings.from_env()
+    limit_articles_to_resume = settings.limit
 
     # ÉTAPE 1: Calculer les quotas de base (Phase 1)
-    quotas = _calculate_quotas(limit_articles_to_resume)
+    quotas = _calculate_quotas(limit_articles_to_resume, settings)
     # Résultat: {'rss_min': 6, 'reddit_min': 3, 'bluesky_min': 2, 'flexible': 4}
     logger.info(Fore.CYAN + f"Quotas initiaux: {quotas}")
 
+    # un seul passage : meilleurs candidats par source (sans MMR, aucune source ne peut
+    # fournir plus de limit_articles_to_resume articles)
+    per_source = limit_articles_to_resume * (settings.mmr_candidates if settings.mmr else 1)
+    candidates_by_source = _top_k_by_source(articles_by_source, per_source)
+    rss_count = sum(1 for article in articles_by_source if article["source"] == SourceType.RSS)
+
     # ÉTAPE 2: Ajuster selon la fraîcheur des RSS (Phase 4)
-    quotas = _apply_freshness_adjustment(articles_by_source, quotas)
+    quotas = _apply_freshness_adjustment(rss_count, len(articles_by_source), quotas, settings)
     # Peut modifier les quotas si RSS peu actifs
     logger.info(Fore.MAGENTA + f"Quotas après ajustement fraîcheur: {quotas}")
 
+    # candidats numérotés dans l'ordre des sources (index = position pour le MMR)
+    candidates = []
+    indexed_by_source = {}
+    for source in SourceType:
+        for article in candidates_by_source.get(source, []):
+            indexed_by_source.setdefault(source, []).append((len(candidates), article))
+            candidates.append(article)
+    mmr = _MMR(candidates, settings.mmr_lambda) if settings.mmr and candidates else None
+
     # ÉTAPE 3: Sélectionner les articles garantis par quota
     selected_articles = []
     remaining_articles = {}
 
     processed_sources = []
     for source in SourceType:
+        articles = indexed_by_source.get(source, [])
         logger.info(
             Fore.RED
             + f"Traitement source {source.value} avec quota {quotas.get(f'{source.value}_min', 0)}"
+            f" ({len(articles)} candidats)"
         )
-        # articles = articles_by_source[source]
-        articles = list(filter(lambda x: x["source"] == source, articles_by_source))
-
-        count_by_type_articles(
-            f"{len(articles)} articles disponibles pour la source {source.value}",
-            articles,
-        )
-
-        # logger.info(Fore.BLUE + f" - {len(articles)} articles disponibles pour la source {source.value}")
         if not articles:
             continue
 
-        quota_key = f"{source.value}_min"
-        quota = quotas.get(quota_key, 0)
-
-        # Trier par score de pertinence (supposant que c'est déjà fait)
-        selected = articles[:quota]
+        quota = quotas.get(f"{source.value}_min", 0)
+        if mmr is not None:
+            picked = mmr.pick([i for i, _ in articles], quota, [score_value(a) for _, a in articles])
+            chosen = set(picked)
+            selected = [candidates[i] for i in picked]
+            remaining_articles[source] = [(i, a) for i, a in articles if i not in chosen]
+        else:
+            # candidats déjà triés par score décroissant
+            selected = [article for _, article in articles[:quota]]
+            remaining_articles[source] = articles[quota:]
         selected_articles.extend(selected)
-
-        # Garder le reste pour la phase flexible
-        remaining_articles[source] = articles[quota:]
         processed_sources.append(source)
 
     # ÉTAPE 4: Remplir les slots flexibles (Phase 2) : TOTO : à corriger selon si fetcher activé ou non
     if quotas["flexible"] > 0 and processed_sources:
         flexible_articles = _fill_flexible_slots(
-            remaining_articles, quotas["flexible"], processed_sources
+            remaining_articles, quotas["flexible"], processed_sources, mmr
         )
         selected_articles.extend(flexible_articles)
 
@@ -0,0 +1,140 @@
+"""
+Préparation des textes d'articles avant encodage, dans un budget de tokens
+
+Le modèle d'embeddings tronque au-delà de max_seq_length (256 tokens pour MiniLM) : encoder
+un billet de blog complet ou un post Reddit et ses commentaires coûte la tokenisation et la
+mémoire d'un texte en grande partie ignoré, et le signal au-delà de la coupure est perdu.
+
+Modes (EMBEDDING_TEXT_MODE) :
+    truncate    début du texte seulement (comportement du modèle), texte brut borné avant tokenisation
+    head_tail   début et fin du texte dans le budget (titre, chapeau, conclusion)
+    chunks      jusqu'à EMBEDDING_MAX_CHUNKS fenêtres du budget, titre en tête de chaque fenêtre ;
+                le filtre retient la similarité maximale des fenêtres, les étapes suivantes
+                la moyenne normalisée des vecteurs des fenêtres
+
+Le texte brut est borné en caractères avant tokenisation (CHARS_PER_TOKEN par token du budget),
+le coût par article est donc borné quelle que soit la taille du contenu. Les tokenisations
+sont gardées en cache (EMBEDDING_TOKEN_CACHE_SIZE) : un article relu d'une exécution à l'autre
+n'est pas retokenisé.
+
+Configuration .env :
+    EMBEDDING_TEXT_MODE=truncate
+    EMBEDDING_MAX_TOKENS=                 budget par texte encodé (défaut : max_seq_length du modèle - 2)
+    EMBEDDING_MAX_CHUNKS=4
+    EMBEDDING_HEAD_RATIO=0.75             part du budget pour le début du texte (head_tail)
+    EMBEDDING_TOKEN_CACHE_SIZE=20000
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from app.core.utils import get_environment_variable
+
+MODES = ("truncate", "head_tail", "chunks")
+# borne haute du nombre de caractères par token (sous-mots de ~4 caractères en moyenne)
+CHARS_PER_TOKEN = 8
+_WORD_RE = re.compile(r"\S+")
+
+
+class TextPreparer:
+    """Découpe / fenêtrage des textes d'articles dans un budget de tokens"""
+
+    def __init__(
+        self,
+        tokenizer=None,
+        max_tokens: int = 254,
+        mode: str = "truncate",
+        max_chunks: int = 4,
+        head_ratio: float = 0.75,
+        cache_size: int = 20000,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"EMBEDDING_TEXT_MODE={mode} inconnu, valeurs possibles : {', '.join(MODES)}")
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.mode = mode
+        self.max_chunks = max(1, max_chunks)
+        self.head_ratio = head_ratio
+        self._offsets = lru_cache(maxsize=cache_size)(self._tokenize)
+
+    @classmethod
+    def from_model(cls, model=None) -> "TextPreparer":
+        """Préparateur configuré par le .env, budget par défaut : max_seq_length du modèle"""
+        max_tokens = get_environment_variable("EMBEDDING_MAX_TOKENS")
+        if not max_tokens:
+            # [CLS] et [SEP] comptent dans max_seq_length
+            max_tokens = (getattr(model, "max_seq_length", None) or 256) - 2
+        return cls(
+            tokenizer=getattr(model, "tokenizer", None),
+            max_tokens=int(max_tokens),
+            mode=get_environment_variable("EMBEDDING_TEXT_MODE", "truncate").lower(),
+            max_chunks=int(get_environment_variable("EMBEDDING_MAX_CHUNKS", "4")),
+            head_ratio=float(get_environment_variable("EMBEDDING_HEAD_RATIO", "0.75")),
+            cache_size=int(get_environment_variable("EMBEDDING_TOKEN_CACHE_SIZE", "20000")),
+        )
+
+    def _tokenize(self, text: str) -> tuple[tuple[int, int], ...]:
+        """Positions (début, fin) des tokens dans le texte"""
+        if self.tokenizer is None:
+            return tuple(match.span() for match in _WORD_RE.finditer(text))
+        encoding = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        return tuple(tuple(offset) for offset in encoding["offset_mapping"])
+
+    def token_count(self, text: str) -> int:
+        return len(self._offsets(text))
+
+    def _bounded(self, text: str, tokens: int) -> str:
+        """Texte borné en caractères avant tokenisation (début et fin en mode head_tail)"""
+        limit = tokens * CHARS_PER_TOKEN
+        if len(text) <= limit:
+            return text
+        if self.mode == "head_tail":
+            head = int(limit * self.head_ratio)
+            return f"{text[:head]} {text[len(text) - (limit - head):]}"
+        return text[:limit]
+
+    def _windows(self, text: str, budget: int, count: int) -> list[str]:
+        """Au plus count fenêtres de budget tokens, réparties sur tout le texte"""
+        offsets = self._offsets(text)
+        starts = list(range(0, len(offsets), budget)) or [0]
+        if len(starts) > count:
+            starts = [starts[i] for i in np.linspace(0, len(starts) - 1, count).round().astype(int)]
+        windows = []
+        for start in starts:
+            window = offsets[start : start + budget]
+            windows.append(text[window[0][0] : window[-1][1]] if window else text)
+        return windows
+
+    def prepare(self, title: str, body: str) -> list[str]:
+        """Textes à encoder pour un article (un seul, sauf en mode chunks)"""
+        title = (title or "").strip()
+        body = (body or "").strip()
+        full = f"{title} {body}".strip()
+        if self.mode == "truncate":
+            return [self._bounded(full, self.max_tokens)]
+        if self.mode == "head_tail":
+            text = self._bounded(full, self.max_tokens)
+            offsets = self._offsets(text)
+            if len(offsets) <= self.max_tokens:
+                return [text]
+            tail = max(1, self.max_tokens - int(self.max_tokens * self.head_ratio))
+            head = self.max_tokens - tail
+            return [f"{text[: offsets[head - 1][1]]} … {text[offsets[-tail][0]:]}"]
+
+        # chunks : le titre précède chaque fenêtre du contenu
+        body = self._bounded(body, self.max_tokens * self.max_chunks)
+        budget = max(self.max_tokens - self.token_count(title), self.max_tokens // 2)
+        if not body:
+            return [title]
+        return [f"{title} {window}".strip() for window in self._windows(body, budget, self.max_chunks)]
+
+    def prepare_article(self, article: dict) -> list[str]:
+        return self.prepare(article.get("title"), article.get("summary"))
+
+
+@lru_cache(maxsize=4)
+def get_text_preparer(model=None) -> TextPreparer:
+    """Préparateur (et son cache de tokenisation) partagé pour un modèle"""
+    return TextPreparer.from_model(model)
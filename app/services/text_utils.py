@@ -0,0 +1,159 @@
+"""
+Utilitaires texte pour le traitement des articles
+
+html_to_text : extraction du texte d'un fragment HTML en un seul passage sur le flux de
+tokens de html.parser, sans construire d'arbre DOM. Produit le même texte que
+BeautifulSoup(text, "html.parser").get_text() (mêmes règles d'entités, d'espaces et
+d'exclusion des contenus script/style/template) pour un coût bien moindre par entrée.
+"""
+
+import re
+from html.entities import html5
+from html.parser import HTMLParser
+
+# entités nommées indexées sans ';' comme le fait BeautifulSoup ("amp" -> "&")
+_ENTITIES = {name.rstrip(";"): char for name, char in html5.items()}
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+# chaînes non retenues par get_text() (Script, Stylesheet, TemplateString, Ruby*)
+_EXCLUDED_CONTAINERS = frozenset(("script", "style", "template", "rt", "rp"))
+_PRESERVE_WHITESPACE = frozenset(("pre", "textarea"))
+_VOID_ELEMENTS = frozenset(
+    (
+        "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link",
+        "menuitem", "meta", "param", "source", "track", "wbr", "basefont", "bgsound",
+        "command", "frame", "image", "isindex", "nextid", "spacer",
+    )
+)
+_DECIMAL_WITH_DATA = re.compile("^([0-9]+)(.*)")
+_HEX_WITH_DATA = re.compile("^([0-9a-f]+)(.*)")
+
+
+def _numeric_reference(numeric: int) -> str:
+    """Résolution d'une référence numérique selon l'algorithme HTML5 (comme UnicodeDammit)"""
+    if numeric == 0 or numeric > 0x10FFFF or 0xD800 <= numeric <= 0xDFFF:
+        return "�"
+    if 0x80 <= numeric <= 0x9F:
+        # références encodées en Windows-1252 plutôt qu'en Unicode
+        try:
+            return bytes([numeric]).decode("cp1252")
+        except UnicodeDecodeError:
+            pass
+    return chr(numeric)
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts: list[str] = []
+        self._current: list[str] = []
+        self._stack: list[str] = []
+        self._closed_voids: list[str] = []
+        self._excluded = 0
+        self._preserve = 0
+
+    # --- segments de texte : un segment se termine à chaque balise ou commentaire
+
+    def _end_data(self):
+        if not self._current:
+            return
+        data = "".join(self._current)
+        self._current = []
+        if not self._preserve and not data.strip(_ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        if not self._excluded:
+            self.parts.append(data)
+
+    def handle_data(self, data):
+        self._current.append(data)
+
+    def handle_entityref(self, name):
+        self._current.append(_ENTITIES.get(name, f"&{name}"))
+
+    def handle_charref(self, name):
+        base, pattern = 10, _DECIMAL_WITH_DATA
+        if name[:1] in ("x", "X"):
+            name, base, pattern = name[1:], 16, _HEX_WITH_DATA
+        try:
+            self._current.append(_numeric_reference(int(name, base)))
+        except ValueError:
+            match = pattern.search(name)
+            if match is None:
+                self._current.append(name)
+            else:
+                self._current.append(_numeric_reference(int(match.group(1), base)))
+                self._current.append(match.group(2))
+
+    def unknown_decl(self, data):
+        self._end_data()
+        if data.upper().startswith("CDATA["):
+            # les sections CDATA sont retenues quel que soit le conteneur
+            excluded, self._excluded = self._excluded, 0
+            self._current.append(data[len("CDATA[") :])
+            self._end_data()
+            self._excluded = excluded
+
+    # --- balises : pile des balises ouvertes, une fermeture referme aussi les balises
+    # ouvertes après elle (même règle que l'arbre BeautifulSoup)
+
+    def _push(self, tag):
+        self._stack.append(tag)
+        if tag in _EXCLUDED_CONTAINERS:
+            self._excluded += 1
+        elif tag in _PRESERVE_WHITESPACE:
+            self._preserve += 1
+
+    def _pop(self):
+        tag = self._stack.pop()
+        if tag in _EXCLUDED_CONTAINERS:
+            self._excluded -= 1
+        elif tag in _PRESERVE_WHITESPACE:
+            self._preserve -= 1
+
+    def handle_starttag(self, tag, attrs):
+        self._end_data()
+        if tag in _VOID_ELEMENTS:
+            # déjà fermée : un </br> ultérieur est ignoré
+            self._closed_voids.append(tag)
+        else:
+            self._push(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self._end_data()
+        self._push(tag)
+        self._pop()
+
+    def handle_endtag(self, tag):
+        if tag in self._closed_voids:
+            self._closed_voids.remove(tag)
+            return
+        self._end_data()
+        if tag in self._stack:
+            while self._stack[-1] != tag:
+                self._pop()
+            self._pop()
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    def handle_decl(self, decl):
+        self._end_data()
+
+    def handle_pi(self, data):
+        self._end_data()
+
+    def close(self):
+        super().close()
+        self._end_data()
+
+
+def html_to_text(text: str) -> str:
+    """Supprime les balises HTML d'un texte pour n'avoir que du texte brut."""
+    if not text:
+        return ""
+    # texte déjà brut : rien à analyser
+    if "<" not in text and "&" not in text and not text.isspace():
+        return text
+    extractor = _TextExtractor()
+    extractor.feed(text)
+    extractor.close()
+    return "".join(extractor.parts)
@@ -0,0 +1,77 @@
+"""
+Regroupement par sujet des articles filtrés
+
+Plusieurs articles retenus par le filtre sémantique traitent souvent du même évènement
+sans être des quasi-doublons (angles et rédactions différents). Ils sont regroupés par
+classification hiérarchique (lien moyen, distance cosinus) sur les embeddings déjà
+calculés par le filtre : un groupe = un sujet = un seul appel LLM pour un résumé
+multi-sources.
+
+Configuration .env :
+    TOPIC_CLUSTERING=false            active le noeud de regroupement avant summarize
+    TOPIC_CLUSTER_THRESHOLD=0.75      similarité cosinus moyenne minimale au sein d'un sujet
+    TOPIC_CLUSTER_MAX_ARTICLES=5      articles d'un sujet transmis au LLM (les mieux notés)
+"""
+
+import numpy as np
+
+from app.services.dedup import source_name
+
+
+def score_value(article: dict) -> float:
+    """Score de pertinence numérique ("82.3", "82.3 %" ou nombre)"""
+    try:
+        return float(str(article.get("score", 0)).rstrip(" %"))
+    except ValueError:
+        return 0.0
+
+
+def cluster_by_topic(vectors: np.ndarray, threshold: float) -> list[list[int]]:
+    """
+    Groupes d'indices (vecteurs normalisés) dont la similarité moyenne dépasse threshold,
+    dans l'ordre du premier élément de chaque groupe.
+    """
+    if len(vectors) < 2:
+        return [[i] for i in range(len(vectors))]
+    from sklearn.cluster import AgglomerativeClustering
+
+    labels = AgglomerativeClustering(
+        n_clusters=None,
+        metric="cosine",
+        linkage="average",
+        distance_threshold=1 - threshold,
+    ).fit_predict(vectors)
+    groups: dict[int, list[int]] = {}
+    for i, label in enumerate(labels):
+        groups.setdefault(label, []).append(i)
+    return list(groups.values())
+
+
+def group_articles_by_topic(
+    articles: list[dict], vectors: np.ndarray, threshold: float, max_articles: int = 5
+) -> list[dict]:
+    """
+    Un article par sujet : le mieux noté, accompagné des autres articles du sujet
+    transmis au LLM (champ "topic_members", au plus max_articles - 1) ; tous les autres
+    articles du sujet sont cités dans "also_covered_by".
+    """
+    topics = []
+    for group in cluster_by_topic(vectors, threshold):
+        representative, *others = sorted(
+            (articles[i] for i in group), key=score_value, reverse=True
+        )
+        if others:
+            representative["topic_members"] = others[: max(max_articles - 1, 0)]
+            covered = list(representative.get("also_covered_by") or [])
+            for other in others:
+                covered.append(
+                    {
+                        "title": other.get("title"),
+                        "link": other.get("link"),
+                        "source": source_name(other),
+                    }
+                )
+                covered.extend(other.get("also_covered_by") or [])
+            representative["also_covered_by"] = covered
+        topics.append(representative)
+    return topics
@@ -0,0 +1,353 @@
+"""
+Vecteurs des articles sauvegardés, sur disque en ajout seul (memory-mapped)
+
+Fichiers du répertoire ARTICLES_VECTORS_DIR :
+    meta.json       dimension et modèle d'embeddings (un autre modèle n'est pas mélangé)
+    vectors.f32     vecteurs normalisés L2, une ligne float32 par article
+    rows.i64        (id article, horodatage de sauvegarde en secondes), une ligne par article
+
+save_to_db ajoute les vecteurs des articles insérés au fil des commits (écriture en fin de
+fichier, sans réécrire l'existant). Les lectures passent par np.memmap : le cache de pages
+de l'OS est partagé entre processus et seules les pages lues sont chargées. Les lignes
+étant ajoutées dans l'ordre chronologique, les articles des N derniers jours forment la
+fin des fichiers (recherche dichotomique sur l'horodatage) : la comparaison reste exacte
+et ne porte que sur cette fenêtre, quelle que soit la taille de l'historique. Des articles
+réindexés a posteriori (--reindex-articles) gardent leur date de sauvegarde : l'ordre est
+alors rompu (meta.json "ordered": false) et la fenêtre est lue par un parcours des horodatages.
+
+Recherche sur tout l'historique (search) : un index FAISS IVF (ivf.faiss) couvre les
+premières lignes du stockage, les lignes ajoutées depuis sa construction (la « queue »)
+sont comparées exactement, et les deux résultats sont fusionnés. L'index est ouvert en
+memory-map (lecture seule) : tous les workers uvicorn partagent les mêmes pages. Il est
+complété par update_ann dès que la queue dépasse ANN_MAX_TAIL lignes, réentraîné quand
+le stockage a trop grandi pour son nombre de listes, et remplacé atomiquement (les
+lecteurs rechargent le nouveau fichier à la requête suivante).
+
+Configuration .env :
+    ANN_MIN_TRAIN=20000     en dessous, recherche exacte seulement (quelques ms)
+    ANN_MAX_TAIL=10000      lignes non indexées tolérées avant complément de l'index
+    ANN_NPROBE=16           listes IVF visitées par requête
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+from app.core.logger import logger, Fore
+from app.core.utils import get_environment_variable
+from app.services.embedding_tuning import DEFAULT_MODEL_EMBEDDINGS, embedding_setting
+
+ROW_DTYPE = np.int64
+ROW_WIDTH = 2  # id, horodatage
+ADD_BATCH = 100_000
+TRAIN_POINTS_PER_LIST = 40  # échantillon d'entraînement k-means (faiss recommande >= 39)
+
+
+def suggested_nlist(count: int) -> int:
+    """Nombre de listes IVF usuel : ~4 * sqrt(N)"""
+    return max(1, int(4 * np.sqrt(count)))
+
+
+def _merge_top_k(
+    scores_a: np.ndarray, ids_a: np.ndarray, scores_b: np.ndarray, ids_b: np.ndarray, k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Fusionne deux résultats (m, *) en gardant les k meilleurs scores par requête"""
+    scores = np.concatenate([scores_a, scores_b], axis=1)
+    ids = np.concatenate([ids_a, ids_b], axis=1)
+    scores = np.where(ids < 0, -np.inf, scores)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+class ArticleVectorStore:
+    """Stockage des embeddings des articles sauvegardés (id article -> vecteur)"""
+
+    def __init__(self, directory: str | Path | None = None, model_name: str | None = None):
+        self.directory = Path(
+            directory
+            or get_environment_variable("ARTICLES_VECTORS_DIR", "./data/article_vectors")
+        )
+        # même réglage que le modèle chargé (.env, sinon fichier de tuning)
+        self.model_name = model_name or embedding_setting(
+            "MODEL_EMBEDDINGS", DEFAULT_MODEL_EMBEDDINGS
+        )
+        self._size = -1
+        self._vectors = None
+        self._rows = None
+        self._ann = None
+        self._ann_mtime = None
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / "meta.json"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / "vectors.f32"
+
+    @property
+    def _rows_path(self) -> Path:
+        return self.directory / "rows.i64"
+
+    @property
+    def _ann_path(self) -> Path:
+        return self.directory / "ivf.faiss"
+
+    def _read_meta(self) -> dict | None:
+        if not self._meta_path.exists():
+            return None
+        return json.loads(self._meta_path.read_text())
+
+    def is_compatible(self) -> bool:
+        """Le stockage est vide ou a été construit avec le modèle courant"""
+        meta = self._read_meta()
+        return meta is None or meta.get("model") == self.model_name
+
+    @property
+    def dim(self) -> int | None:
+        meta = self._read_meta()
+        return meta["dim"] if meta else None
+
+    def _refresh(self):
+        """(Ré)ouvre les memmaps si des lignes ont été ajoutées depuis la dernière lecture"""
+        size = self._rows_path.stat().st_size if self._rows_path.exists() else 0
+        if size == self._size:
+            return
+        self._size = size
+        count = size // (ROW_WIDTH * np.dtype(ROW_DTYPE).itemsize)
+        if count == 0:
+            self._vectors = self._rows = None
+            return
+        self._rows = np.memmap(
+            self._rows_path, dtype=ROW_DTYPE, mode="r", shape=(count, ROW_WIDTH)
+        )
+        # vectors.f32 peut contenir une ligne de plus qu'rows.i64 (écriture interrompue, retirée
+        # au prochain ajout)
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim)
+        )
+
+    def __len__(self) -> int:
+        self._refresh()
+        return 0 if self._rows is None else len(self._rows)
+
+    @property
+    def ids(self) -> np.ndarray:
+        self._refresh()
+        return np.empty(0, dtype=ROW_DTYPE) if self._rows is None else self._rows[:, 0]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        self._refresh()
+        return (
+            np.empty((0, self.dim or 0), dtype=np.float32)
+            if self._vectors is None
+            else self._vectors
+        )
+
+    def add(
+        self, ids: list[int], vectors: np.ndarray, timestamp: float | list[float] | None = None
+    ) -> int:
+        """
+        Ajoute les vecteurs (normalisés) des articles ids, horodatés timestamp (un pour tous
+        ou un par article, maintenant par défaut). Retourne le nombre de lignes ajoutées.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if not len(ids):
+            return 0
+        meta = self._read_meta()
+        if meta is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            meta = {"dim": int(vectors.shape[1]), "model": self.model_name}
+            self._meta_path.write_text(json.dumps(meta))
+        elif meta["model"] != self.model_name or meta["dim"] != vectors.shape[1]:
+            logger.warning(
+                Fore.YELLOW
+                + f"Index des articles construit avec {meta['model']} ({meta['dim']}), "
+                f"vecteurs {self.model_name} ({vectors.shape[1]}) non ajoutés"
+            )
+            return 0
+
+        timestamps = np.broadcast_to(
+            np.asarray(time.time() if timestamp is None else timestamp, dtype=np.float64),
+            (len(ids),),
+        ).astype(ROW_DTYPE)
+        self._refresh()
+        if meta.get("ordered", True) and (
+            (self._rows is not None and timestamps[0] < self._rows[-1, 1])
+            or (np.diff(timestamps) < 0).any()
+        ):
+            meta["ordered"] = False
+            self._meta_path.write_text(json.dumps(meta))
+        rows = np.column_stack([np.asarray(ids, dtype=ROW_DTYPE), timestamps])
+        # fin d'une écriture interrompue (vecteur sans ligne, ligne incomplète) retirée : la
+        # ligne i de rows.i64 reste alignée sur le vecteur i de vectors.f32
+        count = len(self)
+        row_bytes = ROW_WIDTH * np.dtype(ROW_DTYPE).itemsize
+        # vecteurs d'abord : une ligne de rows.i64 pointe toujours vers un vecteur écrit
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(count * meta["dim"] * np.dtype(np.float32).itemsize)
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self._rows_path, "ab") as f:
+            f.truncate(count * row_bytes)
+            f.write(rows.tobytes())
+        return len(ids)
+
+    def max_similarity_since(
+        self, queries: np.ndarray, since: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Pour chaque requête (vecteur normalisé), similarité maximale et id de l'article
+        le plus proche parmi ceux sauvegardés depuis since (secondes). -1 si aucun article.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        self._refresh()
+        best_sims = np.full(len(queries), -1.0, dtype=np.float32)
+        best_ids = np.full(len(queries), -1, dtype=ROW_DTYPE)
+        if self._rows is None or not len(queries):
+            return best_sims, best_ids
+        if self._read_meta().get("ordered", True):
+            window_rows = slice(int(np.searchsorted(self._rows[:, 1], since, side="left")), None)
+        else:
+            window_rows = np.flatnonzero(np.asarray(self._rows[:, 1]) >= since)
+        window = self._vectors[window_rows]
+        if not len(window):
+            return best_sims, best_ids
+        scores = queries @ window.T
+        best = scores.argmax(axis=1)
+        best_sims = scores[np.arange(len(queries)), best]
+        best_ids = np.asarray(self._rows[window_rows, 0])[best]
+        return best_sims, best_ids
+
+
+    # --- index ANN (IVF) sur l'historique complet
+
+    def _load_ann(self):
+        """Index IVF en memory-map, rechargé si le fichier a été remplacé"""
+        import faiss
+
+        if not self._ann_path.exists():
+            self._ann = self._ann_mtime = None
+            return None
+        mtime = self._ann_path.stat().st_mtime_ns
+        if mtime != self._ann_mtime:
+            self._ann = faiss.read_index(
+                str(self._ann_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+            self._ann_mtime = mtime
+        return self._ann
+
+    def ann_size(self) -> int:
+        """Nombre de lignes couvertes par l'index IVF (les premières du stockage)"""
+        ann = self._load_ann()
+        return 0 if ann is None else ann.ntotal
+
+    def update_ann(self, force: bool = False) -> bool:
+        """
+        Complète (ou construit / réentraîne) l'index IVF avec les lignes de la queue,
+        dès qu'elle dépasse ANN_MAX_TAIL lignes (toujours avec force).
+        Retourne True si l'index a été réécrit.
+        """
+        import faiss
+
+        count = len(self)
+        min_train = int(get_environment_variable("ANN_MIN_TRAIN", "20000"))
+        max_tail = int(get_environment_variable("ANN_MAX_TAIL", "10000"))
+        if count < min_train:
+            return False
+        built = self.ann_size()
+        if built == count or (count - built < max_tail and built and not force):
+            return False
+
+        vectors, ids = self.vectors, self.ids
+        current = self._load_ann()
+        if current is None or faiss.extract_index_ivf(current).nlist < suggested_nlist(count) / 2:
+            nlist = suggested_nlist(count)
+            logger.info(
+                Fore.CYAN + f"Construction de l'index IVF des articles ({count} vecteurs, {nlist} listes)"
+            )
+            quantizer = faiss.IndexFlatIP(self.dim)
+            ann = faiss.IndexIVFFlat(quantizer, self.dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            sample_size = min(count, nlist * TRAIN_POINTS_PER_LIST)
+            sample = np.random.default_rng(0).choice(count, sample_size, replace=False)
+            ann.train(np.ascontiguousarray(vectors[np.sort(sample)]))
+            start = 0
+        else:
+            # copie modifiable de l'index (celui des lecteurs est en lecture seule)
+            ann = faiss.read_index(str(self._ann_path))
+            start = ann.ntotal
+            logger.info(
+                Fore.CYAN + f"Complément de l'index IVF des articles : {count - start} vecteurs"
+            )
+        for offset in range(start, count, ADD_BATCH):
+            end = min(offset + ADD_BATCH, count)
+            ann.add_with_ids(
+                np.ascontiguousarray(vectors[offset:end]),
+                np.ascontiguousarray(ids[offset:end]),
+            )
+        tmp_path = self._ann_path.with_suffix(".tmp")
+        faiss.write_index(ann, str(tmp_path))
+        os.replace(tmp_path, self._ann_path)
+        return True
+
+    def search(
+        self, queries: np.ndarray, k: int = 10, nprobe: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        k articles les plus proches de chaque requête (vecteur normalisé) sur tout
+        l'historique : index IVF + comparaison exacte de la queue. ids à -1 si moins de k.
+        """
+        queries = np.ascontiguousarray(np.atleast_2d(queries), dtype=np.float32)
+        count = len(self)
+        empty_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        empty_ids = np.full((len(queries), 0), -1, dtype=ROW_DTYPE)
+        if count == 0:
+            return _merge_top_k(empty_scores, empty_ids, empty_scores, empty_ids, k)
+
+        ann = self._load_ann()
+        built = 0 if ann is None else ann.ntotal
+        ann_scores, ann_ids = empty_scores, empty_ids
+        if built:
+            ann.nprobe = nprobe or int(get_environment_variable("ANN_NPROBE", "16"))
+            ann_scores, ann_ids = ann.search(queries, min(k, built))
+
+        tail_scores, tail_ids = empty_scores, empty_ids
+        if built < count:
+            scores = queries @ self._vectors[built:count].T
+            top = min(k, count - built)
+            best = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+            tail_scores = np.take_along_axis(scores, best, axis=1)
+            tail_ids = np.asarray(self._rows[built:count, 0])[best]
+        return _merge_top_k(ann_scores, ann_ids, tail_scores, tail_ids, k)
+
+
+def index_saved_articles(saved: list[dict], store: ArticleVectorStore | None = None) -> int:
+    """
+    Ajoute à l'index les embeddings (cache de l'exécution) des articles insérés par save_to_db.
+    Les articles sans embedding en cache sont ignorés.
+    """
+    from app.services.embeddings import embedding_cache
+
+    ids, vectors = [], []
+    for article in saved:
+        vector = embedding_cache.get_by_link(article.get("link"))
+        if vector is not None and article.get("id") is not None:
+            ids.append(article["id"])
+            vectors.append(vector)
+    if not ids:
+        return 0
+    store = store or ArticleVectorStore()
+    added = store.add(ids, np.vstack(vectors))
+    logger.info(f"Index des articles : {added} vecteurs ajoutés ({len(store)} au total)")
+    if added:
+        store.update_ann()
+    return added
@@ -0,0 +1,66 @@
+"""
+Benchmark du pré-filtre lexical (CASCADE_FILTER) : répartition par palier et débit
+
+Usage :
+    python -m tests.bench.bench_cascade_filter                        # tests/data/feed_samples.xml, FILTER_KEYWORDS
+    python -m tests.bench.bench_cascade_filter feed.xml --accept 4 --reject -1 --repeat 50
+
+Affiche le nombre d'articles décidés par le palier lexical (acceptés / rejetés), ceux envoyés
+aux embeddings (zone ambiguë) et la réduction du volume à encoder.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import feedparser
+
+from app.core.utils import get_environment_variable
+from app.services.lexical_filter import cascade_split
+from app.services.text_utils import html_to_text
+
+DEFAULT_SAMPLE = Path(__file__).parent.parent / "data" / "feed_samples.xml"
+
+
+def load_articles(locations: list[str]) -> list[dict]:
+    articles = []
+    for location in locations:
+        for entry in feedparser.parse(location).entries:
+            articles.append(
+                {
+                    "title": entry.get("title", ""),
+                    "summary": html_to_text(entry.get("summary", "")),
+                    "link": entry.get("link", ""),
+                }
+            )
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("feeds", nargs="*", default=[str(DEFAULT_SAMPLE)])
+    parser.add_argument("--accept", type=float, default=4)
+    parser.add_argument("--reject", type=float, default=-1)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    keywords = get_environment_variable(
+        "FILTER_KEYWORDS", "ai agent,genai,artificial intelligence,python,django,cybersecurité,cve"
+    ).split(",")
+    articles = load_articles(args.feeds)
+    accepted, ambiguous, rejected = cascade_split(
+        articles, keywords, threshold=0.5, reject_score=args.reject, accept_score=args.accept
+    )
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        cascade_split(articles, keywords, threshold=0.5, reject_score=args.reject, accept_score=args.accept)
+    rate = len(articles) * args.repeat / (time.perf_counter() - start)
+
+    print(f"{len(articles)} articles, mots-clés {keywords}")
+    print(f"palier lexical : {len(accepted)} acceptés, {len(rejected)} rejetés")
+    print(f"embeddings     : {len(ambiguous)} ambigus ({len(articles) / max(len(ambiguous), 1):.1f}x moins d'articles à encoder)")
+    print(f"débit lexical  : {rate:,.0f} articles/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark des backends d'embeddings (EMBEDDING_BACKEND) : chargement, débit, écart au fp32
+
+Usage :
+    python -m tests.bench.bench_embedding_backends                                  # MODEL_EMBEDDINGS, tous les backends
+    python -m tests.bench.bench_embedding_backends --model all-MiniLM-L6-v2 --backends torch,torch-int8
+    python -m tests.bench.bench_embedding_backends feed.xml --repeat 5 --batch-size 64
+
+Textes : entrées des flux donnés (par défaut tests/data/feed_samples.xml), mots-clés : FILTER_KEYWORDS.
+L'écart (drift) est celui des scores texte / mot-clé par rapport au backend torch fp32,
+"flips" compte les articles dont la décision du filtre sémantique change.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import feedparser
+import torch
+
+from app.core.utils import get_environment_variable
+from app.services.embedding_backends import BACKENDS, load_sentence_model, parity_report
+from app.services.embeddings import encode_texts
+from app.services.text_utils import html_to_text
+
+DEFAULT_SAMPLE = Path(__file__).parent.parent / "data" / "feed_samples.xml"
+
+
+def load_texts(locations: list[str], minimum: int) -> list[str]:
+    """Titre + contenu des entrées des flux, répétés pour atteindre minimum textes"""
+    texts = []
+    for location in locations:
+        for entry in feedparser.parse(location).entries:
+            texts.append(f"{entry.get('title', '')} {html_to_text(entry.get('summary', ''))}".strip())
+    texts = [text for text in texts if text]
+    return (texts * (minimum // max(len(texts), 1) + 1))[: max(minimum, len(texts))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("feeds", nargs="*", default=[str(DEFAULT_SAMPLE)])
+    parser.add_argument("--model", default=get_environment_variable("MODEL_EMBEDDINGS", "all-MiniLM-L6-v2"))
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--texts", type=int, default=512, help="textes encodés par passe")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    texts = load_texts(args.feeds, args.texts)
+    keywords = get_environment_variable(
+        "FILTER_KEYWORDS", "ai agent,genai,artificial intelligence,python,django,cybersecurité,cve"
+    ).split(",")
+    print(f"{args.model} : {len(texts)} textes, {len(keywords)} mots-clés, {torch.get_num_threads()} threads torch")
+
+    reference = None
+    reference_rate = None
+    for backend in args.backends.split(","):
+        start = time.perf_counter()
+        try:
+            model = load_sentence_model(args.model, backend)
+        except Exception as e:
+            # backends ONNX sans sentence-transformers[onnx]
+            print(f"{backend:<11} indisponible : {str(e).splitlines()[0]}")
+            continue
+        load_time = time.perf_counter() - start
+        encode_texts(model, texts[: args.batch_size], batch_size=args.batch_size)  # préchauffage
+
+        durations = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            encode_texts(model, texts, batch_size=args.batch_size)
+            durations.append(time.perf_counter() - start)
+        rate = len(texts) / min(durations)
+
+        line = f"{backend:<11} chargement {load_time:5.1f} s, {rate:7.1f} textes/s"
+        if reference is None:
+            reference, reference_rate = model, rate
+        else:
+            report = parity_report(reference, model, keywords, texts)
+            line += (
+                f", x{rate / reference_rate:.2f}, drift moyen {report['mean_abs_drift']:.4f}"
+                f" max {report['max_abs_drift']:.4f}, mot-clé identique {report['top_keyword_agreement']:.1%},"
+                f" flips {report['filter_flips']}"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark du pool de processus d'encodage (EMBEDDING_WORKERS) : débit selon le nombre de processus
+
+Usage :
+    python -m tests.bench.bench_embedding_pool                                 # MODEL_EMBEDDINGS, 1/2/4/8 processus
+    python -m tests.bench.bench_embedding_pool --workers 1,4,8,16 --threads 2 --texts 4096
+
+Référence : un seul processus avec tous les threads torch (comportement sans pool).
+Chaque configuration est mesurée après démarrage et préchauffage des processus (modèle chaud).
+"""
+
+import argparse
+import os
+import time
+
+import torch
+
+from app.core.utils import get_environment_variable
+from app.services.embedding_backends import load_sentence_model
+from app.services.embedding_pool import EmbeddingPool
+from app.services.embeddings import encode_texts
+from tests.bench.bench_embedding_backends import DEFAULT_SAMPLE, load_texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("feeds", nargs="*", default=[str(DEFAULT_SAMPLE)])
+    parser.add_argument("--model", default=get_environment_variable("MODEL_EMBEDDINGS", "all-MiniLM-L6-v2"))
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--threads", type=int, default=1, help="threads torch par processus")
+    parser.add_argument("--texts", type=int, default=2048)
+    parser.add_argument("--chunk", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    # les processus du pool chargent le modèle via MODEL_EMBEDDINGS
+    os.environ["MODEL_EMBEDDINGS"] = args.model
+    texts = load_texts(args.feeds, args.texts)
+    print(f"{args.model} : {len(texts)} textes, {os.cpu_count()} CPU")
+
+    model = load_sentence_model(args.model)
+    encode_texts(model, texts[:32])
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        encode_texts(model, texts)
+    reference = len(texts) * args.repeat / (time.perf_counter() - start)
+    print(f"1 processus, {torch.get_num_threads()} threads : {reference:7.1f} textes/s")
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        pool = EmbeddingPool(workers, threads_per_worker=args.threads, chunk_size=args.chunk)
+        try:
+            pool.encode(texts[: workers * args.chunk], model)  # démarrage + préchauffage
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                pool.encode(texts, model)
+            rate = len(texts) * args.repeat / (time.perf_counter() - start)
+        finally:
+            pool.close()
+        print(f"pool {workers} x {args.threads} thread(s) : {rate:7.1f} textes/s (x{rate / reference:.2f})")
+
+
+if __name__ == "__main__":
+    main()
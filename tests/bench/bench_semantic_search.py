@@ -0,0 +1,89 @@
+"""
+Benchmark de la recherche sur l'index des articles (IVF memory-mapped + queue exacte)
+comparée à la recherche exacte sur tout l'historique
+
+Usage :
+    python -m tests.bench.bench_semantic_search                     # 1 000 000 vecteurs de dimension 384
+    python -m tests.bench.bench_semantic_search --n 50000 --queries 500 --tail 5000
+
+Les vecteurs sont synthétiques (sujets = centres aléatoires + bruit, répertoire temporaire) :
+seules la latence et le rappel par rapport à la recherche exacte sont mesurés. Objectif :
+p95 sous 50 ms à 1M vecteurs. Les vecteurs sont générés et écrits par lots (1,5 Go sur disque
+pour 1M x 384), la recherche exacte lit le stockage en memory-map.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.vector_store import ArticleVectorStore
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _topic_vectors(count: int, centers: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Vecteurs groupés autour de sujets, comme des embeddings d'articles"""
+    topics = rng.integers(0, len(centers), count)
+    noise = rng.standard_normal((count, centers.shape[1])).astype(np.float32) * 0.06
+    return _normalize(centers[topics] + noise).astype(np.float32)
+
+
+def _percentiles(durations: list[float]) -> str:
+    p50, p95 = np.percentile(np.array(durations) * 1000, [50, 95])
+    return f"p50 {p50:.2f} ms, p95 {p95:.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=1_000_000, help="vecteurs indexés")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--tail", type=int, default=2_000, help="vecteurs ajoutés après l'index")
+    parser.add_argument("--topics", type=int, default=2_000, help="sujets distincts")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ.setdefault("ANN_MIN_TRAIN", "1000")
+        store = ArticleVectorStore(directory, model_name="bench")
+        centers = _normalize(rng.standard_normal((args.topics, args.dim)).astype(np.float32))
+        for start in range(0, args.n, 50_000):
+            end = min(start + 50_000, args.n)
+            store.add(list(range(start, end)), _topic_vectors(end - start, centers, rng))
+
+        start_time = time.perf_counter()
+        store.update_ann(force=True)
+        print(f"Construction IVF ({args.n} vecteurs) : {time.perf_counter() - start_time:.1f} s")
+        tail = _topic_vectors(args.tail, centers, rng)
+        store.add(list(range(args.n, args.n + args.tail)), tail)
+
+        # lecteur neuf : même situation qu'un worker web (index en memory-map)
+        reader = ArticleVectorStore(directory, model_name="bench")
+        all_vectors = reader.vectors
+        queries = _topic_vectors(args.queries, centers, rng)
+        ann_times, exact_times, recalls = [], [], []
+        for query in queries:
+            start_time = time.perf_counter()
+            _, ids = reader.search(query, k=args.k)
+            ann_times.append(time.perf_counter() - start_time)
+
+            start_time = time.perf_counter()
+            exact = np.argpartition(-(all_vectors @ query), args.k)[: args.k]
+            exact_times.append(time.perf_counter() - start_time)
+            recalls.append(len(set(ids[0]) & set(exact)) / args.k)
+
+        p95 = np.percentile(np.array(ann_times) * 1000, 95)
+        print(f"IVF + queue ({args.tail} lignes) : {_percentiles(ann_times)}")
+        print(f"Objectif p95 < 50 ms : {'atteint' if p95 < 50 else 'non atteint'}")
+        print(f"Exacte : {_percentiles(exact_times)}")
+        print(f"Rappel@{args.k} moyen : {np.mean(recalls):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark html_to_text (extraction en flux) vs BeautifulSoup(...).get_text() sur des entrées de flux réels
+
+Usage :
+    python -m tests.bench.bench_strip_html                         # échantillon tests/data/feed_samples.xml
+    python -m tests.bench.bench_strip_html my.opml                 # tous les flux d'un OPML
+    python -m tests.bench.bench_strip_html https://domain.ntld/feed.xml feed.xml --repeat 20
+
+Vérifie aussi que les deux implémentations produisent exactement le même texte.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import feedparser
+from bs4 import BeautifulSoup
+
+from app.read_opml import parse_opml_to_rss_list
+from app.services.fetchers.rss_fetcher import RSSFetcher
+from app.services.text_utils import html_to_text
+
+DEFAULT_SAMPLE = Path(__file__).parent.parent / "data" / "feed_samples.xml"
+
+
+def _bs4_get_text(text: str) -> str:
+    return BeautifulSoup(text, "html.parser").get_text()
+
+
+def load_entries_html(locations: list[str]) -> list[str]:
+    """Contenu HTML (après assainissement feedparser) des entrées des flux donnés"""
+    feeds = []
+    for location in locations:
+        if location.endswith(".opml"):
+            feeds.extend(feed.lien_rss for feed in parse_opml_to_rss_list(location))
+        else:
+            feeds.append(location)
+
+    fetcher = RSSFetcher()
+    contents = []
+    for feed_location in feeds:
+        feed = feedparser.parse(feed_location, sanitize_html=True)
+        contents.extend(fetcher.get_summary(entry) for entry in feed.entries)
+    return contents
+
+
+def bench(func, contents: list[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content in contents:
+            func(content)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark strip_html")
+    parser.add_argument("feeds", nargs="*", default=[str(DEFAULT_SAMPLE)])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    contents = load_entries_html(args.feeds)
+    total_kb = sum(len(c) for c in contents) / 1024
+    print(f"{len(contents)} entrées, {total_kb:.1f} Ko de HTML, {args.repeat} répétitions")
+
+    mismatches = [c for c in contents if html_to_text(c) != _bs4_get_text(c)]
+    print(f"Parité : {len(contents) - len(mismatches)}/{len(contents)} entrées identiques")
+
+    elapsed_bs4 = bench(_bs4_get_text, contents, args.repeat)
+    elapsed_fast = bench(html_to_text, contents, args.repeat)
+    calls = len(contents) * args.repeat
+    print(f"BeautifulSoup : {elapsed_bs4 / calls * 1e6:8.1f} µs/entrée")
+    print(f"html_to_text  : {elapsed_fast / calls * 1e6:8.1f} µs/entrée")
+    print(f"Accélération  : x{elapsed_bs4 / elapsed_fast:.1f}")
+
+
+if __name__ == "__main__":
+    main()
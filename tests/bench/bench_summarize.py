@@ -0,0 +1,149 @@
+"""
+Benchmark du noeud summarize contre le serveur LLM factice (sans Ollama ni GPU)
+
+Usage :
+    python -m tests.bench.bench_summarize                              # tous les scénarios
+    python -m tests.bench.bench_summarize --scenarios baseline,batch --articles 30 --tps 40
+    python -m tests.bench.bench_summarize --parallel 4 --error-rate 0.05 --seed 1
+
+Les articles (RSS longs, posts Bluesky courts) sont générés à partir d'une graine et le
+serveur factice (app.services.llm_stub) tire ses temps de la même graine : deux exécutions
+donnent les mêmes requêtes, les mêmes erreurs et des durées comparables. Chaque scénario
+active un réglage (compression, résumé groupé, cascade, concurrence) et affiche la durée,
+le nombre de requêtes et les tokens envoyés / générés.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+from app.services.llm_stub import LLMStub, StubConfig, start_stub_server
+
+SCENARIOS = {
+    "baseline": {},
+    "compression": {"COMPRESSION_ENABLED": "true"},
+    "batch": {"BATCH_SUMMARY": "true"},
+    "cascade": {"LLM_CASCADE": "true"},
+    "concurrency": {"LLM_CONCURRENCY_MAX": "4"},
+    "all": {
+        "COMPRESSION_ENABLED": "true",
+        "BATCH_SUMMARY": "true",
+        "LLM_CONCURRENCY_MAX": "4",
+    },
+}
+# réglages remis à leur valeur par défaut avant chaque scénario
+DEFAULTS = {
+    "COMPRESSION_ENABLED": "false",
+    "BATCH_SUMMARY": "false",
+    "LLM_CASCADE": "false",
+    "LLM_CONCURRENCY_MAX": "1",
+    "SUMMARY_ARTICLE_DEADLINE": "0",
+    "SUMMARY_RUN_BUDGET": "0",
+    "SELECTION_MMR": "false",
+}
+WORDS = (
+    "python release performance security model inference agent benchmark latency kernel "
+    "database framework migration vulnerability patch cloud container scheduler compiler"
+).split()
+
+
+def make_articles(count: int, seed: int) -> list[dict]:
+    """Deux tiers d'articles RSS longs, un tiers de posts Bluesky courts"""
+    from app.services.models import SourceType
+
+    rng = random.Random(seed)
+
+    def sentences(n):
+        return " ".join(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+            for _ in range(n)
+        )
+
+    articles = []
+    for i in range(count):
+        short = i % 3 == 2
+        articles.append(
+            {
+                "title": f"Article {i} {rng.choice(WORDS)}",
+                "summary": sentences(rng.randint(1, 2) if short else rng.randint(15, 40)),
+                "link": f"https://example.com/{i}",
+                "score": f"{rng.uniform(50, 100):.1f}",
+                "published": "2025-10-20",
+                "source": SourceType.BLUESKY if short else SourceType.RSS,
+            }
+        )
+    return articles
+
+
+def run_scenario(server, config: StubConfig, name: str, articles: list[dict]) -> dict:
+    from app.nodes.summarize_nodes import summarize_node
+    from app.services.adaptive_concurrency import get_concurrency_controller
+    from app.services.models import UnifiedState
+
+    os.environ.update({**DEFAULTS, **SCENARIOS[name]})
+    get_concurrency_controller.cache_clear()
+    # serveur neuf pour chaque scénario : mêmes tirages, statistiques remises à zéro
+    stub = LLMStub(config)
+    server.RequestHandlerClass.stub = stub
+    start = time.perf_counter()
+    result = summarize_node(UnifiedState(filtered_articles=[dict(a) for a in articles], keywords=[]))
+    elapsed = time.perf_counter() - start
+    return {
+        "scenario": name,
+        "seconds": elapsed,
+        "summaries": len(result.summaries),
+        "statuses": Counter(s["summary_status"] for s in result.summaries),
+        **stub.stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--articles", type=int, default=24)
+    parser.add_argument("--ttft-ms", type=float, default=200)
+    parser.add_argument("--prefill-tps", type=float, default=2000)
+    parser.add_argument("--tps", type=float, default=60)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--parallel", type=int, default=2)
+    parser.add_argument("--output-tokens", type=int, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        ttft_ms=args.ttft_ms,
+        prefill_tps=args.prefill_tps,
+        tokens_per_second=args.tps,
+        jitter=args.jitter,
+        parallel=args.parallel,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    server, _, base_url = start_stub_server(config)
+    # URL lue à chaque initialisation du LLM (init_llm_chat)
+    os.environ["OLLAMA_BASE_URL"] = base_url
+    os.environ["LIMIT_ARTICLES_TO_RESUME"] = str(args.articles)
+    sys.argv = [sys.argv[0]]
+    articles = make_articles(args.articles, args.seed)
+
+    rows = [run_scenario(server, config, name, articles) for name in args.scenarios.split(",")]
+    server.shutdown()
+
+    print(f"\n{args.articles} articles, serveur factice {config}")
+    print(f"{'scénario':<12} {'durée':>8} {'requêtes':>9} {'erreurs':>8} {'tokens prompt':>14} {'tokens générés':>15}  résumés")
+    for row in rows:
+        statuses = ", ".join(f"{status} {count}" for status, count in sorted(row["statuses"].items()))
+        print(
+            f"{row['scenario']:<12} {row['seconds']:>7.2f}s {row.get('requests', 0):>9} "
+            f"{row.get('errors', 0):>8} {row.get('prompt_tokens', 0):>14} "
+            f"{row.get('completion_tokens', 0):>15}  {row['summaries']} ({statuses})"
+        )
+
+
+if __name__ == "__main__":
+    main()
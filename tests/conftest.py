@@ -27,3 +27,34 @@ def mock_env_vars(monkeypatch):
     monkeypatch.setenv("LIMIT_ARTICLES_TO_RESUME", "5")
     monkeypatch.setenv("FRESHNESS_BOOST_THRESHOLD", "0.3")
 
+
+
+@pytest.fixture(scope="session")
+def tiny_sentence_model_path(tmp_path_factory):
+    """
+    Petit modèle SentenceTransformer (BERT aléatoire, vocabulaire caractères) construit
+    localement : les tests d'embeddings n'ont pas besoin de télécharger un modèle.
+    """
+    import string
+
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    directory = tmp_path_factory.mktemp("tiny_model")
+    characters = string.ascii_lowercase + string.digits
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *characters, *(f"##{c}" for c in characters)]
+    (directory / "vocab.txt").write_text("\n".join(vocab))
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(vocab), hidden_size=64, num_hidden_layers=2,
+        num_attention_heads=4, intermediate_size=128, max_position_embeddings=512,
+    )
+    BertModel(config).save_pretrained(directory / "bert")
+    BertTokenizerFast(str(directory / "vocab.txt")).save_pretrained(directory / "bert")
+    transformer = models.Transformer(str(directory / "bert"), max_seq_length=256)
+    model = SentenceTransformer(
+        modules=[transformer, models.Pooling(transformer.get_word_embedding_dimension(), "mean")]
+    )
+    model.save(str(directory / "sentence"))
+    return str(directory / "sentence")
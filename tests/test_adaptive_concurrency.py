@@ -0,0 +1,102 @@
+"""Tests du contrôle adaptatif (AIMD) de la concurrence des requêtes LLM"""
+
+"""
+pytest tests/test_adaptive_concurrency.py -v
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.adaptive_concurrency import AIMDController, run_adaptive
+
+
+class SimulatedBackend:
+    """Serveur LLM simulé : `parallel` requêtes traitées à la fois, les autres en file FIFO"""
+
+    def __init__(self, parallel: int, service_time: float):
+        self._server = ThreadPoolExecutor(max_workers=parallel)
+        self.service_time = service_time
+
+    def request(self, value=None):
+        self._server.submit(time.sleep, self.service_time).result()
+        return value
+
+
+def test_results_in_task_order():
+    controller = AIMDController(max_limit=4)
+    backend = SimulatedBackend(parallel=4, service_time=0.001)
+    tasks = [lambda i=i: backend.request(i) for i in range(20)]
+    assert run_adaptive(controller, tasks) == list(range(20))
+
+
+def test_converges_near_server_parallelism():
+    controller = AIMDController(min_limit=1, max_limit=12)
+    backend = SimulatedBackend(parallel=3, service_time=0.02)
+    start = time.monotonic()
+    run_adaptive(controller, [backend.request] * 200)
+    elapsed = time.monotonic() - start
+    # monte au-delà du parallélisme du serveur puis redescend (file d'attente côté serveur)
+    assert max(controller.history) >= 4
+    assert 2 <= controller.limit <= 7
+    assert max(controller.history) < 12
+    # séquentiel : 200 x 0.02 = 4s, idéal : 4 / 3 = 1.3s
+    assert elapsed < 200 * 0.02 * 0.6
+
+
+def test_backs_off_on_errors():
+    controller = AIMDController(min_limit=1, max_limit=8, initial=8)
+
+    def failing():
+        raise ConnectionError("503")
+
+    with pytest.raises(ConnectionError):
+        run_adaptive(controller, [failing] * 16)
+    assert controller.limit == 1
+
+
+def test_backs_off_when_latency_rises():
+    controller = AIMDController(min_limit=1, max_limit=8, initial=4, latency_tolerance=1.5)
+    controller.baseline = 0.01
+    backend = SimulatedBackend(parallel=1, service_time=0.01)
+    run_adaptive(controller, [backend.request] * 4)
+    # 4 requêtes en vol sur un serveur séquentiel : latence moyenne ~2.5 x la base
+    assert controller.limit == 2
+    assert controller.history == [4, 2]
+
+
+def test_retry_after_error():
+    controller = AIMDController(max_limit=2)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise TimeoutError("lecture")
+        return "ok"
+
+    assert controller.call(flaky, retries=1) == "ok"
+    assert len(attempts) == 2
+    with pytest.raises(TimeoutError):
+        AIMDController().call(lambda: (_ for _ in ()).throw(TimeoutError("x")), retries=0)
+
+
+def test_summarize_node_concurrent_keeps_order(mock_articles, mock_env_vars, monkeypatch):
+    from unittest.mock import patch
+
+    from app.nodes.summarize_nodes import summarize_node
+    from app.services.adaptive_concurrency import get_concurrency_controller
+    from app.services.models import UnifiedState
+
+    monkeypatch.setenv("LLM_CONCURRENCY_MAX", "4")
+    get_concurrency_controller.cache_clear()
+    backend = SimulatedBackend(parallel=2, service_time=0.01)
+    with patch(
+        "app.nodes.summarize_nodes._summarize_article",
+        side_effect=lambda title, content, deadline=None: backend.request(f"résumé {title}"),
+    ):
+        result = summarize_node(UnifiedState(filtered_articles=mock_articles, keywords=[]))
+    get_concurrency_controller.cache_clear()
+    assert [s["summary"] for s in result.summaries] == [f"résumé {s['title']}" for s in result.summaries]
+    assert len(result.summaries) == 5
@@ -0,0 +1,82 @@
+"""Tests du résumé groupé des contenus courts"""
+
+"""
+pytest tests/test_batch_summary.py -v
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.services.batch_summary import parse_batch_response, short_batches
+from app.services.models import SourceType, UnifiedState
+
+
+def _post(title, words=10, source=SourceType.BLUESKY, score="80.0"):
+    return {
+        "title": title,
+        "summary": " ".join(["mot"] * words),
+        "link": f"https://example.com/{title}",
+        "score": score,
+        "published": "2025-10-20",
+        "source": source,
+    }
+
+
+def test_parse_batch_response_validates_each_item():
+    response = """```json
+[{"id": 1, "summary": "Premier résumé."},
+ {"id": 2, "summary": "   "},
+ {"id": 7, "summary": "id inconnu"},
+ {"id": "x", "summary": "id invalide"},
+ {"id": 3, "summary": "Troisième résumé."},
+ {"id": 1, "summary": "doublon"}]
+```"""
+    assert parse_batch_response(response, {1, 2, 3}) == {1: "Premier résumé.", 3: "Troisième résumé."}
+
+
+def test_parse_batch_response_truncated():
+    response = '[{"id": 1, "summary": "Complet."}, {"id": 2, "summary": "Tronq'
+    assert parse_batch_response(response, {1, 2}) == {1: "Complet."}
+    assert parse_batch_response("pas de JSON", {1}) == {}
+
+
+def test_short_batches(monkeypatch):
+    monkeypatch.setenv("BATCH_SUMMARY_MAX_WORDS", "50")
+    articles = [_post(f"p{i}") for i in range(5)] + [_post("long", words=200)]
+    articles.append({**_post("sujet"), "topic_members": [_post("autre")]})
+    batches = short_batches(articles, 2)
+    assert [[a["title"] for a in batch] for batch in batches] == [["p0", "p1"], ["p2", "p3"]]
+
+
+def test_summarize_node_batches_short_posts(mock_env_vars, monkeypatch):
+    from app.nodes import summarize_nodes
+
+    monkeypatch.setenv("BATCH_SUMMARY", "true")
+    monkeypatch.setenv("BATCH_SUMMARY_SIZE", "8")
+    monkeypatch.setenv("LIMIT_ARTICLES_TO_RESUME", "10")
+    monkeypatch.setenv("BLUESKY_WEIGHT", "100")
+    posts = [_post(f"post{i}", score=f"{90 - i}.0") for i in range(4)]
+    # le post 3 manque dans la réponse : appel individuel
+    response = json.dumps([{"id": i + 1, "summary": f"Résumé groupé {i}"} for i in range(3)])
+    calls = []
+
+    class FakeLLM:
+        def stream(self, prompt, timeout=None):
+            calls.append(prompt)
+            yield SimpleNamespace(content=response)
+
+    monkeypatch.setattr(summarize_nodes, "init_llm_chat", lambda max_tokens=None: FakeLLM())
+    with patch.object(summarize_nodes, "_summarize_article", return_value="Résumé individuel") as single:
+        result = summarize_nodes.summarize_node(UnifiedState(filtered_articles=posts, keywords=[]))
+
+    assert len(calls) == 1
+    assert all(f"[{i}] post{i - 1}" in calls[0] for i in range(1, 5))
+    assert [s["summary"] for s in result.summaries] == [
+        "Résumé groupé 0",
+        "Résumé groupé 1",
+        "Résumé groupé 2",
+        "Résumé individuel",
+    ]
+    single.assert_called_once()
+    assert single.call_args.args[0] == "post3"
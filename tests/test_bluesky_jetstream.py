@@ -0,0 +1,137 @@
+"""Tests de l'ingestion Bluesky Jetstream contre un serveur WebSocket local qui rejoue des évènements enregistrés."""
+"""
+pytest tests/test_bluesky_jetstream.py -v
+"""
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.checkpoint import GraphCheckpoint
+from app.db.db import Base
+from app.services.bluesky_jetstream import (
+    BlueskyStreamQueue,
+    JetstreamConsumer,
+    jetstream_event_to_post,
+)
+from app.services.models import SourceType
+
+EVENTS_FILE = Path(__file__).parent / "data" / "jetstream_events.jsonl"
+DID = "did:plc:techwriter"
+# garde les posts 2025 enregistrés, écarte celui de 2020
+MAX_DAYS = (datetime.now() - datetime(2024, 1, 1)).days
+
+
+@pytest.fixture
+def queue(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+    Base.metadata.create_all(engine)
+    return BlueskyStreamQueue(sessionmaker(bind=engine))
+
+
+async def _replay(consumer: JetstreamConsumer) -> list[str]:
+    """Lance un stand-in Jetstream qui rejoue le fichier d'évènements puis ferme la connexion"""
+    from websockets.asyncio.server import serve
+
+    requested = []
+
+    async def handler(ws):
+        requested.append(ws.request.path)
+        for line in EVENTS_FILE.read_text().splitlines():
+            await ws.send(line)
+        await ws.close()
+
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        consumer.url = f"ws://127.0.0.1:{port}/subscribe"
+        await asyncio.wait_for(consumer.run(reconnect=False), timeout=10)
+    return requested
+
+
+def test_replay_fills_durable_queue(queue):
+    consumer = JetstreamConsumer(
+        dids=[DID], queue=queue, handles={DID: "techwriter.bsky.social"}
+    )
+    requested = asyncio.run(_replay(consumer))
+
+    params = parse_qs(urlparse(requested[0]).query)
+    assert params["wantedCollections"] == ["app.bsky.feed.post"]
+    assert params["wantedDids"] == [DID]
+
+    # le curseur est persisté avec le dernier lot
+    assert queue.get_cursor() == 1760960000000008
+
+    articles = queue.drain(MAX_DAYS)
+    # like, identité, suppression, DID non suivi, doublon et post trop ancien écartés
+    assert [a["link"] for a in articles] == [
+        "https://bsky.app/profile/techwriter.bsky.social/post/3m3aaa1",
+        "https://bsky.app/profile/techwriter.bsky.social/post/3m3aaa5",
+    ]
+    first, reply = articles
+    assert first["source"] == SourceType.BLUESKY
+    assert "🔗 Django 6.0 alpha 1 released" in first["summary"]
+    assert reply["summary"].startswith("↳ Réponse à un post")
+    assert "- Diagramme RAG" in reply["summary"]
+
+    # la file est vidée
+    assert queue.drain(MAX_DAYS) == []
+
+
+def test_drained_posts_kept_until_release(queue):
+    consumer = JetstreamConsumer(dids=[DID], queue=queue)
+    asyncio.run(_replay(consumer))
+
+    # exécution interrompue après la lecture : les posts restent en file
+    first = queue.drain(MAX_DAYS, run_id="run-1")
+    assert len(first) == 2
+    # l'exécution suivante les relit puis les supprime une fois enregistrés
+    assert queue.drain(MAX_DAYS, run_id="run-2") == first
+    assert queue.release("run-1") == 0
+    assert queue.release("run-2") == 3
+    assert queue.drain(MAX_DAYS, run_id="run-3") == []
+
+
+def test_posts_of_a_live_run_are_not_taken_over(queue):
+    consumer = JetstreamConsumer(dids=[DID], queue=queue)
+    asyncio.run(_replay(consumer))
+    first = queue.drain(MAX_DAYS, run_id="run-1")
+    # run-1 a des points de reprise : en cours (autre processus) ou reprenable
+    with queue.session_factory() as session:
+        session.add(
+            GraphCheckpoint(
+                thread_id="run-1", checkpoint_id="1", type="msgpack", checkpoint=b"",
+                meta_type="msgpack", meta=b"",
+            )
+        )
+        session.commit()
+
+    assert queue.drain(MAX_DAYS, run_id="run-2") == []
+    assert queue.release("run-2") == 0
+    # la reprise de run-1 relit ses posts, puis les supprime
+    assert queue.drain(MAX_DAYS, run_id="run-1") == first
+    assert queue.release("run-1") == 3
+
+
+def test_reconnect_resumes_from_cursor(queue):
+    queue.push([], cursor=1760960000000008)
+    consumer = JetstreamConsumer(dids=[DID], queue=queue)
+    params = parse_qs(urlparse(consumer.subscribe_url()).query)
+    assert int(params["cursor"][0]) < 1760960000000008
+
+
+def test_non_post_events_are_ignored():
+    assert jetstream_event_to_post({"kind": "account", "did": DID}) is None
+    assert (
+        jetstream_event_to_post(
+            {
+                "kind": "commit",
+                "did": DID,
+                "commit": {"operation": "delete", "collection": "app.bsky.feed.post"},
+            }
+        )
+        is None
+    )
@@ -0,0 +1,137 @@
+"""Tests des points de reprise LangGraph en base SQLite"""
+
+"""
+pytest tests/test_checkpoint.py -v
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph
+from sqlalchemy import create_engine
+
+from app.db.checkpoint import (
+    GraphCheckpoint,
+    GraphCheckpointValue,
+    SQLiteCheckpointSaver,
+    run_config,
+)
+from app.services.models import SourceType, UnifiedState
+
+
+@pytest.fixture
+def saver(tmp_path):
+    return SQLiteCheckpointSaver(create_engine(f"sqlite:///{tmp_path / 'checkpoints.db'}"))
+
+
+def _article(i: int) -> dict:
+    return {
+        "title": f"Article {i}",
+        "summary": f"Contenu de l'article {i}. " * 40,
+        "link": f"https://example.com/{i}",
+        "score": f"{90 - i}.0",
+        "published": "2025-10-20",
+        "source": SourceType.RSS,
+    }
+
+
+def test_resume_from_last_finished_node(saver):
+    calls = []
+
+    def fetch(state):
+        calls.append("fetch")
+        state.articles = [_article(i) for i in range(20)]
+        return state
+
+    def filter_(state):
+        calls.append("filter")
+        state.filtered_articles = state.articles[:5]
+        return state
+
+    def summarize(state):
+        calls.append("summarize")
+        if calls.count("summarize") == 1:
+            raise RuntimeError("arrêt du processus")
+        state.summaries = [{"title": a["title"]} for a in state.filtered_articles]
+        return state
+
+    graph = StateGraph(UnifiedState)
+    for name, node in (("fetch", fetch), ("filter", filter_), ("summarize", summarize)):
+        graph.add_node(name, RunnableLambda(node))
+    graph.set_entry_point("fetch")
+    graph.add_edge("fetch", "filter")
+    graph.add_edge("filter", "summarize")
+    agent = graph.compile(checkpointer=saver)
+    config = run_config("run-1")
+
+    with pytest.raises(RuntimeError):
+        agent.invoke(UnifiedState(keywords=["python"]), config)
+    state = agent.get_state(config)
+    assert state.next == ("summarize",)
+    assert state.values["articles"][0]["source"] == SourceType.RSS
+
+    result = agent.invoke(None, config)
+    assert calls == ["fetch", "filter", "summarize", "summarize"]
+    assert len(result["summaries"]) == 5
+
+    # la liste d'articles, renvoyée par chaque noeud, n'est enregistrée qu'une fois
+    with saver.Session() as session:
+        assert session.query(GraphCheckpoint).count() >= 4
+        assert session.query(GraphCheckpointValue).count() <= 8
+
+    saver.delete_thread("run-1")
+    assert agent.get_state(config).next == ()
+
+
+def test_summarize_node_resumes_per_article(saver, monkeypatch):
+    from app.db import checkpoint
+    from app.nodes import summarize_nodes
+
+    monkeypatch.setattr(checkpoint, "get_checkpointer", lambda: saver)
+    prompts = []
+
+    class FlakyLLM:
+        def stream(self, prompt, timeout=None):
+            prompts.append(prompt)
+            if len(prompts) == 2:
+                raise ConnectionError("LLM arrêté")
+            yield SimpleNamespace(content="Résumé généré.")
+
+    monkeypatch.setattr(summarize_nodes, "init_llm_chat", lambda: FlakyLLM())
+    state = UnifiedState(filtered_articles=[_article(1), _article(2)], keywords=[])
+    config = run_config("run-2")
+
+    with pytest.raises(ConnectionError):
+        summarize_nodes.summarize_node(state, config)
+    assert set(saver.load_summaries("run-2")) == {"https://example.com/1"}
+
+    result = summarize_nodes.summarize_node(state, config)
+    # reprise : seul l'article 2 est envoyé au LLM
+    assert len(prompts) == 3
+    assert "Article 2" in prompts[-1]
+    assert [s["summary"] for s in result.summaries] == ["Résumé généré.", "Résumé généré."]
+
+
+def test_purge_expired_runs(saver):
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import update
+
+    from app.db.checkpoint import SummaryCheckpoint
+
+    for run_id in ("ancien", "récent", "repris"):
+        saver.save_summary(run_id, "https://example.com/1", "Résumé.", "complete")
+    old = datetime.now() - timedelta(days=30)
+    with saver.Session.begin() as session:
+        session.execute(
+            update(SummaryCheckpoint)
+            .where(SummaryCheckpoint.thread_id.in_(["ancien", "repris"]))
+            .values(dt_created=old)
+        )
+
+    assert saver.purge_expired(0) == []
+    # l'exécution reprise est conservée même expirée
+    assert saver.purge_expired(7, keep="repris") == ["ancien"]
+    assert saver.load_summaries("ancien") == {}
+    assert saver.load_summaries("récent") and saver.load_summaries("repris")
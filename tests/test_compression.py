@@ -0,0 +1,115 @@
+"""Tests de la compression extractive avant le prompt de résumé"""
+
+"""
+pytest tests/test_compression.py -v
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.services.compression import (
+    CompressionStats,
+    ExtractiveCompressor,
+    pagerank,
+    split_sentences,
+)
+from app.services.models import SourceType, UnifiedState
+
+
+def word_count(text):
+    return len(text.split())
+
+
+LEAD = "Python 3.14 sort avec un interpréteur sans GIL."
+ON_TOPIC = [
+    "Le mode sans GIL de Python permet le parallélisme réel des threads Python.",
+    "Les benchmarks Python montrent un gain des threads sans GIL sur les calculs.",
+    "Les extensions Python doivent déclarer leur compatibilité avec le mode sans GIL.",
+]
+OFF_TOPIC = [
+    "Un commentateur partage la photo de son chat.",
+    "Merci pour le lien, bonne journée à tous.",
+]
+TEXT = " ".join([LEAD, OFF_TOPIC[0], *ON_TOPIC, OFF_TOPIC[1]])
+
+
+def test_split_sentences():
+    assert split_sentences("Première phrase. Deuxième ! Troisième?\nLigne") == [
+        "Première phrase.",
+        "Deuxième !",
+        "Troisième?",
+        "Ligne",
+    ]
+    assert split_sentences("Version 3.14 de Python.") == ["Version 3.14 de Python."]
+
+
+def test_pagerank_favours_central_sentences():
+    similarity = np.array([[0, 1, 1], [1, 0, 0], [1, 0, 0]], dtype=float)
+    scores = pagerank(similarity)
+    assert scores.sum() == pytest.approx(1.0)
+    assert scores[0] > scores[1] == pytest.approx(scores[2])
+
+
+def test_compress_keeps_lead_and_central_sentences_in_order():
+    compressor = ExtractiveCompressor(max_tokens=40, token_counter=word_count)
+    compressed, before, after = compressor.compress("Python sans GIL", TEXT)
+    assert before == word_count(TEXT)
+    assert after == word_count(compressed) <= 40
+    assert compressed.startswith(LEAD)
+    assert all(sentence not in compressed for sentence in OFF_TOPIC)
+    kept = [s for s in ON_TOPIC if s in compressed]
+    positions = [compressed.index(s) for s in kept]
+    assert kept and positions == sorted(positions)
+
+
+def test_compress_leaves_short_text_untouched():
+    compressor = ExtractiveCompressor(max_tokens=400, token_counter=word_count)
+    assert compressor.compress("titre", TEXT) == (TEXT, word_count(TEXT), word_count(TEXT))
+
+
+def test_compress_with_embeddings(tiny_sentence_model_path):
+    from sentence_transformers import SentenceTransformer
+
+    compressor = ExtractiveCompressor(
+        max_tokens=30,
+        method="embeddings",
+        token_counter=word_count,
+        model=SentenceTransformer(tiny_sentence_model_path, device="cpu"),
+    )
+    compressed, before, after = compressor.compress("Python sans GIL", TEXT)
+    assert compressed.startswith(LEAD)
+    assert after <= 30 < before
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        ExtractiveCompressor(method="lsa")
+
+
+def test_stats():
+    stats = CompressionStats()
+    stats.add(1000, 400)
+    stats.add(100, 100)
+    assert (stats.articles, stats.compressed, stats.tokens_saved) == (2, 1, 600)
+
+
+def test_summarize_node_sends_compressed_content(mock_env_vars, monkeypatch):
+    from app.nodes.summarize_nodes import summarize_node
+
+    monkeypatch.setenv("COMPRESSION_ENABLED", "true")
+    monkeypatch.setenv("COMPRESSION_MAX_TOKENS", "40")
+    monkeypatch.setattr("app.services.compression.get_token_counter", lambda: word_count)
+    article = {
+        "title": "Python sans GIL",
+        "summary": TEXT,
+        "link": "https://example.com/gil",
+        "score": "90.0",
+        "published": "2025-10-20",
+        "source": SourceType.RSS,
+    }
+    with patch("app.nodes.summarize_nodes._summarize_article", return_value="Résumé") as summarize:
+        summarize_node(UnifiedState(filtered_articles=[article], keywords=[]))
+    content = summarize.call_args.args[1]
+    assert word_count(content) <= 40 < word_count(TEXT)
@@ -0,0 +1,237 @@
+"""Tests du mode démon (exécutions planifiées, rechargement, déclenchement local)"""
+
+"""
+pytest tests/test_daemon.py -v
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.request
+
+from app.services.daemon import Daemon, WatchedFiles, start_trigger_server
+
+
+class Recorder:
+    """Graphe factice : constructions et exécutions comptées"""
+
+    def __init__(self, duration=0.0):
+        self.builds = 0
+        self.runs = []
+        self.duration = duration
+
+    def build(self):
+        self.builds += 1
+        return f"graphe-{self.builds}"
+
+    def run(self, agent, state):
+        time.sleep(self.duration)
+        self.runs.append((agent, state))
+
+
+def _daemon(recorder, interval=3600, watched=None):
+    return Daemon(
+        recorder.build,
+        lambda: {"keywords": ["python"]},
+        recorder.run,
+        interval_seconds=interval,
+        watched=watched or WatchedFiles(lambda: []),
+    )
+
+
+def _serve(daemon, run_at_start=True):
+    thread = threading.Thread(target=daemon.serve_forever, args=(run_at_start,), daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_watched_files_detect_changes(tmp_path):
+    path = tmp_path / "my.opml"
+    path.write_text("<opml/>")
+    watched = WatchedFiles(lambda: [str(path), str(tmp_path / "absent.json")])
+    assert watched.changed() == []
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    assert watched.changed() == [str(path)]
+    assert watched.changed() == []
+
+
+def test_runs_on_interval_with_graph_built_once():
+    recorder = Recorder()
+    daemon = _daemon(recorder, interval=0.1)
+    thread = _serve(daemon)
+    _wait_for(lambda: len(recorder.runs) >= 3)
+    daemon.stop()
+    thread.join(2)
+    assert not thread.is_alive()
+    assert recorder.builds == 1
+    assert {agent for agent, _ in recorder.runs} == {"graphe-1"}
+
+
+def test_failed_run_does_not_stop_daemon():
+    recorder = Recorder()
+    calls = []
+
+    def flaky_run(agent, state):
+        calls.append(agent)
+        if len(calls) == 1:
+            raise RuntimeError("LLM injoignable")
+
+    daemon = Daemon(recorder.build, lambda: {}, flaky_run, interval_seconds=0.05, watched=WatchedFiles(lambda: []))
+    thread = _serve(daemon)
+    _wait_for(lambda: len(calls) >= 2)
+    daemon.stop()
+    thread.join(2)
+    assert daemon.last_run["status"] == "ok"
+
+
+def test_trigger_endpoint_starts_run():
+    recorder = Recorder()
+    daemon = _daemon(recorder)
+    server, url = start_trigger_server(daemon, port=0)
+    thread = _serve(daemon, run_at_start=False)
+    try:
+        request = urllib.request.Request(f"{url}/run", method="POST")
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 202
+        _wait_for(lambda: daemon.runs == 1)
+        with urllib.request.urlopen(f"{url}/status") as response:
+            status = json.load(response)
+        assert status["runs"] == 1
+        assert status["last_run"]["status"] == "ok"
+        assert status["next_run_in"] > 3000
+    finally:
+        daemon.stop()
+        thread.join(2)
+        server.shutdown()
+
+
+def test_env_change_reloads_settings_and_rebuilds_graph(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RSS_FETCH", "true")
+    monkeypatch.setenv("THRESHOLD_SEMANTIC_SEARCH", "0.4")
+    # variable de l'environnement du processus, absente du .env : conservée
+    monkeypatch.setenv("MAX_DAYS", "3")
+    env_file = tmp_path / ".env"
+    env_file.write_text("RSS_FETCH=true\nTHRESHOLD_SEMANTIC_SEARCH=0.4\n")
+    recorder = Recorder()
+    daemon = _daemon(recorder, watched=WatchedFiles(lambda: [str(env_file)]))
+    daemon.run_once()
+
+    env_file.write_text("RSS_FETCH=false\n")
+    os.utime(env_file, (time.time() + 10, time.time() + 10))
+    daemon.run_once()
+    assert os.environ["RSS_FETCH"] == "false"
+    # retirée du .env : retirée de l'environnement, valeur par défaut à l'exécution suivante
+    assert "THRESHOLD_SEMANTIC_SEARCH" not in os.environ
+    assert os.environ["MAX_DAYS"] == "3"
+    assert [agent for agent, _ in recorder.runs] == ["graphe-1", "graphe-2"]
+
+
+def test_embedding_cache_cleared_when_model_changes(tmp_path, monkeypatch):
+    import numpy as np
+
+    from app.services import daemon as daemon_module
+    from app.services.embeddings import embedding_cache
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(daemon_module, "warm_up", lambda: None)
+    monkeypatch.setenv("MODEL_EMBEDDINGS", "all-MiniLM-L6-v2")
+    env_file = tmp_path / ".env"
+    env_file.write_text("MODEL_EMBEDDINGS=all-MiniLM-L6-v2\n")
+    article = {"title": "Python 3.14", "summary": "sortie de python", "link": "https://example.com/1"}
+    daemon = _daemon(Recorder(), watched=WatchedFiles(lambda: [str(env_file)]))
+    embedding_cache.clear()
+    try:
+        embedding_cache.put(article, np.ones(384, dtype=np.float32))
+        daemon.run_once()
+        assert embedding_cache.get(article) is not None
+
+        # vecteurs de l'ancien modèle (autre dimension) : plus servis par le cache
+        env_file.write_text("MODEL_EMBEDDINGS=all-mpnet-base-v2\n")
+        os.utime(env_file, (time.time() + 10, time.time() + 10))
+        daemon.run_once()
+        assert os.environ["MODEL_EMBEDDINGS"] == "all-mpnet-base-v2"
+        assert embedding_cache.get(article) is None
+    finally:
+        embedding_cache.clear()
+
+
+def test_source_json_reloaded_when_modified(tmp_path):
+    from app.nodes.utils_fetch_nodes import _load_sources_from_config
+
+    path = tmp_path / "mybluesky.json"
+    path.write_text(json.dumps({"sources": [{"type": "bluesky", "url": "@a.bsky.social"}]}))
+    assert [s.url for s in _load_sources_from_config(str(path), "bluesky")] == ["@a.bsky.social"]
+    path.write_text(json.dumps({"sources": [{"type": "bluesky", "url": "@b.bsky.social"}]}))
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    assert [s.url for s in _load_sources_from_config(str(path), "bluesky")] == ["@b.bsky.social"]
+
+
+def test_fetcher_instances_are_reused(monkeypatch):
+    from app.services.factory_fetcher import FetcherFactory
+    from app.services.models import SourceType
+
+    created = []
+
+    class FakeFetcher:
+        def __init__(self, **kwargs):
+            created.append(kwargs)
+
+    monkeypatch.setattr(FetcherFactory, "_fetchers", {SourceType.BLUESKY: FakeFetcher})
+    monkeypatch.setattr(FetcherFactory, "_instances", {})
+    first = FetcherFactory.get_fetcher(SourceType.BLUESKY, handle="a", password="p")
+    assert FetcherFactory.get_fetcher(SourceType.BLUESKY, handle="a", password="p") is first
+    # identifiants modifiés : nouvelle connexion
+    assert FetcherFactory.get_fetcher(SourceType.BLUESKY, handle="b", password="p") is not first
+    assert len(created) == 2
+
+
+def test_keyword_index_rebuilt_when_keywords_or_model_change(tiny_sentence_model_path, tmp_path, monkeypatch):
+    import faiss
+    import numpy as np
+    import torch
+
+    from app.nodes import filter_nodes
+    from app.services.embedding_backends import load_sentence_model
+
+    model = load_sentence_model(tiny_sentence_model_path)
+    monkeypatch.setattr(filter_nodes, "init_sentence_model", lambda: model)
+    index_path = str(tmp_path / "keywords.faiss")
+    article = {"title": "Python 3.14", "summary": "sortie de python", "link": "", "source": "rss"}
+
+    filter_nodes._filter_articles_with_faiss([dict(article)], ["python"], threshold=0.0, index_path=index_path)
+    filter_nodes._filter_articles_with_faiss(
+        [dict(article)], ["python", "django"], threshold=0.0, index_path=index_path
+    )
+    assert faiss.read_index(index_path).ntotal == 2
+    meta = json.loads((tmp_path / "keywords.faiss.meta.json").read_text())
+    assert meta["keywords"] == ["python", "django"]
+    assert meta["dim"] == 64
+
+    # autre modèle (--tune-embeddings) : index reconstruit à sa dimension
+    class WiderModel:
+        def encode(self, texts, **kwargs):
+            return torch.ones((len(texts), 32))
+
+        def get_sentence_embedding_dimension(self):
+            return 32
+
+    def encode_wider(articles, model):
+        return None, [np.ones((1, 32), dtype=np.float32) for _ in articles]
+
+    monkeypatch.setenv("MODEL_EMBEDDINGS", "wider-model")
+    monkeypatch.setattr(filter_nodes, "init_sentence_model", lambda: WiderModel())
+    monkeypatch.setattr(filter_nodes, "encode_article_chunks", encode_wider)
+    filter_nodes._filter_articles_with_faiss(
+        [dict(article)], ["python", "django"], threshold=0.0, index_path=index_path
+    )
+    assert faiss.read_index(index_path).d == 32
+    assert json.loads((tmp_path / "keywords.faiss.meta.json").read_text())["model"] == "wider-model"
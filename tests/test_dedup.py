@@ -0,0 +1,98 @@
+"""Tests du dédoublonnage exact des articles (URL canoniques et empreinte du contenu)."""
+"""
+pytest tests/test_dedup.py -v
+"""
+import pytest
+
+from app.nodes.fetch_nodes import merge_fetched_articles
+from app.services.dedup import canonicalize_url, content_hash, dedup_articles
+from app.services.models import SourceType, UnifiedState
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://blog.ntld/post-1",
+        "http://www.blog.ntld/post-1/",
+        "https://blog.ntld/post-1?utm_source=rss&utm_medium=feed#comments",
+        "https://blog.ntld:443/post-1/amp/",
+        "https://amp.blog.ntld/post-1?fbclid=abc",
+        "https://www.google.com/amp/s/blog.ntld/post-1",
+    ],
+)
+def test_canonical_url_variants(url):
+    assert canonicalize_url(url) == "https://blog.ntld/post-1"
+
+
+def test_canonical_url_keeps_meaningful_params():
+    assert canonicalize_url("https://ntld/search?q=django&page=2&utm_campaign=x") == (
+        "https://ntld/search?page=2&q=django"
+    )
+    assert canonicalize_url("https://blog.ntld/news.amp.html") == "https://blog.ntld/news.html"
+    assert canonicalize_url("#") is None
+    assert canonicalize_url("at://did:plc:xyz/post") == "at://did:plc:xyz/post"
+
+
+def test_content_hash_normalization():
+    a = {"title": "Django 5.2 LTS", "summary": "La version 5.2 est disponible, supportée jusqu'en 2028."}
+    b = {"title": "django 5.2 lts ", "summary": "La  version 5.2 est DISPONIBLE - supportee jusqu en 2028"}
+    assert content_hash(a) == content_hash(b)
+    assert content_hash({"title": "Nouvel article", "summary": ""}) is None
+
+
+def _article(link, summary, source, score="0 %", **extra):
+    return {"title": summary[:20], "summary": summary, "link": link, "score": score, "source": source, **extra}
+
+
+def test_dedup_cross_sources_keeps_richest():
+    rss = _article(
+        "https://blog.ntld/post-1?utm_source=rss",
+        "Article complet sur la sortie de Django 5.2 avec toutes les nouveautés détaillées.",
+        SourceType.RSS,
+    )
+    reddit = _article(
+        "https://reddit.com/r/django/comments/abc",
+        "Django 5.2 est sorti",
+        SourceType.REDDIT,
+        score=120,
+        external_url="https://www.blog.ntld/post-1/",
+    )
+    bluesky = _article(
+        "https://bsky.app/profile/dev.ntld/post/3k",
+        "Django 5.2 !",
+        SourceType.BLUESKY,
+        external_url="https://blog.ntld/post-1#top",
+    )
+    other = _article("https://other.ntld/x", "Un autre sujet sans rapport avec Django, assez long.", SourceType.RSS)
+
+    unique, removed = dedup_articles([reddit, other, rss, bluesky])
+
+    assert unique == [rss, other]
+    assert removed == {"reddit": 1, "bluesky": 1}
+
+
+def test_dedup_same_content_different_urls():
+    text = "Une faille critique CVE-2025-1234 touche la bibliothèque de parsing, mettez à jour."
+    first = _article("https://a.ntld/cve", text, SourceType.RSS, score="10 %")
+    second = _article("https://b.ntld/cve", text + " ", SourceType.RSS, score="55 %")
+    unique, removed = dedup_articles([first, second])
+    assert unique == [second]
+    assert removed == {"rss": 1}
+
+
+def test_merge_fetched_articles_dedups(monkeypatch):
+    monkeypatch.setenv("DEDUP_ENABLED", "true")
+    text = "Contenu identique publié par deux flux différents, assez long pour être haché."
+    state = UnifiedState(
+        keywords=[],
+        rss_articles=[
+            _article("https://a.ntld/1", text, SourceType.RSS),
+            _article("https://a.ntld/1/?utm_medium=social", text, SourceType.RSS),
+        ],
+        bluesky_articles=[_article("https://bsky.app/profile/x/post/1", "court", SourceType.BLUESKY)],
+    )
+    merged = merge_fetched_articles(state)
+    assert [a["link"] for a in merged.articles] == [
+        "https://a.ntld/1",
+        "https://bsky.app/profile/x/post/1",
+    ]
@@ -0,0 +1,64 @@
+"""Tests des backends d'embeddings (fp32 / int8 / ONNX) et du contrôle de parité."""
+"""
+pytest tests/test_embedding_backends.py -v
+"""
+import numpy as np
+import pytest
+
+from app.services.embedding_backends import (
+    get_embedding_backend,
+    load_sentence_model,
+    parity_report,
+)
+from app.services.embeddings import encode_texts
+
+KEYWORDS = ["python", "django", "cve", "artificial intelligence"]
+TEXTS = [
+    "new python release with free threading",
+    "critical cve in openssl patched",
+    "django 6 adds background tasks",
+    "llm agents and artificial intelligence benchmarks",
+    "rust compiler update",
+]
+
+
+def test_backend_from_env(monkeypatch):
+    monkeypatch.delenv("EMBEDDING_BACKEND", raising=False)
+    assert get_embedding_backend() == "torch"
+    monkeypatch.setenv("EMBEDDING_BACKEND", "ONNX-int8")
+    assert get_embedding_backend() == "onnx-int8"
+    monkeypatch.setenv("EMBEDDING_BACKEND", "tensorrt")
+    with pytest.raises(ValueError):
+        get_embedding_backend()
+
+
+def test_torch_int8_parity(tiny_sentence_model_path):
+    reference = load_sentence_model(tiny_sentence_model_path, "torch")
+    quantized = load_sentence_model(tiny_sentence_model_path, "torch-int8")
+
+    vectors = encode_texts(quantized, TEXTS)
+    assert vectors.shape == (len(TEXTS), 64)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+
+    report = parity_report(reference, quantized, KEYWORDS, TEXTS, threshold=0.5)
+    assert report["texts"] == len(TEXTS)
+    assert report["max_abs_drift"] < 0.05
+    assert 0 <= report["top_keyword_agreement"] <= 1
+
+
+def test_parity_of_identical_models(tiny_sentence_model_path):
+    model = load_sentence_model(tiny_sentence_model_path, "torch")
+    report = parity_report(model, model, KEYWORDS, TEXTS, threshold=0.5)
+    assert report["max_abs_drift"] < 1e-6
+    assert report["top_keyword_agreement"] == 1.0
+    assert report["filter_flips"] == 0
+
+
+def test_onnx_backend(tiny_sentence_model_path):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("optimum")
+    reference = load_sentence_model(tiny_sentence_model_path, "torch")
+    report = parity_report(
+        reference, load_sentence_model(tiny_sentence_model_path, "onnx"), KEYWORDS, TEXTS
+    )
+    assert report["max_abs_drift"] < 1e-3
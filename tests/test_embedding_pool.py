@@ -0,0 +1,72 @@
+"""Tests du pool de processus d'encodage des embeddings."""
+"""
+pytest tests/test_embedding_pool.py -v
+"""
+import numpy as np
+import pytest
+
+from app.services import embedding_pool
+from app.services.embedding_backends import load_sentence_model
+from app.services.embeddings import EmbeddingCache, encode_articles, encode_texts
+
+TEXTS = [
+    "python",
+    "a critical cve in openssl lets remote attackers execute code",
+    "django",
+    "new llm agent frameworks compared on long running tasks with tools",
+    "rust 2024 edition",
+] * 7
+
+
+def test_length_sorted_chunks():
+    chunks = embedding_pool.length_sorted_chunks([3, 10, 1, 7, 5], chunk_size=2)
+    assert chunks == [[1, 3], [4, 0], [2]]
+
+
+def test_text_lengths_with_and_without_tokenizer(tiny_sentence_model_path):
+    assert embedding_pool.text_lengths(["abc", "a"]) == [3, 1]
+    model = load_sentence_model(tiny_sentence_model_path)
+    lengths = embedding_pool.text_lengths(["python", "a b"], model)
+    assert lengths[0] > lengths[1]
+
+
+def test_use_embedding_pool(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_WORKERS", "0")
+    assert not embedding_pool.use_embedding_pool(10_000)
+    monkeypatch.setenv("EMBEDDING_WORKERS", "2")
+    monkeypatch.setenv("EMBEDDING_POOL_MIN_BATCH", "100")
+    assert not embedding_pool.use_embedding_pool(99)
+    assert embedding_pool.use_embedding_pool(100)
+
+
+@pytest.fixture(scope="module")
+def pool(tiny_sentence_model_path):
+    # démarrage des processus (import de torch, chargement du modèle) une fois pour le module
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("MODEL_EMBEDDINGS", tiny_sentence_model_path)
+        patch.setenv("EMBEDDING_BACKEND", "torch")
+        pool = embedding_pool.EmbeddingPool(2, threads_per_worker=1, chunk_size=4)
+        yield pool
+        pool.close()
+
+
+def test_pool_matches_single_process(pool, tiny_sentence_model_path):
+    model = load_sentence_model(tiny_sentence_model_path)
+    expected = encode_texts(model, TEXTS)
+    vectors = pool.encode(TEXTS, model)
+    assert vectors.shape == expected.shape
+    assert np.allclose(vectors, expected, atol=1e-5)
+    # les processus restent chauds d'un appel à l'autre
+    assert np.allclose(pool.encode(TEXTS[:3]), expected[:3], atol=1e-5)
+
+
+def test_encode_articles_uses_pool(pool, monkeypatch, tiny_sentence_model_path):
+    monkeypatch.setenv("EMBEDDING_WORKERS", "2")
+    monkeypatch.setenv("EMBEDDING_POOL_MIN_BATCH", "10")
+    monkeypatch.setattr(embedding_pool, "get_embedding_pool", lambda: pool)
+    monkeypatch.setattr("app.services.embeddings.get_embedding_pool", lambda: pool)
+    articles = [{"title": text, "summary": "", "link": f"https://ntld/{i}"} for i, text in enumerate(TEXTS)]
+
+    model = load_sentence_model(tiny_sentence_model_path)
+    vectors = encode_articles(articles, model, cache=EmbeddingCache(100))
+    assert np.allclose(vectors, encode_texts(model, TEXTS), atol=1e-5)
@@ -0,0 +1,70 @@
+"""Tests du réglage automatique des embeddings (--tune-embeddings)."""
+"""
+pytest tests/test_embedding_tuning.py -v
+"""
+import json
+
+import pytest
+import torch
+
+from app.services import embedding_tuning as tuning
+
+
+@pytest.fixture
+def tuning_path(tmp_path, monkeypatch):
+    path = tmp_path / "tuning.json"
+    monkeypatch.setenv("EMBEDDING_TUNING_FILE", str(path))
+    monkeypatch.delenv("EMBEDDING_BATCH_SIZE", raising=False)
+    return path
+
+
+RESULTS = [
+    {"model": "a", "device": "cpu", "threads": 4, "batch_size": 32, "texts_per_second": 300.0, "load_seconds": 1.0, "peak_memory_mb": 900.0},
+    {"model": "a", "device": "cpu", "threads": 8, "batch_size": 64, "texts_per_second": 350.0, "load_seconds": 1.0, "peak_memory_mb": 1500.0},
+    {"model": "b", "device": "cpu", "threads": 4, "batch_size": 32, "texts_per_second": 300.0, "load_seconds": 2.0, "peak_memory_mb": 700.0},
+]
+
+
+def test_recommend_under_memory_limit():
+    assert tuning.recommend(RESULTS)["texts_per_second"] == 350.0
+    # à débit égal, la combinaison la moins gourmande
+    assert tuning.recommend(RESULTS, max_memory_mb=1000)["model"] == "b"
+    assert tuning.recommend(RESULTS, max_memory_mb=100) is None
+
+
+def test_tuning_file_read_by_settings(tuning_path, monkeypatch):
+    assert tuning.embedding_setting("EMBEDDING_BATCH_SIZE", "32") == "32"
+
+    tuning.write_tuning_file(tuning_path, RESULTS[1], RESULTS, "synthétique")
+    content = json.loads(tuning_path.read_text())
+    assert content["recommended"]["EMBEDDING_THREADS"] == 8
+    assert len(content["results"]) == 3
+    assert tuning.embedding_setting("EMBEDDING_BATCH_SIZE", "32") == "64"
+
+    # la variable d'environnement reste prioritaire
+    monkeypatch.setenv("EMBEDDING_BATCH_SIZE", "16")
+    assert tuning.embedding_setting("EMBEDDING_BATCH_SIZE", "32") == "16"
+
+
+def test_sample_corpus_falls_back_to_synthetic():
+    def broken_session():
+        raise RuntimeError("pas de base")
+
+    texts, corpus = tuning.sample_corpus(50, session_factory=broken_session)
+    assert corpus == "synthétique"
+    assert len(texts) == 50
+    assert tuning.synthetic_corpus(5) == tuning.synthetic_corpus(5)
+
+
+def test_measure_model(tiny_sentence_model_path, monkeypatch):
+    monkeypatch.setenv("MODEL_EMBEDDINGS", tiny_sentence_model_path)
+    monkeypatch.setenv("EMBEDDING_DEVICE", "cpu")
+    threads = torch.get_num_threads()
+    try:
+        results = tuning._measure_model(
+            tiny_sentence_model_path, "cpu", tuning.synthetic_corpus(8), [1], [4, 8]
+        )
+    finally:
+        torch.set_num_threads(threads)
+    assert [(r["threads"], r["batch_size"]) for r in results] == [(1, 4), (1, 8)]
+    assert all(r["texts_per_second"] > 0 and r["peak_memory_mb"] > 0 for r in results)
@@ -0,0 +1,108 @@
+"""Tests de la lecture en flux des documents RSS/Atom."""
+"""
+pytest tests/test_feed_stream.py -v
+"""
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from pathlib import Path
+
+import pytest
+
+from app.services import feed_stream
+from app.services.feed_stream import iter_document_chunks, iter_feed_entries
+from app.services.fetchers.rss_fetcher import RSSFetcher
+from app.services.models import Source, SourceType
+
+SAMPLE = Path(__file__).parent / "data" / "feed_samples.xml"
+
+
+def _archive_feed(path: Path, nb_recent: int, nb_old: int) -> Path:
+    """Flux trié par date : nb_recent entrées du jour puis nb_old entrées anciennes"""
+    now = datetime.now().astimezone()
+    items = []
+    for i in range(nb_recent + nb_old):
+        published = now - (timedelta(hours=i) if i < nb_recent else timedelta(days=30 + i))
+        items.append(
+            f"<item><title>Article {i}</title><link>https://blog.ntld/{i}</link>"
+            f"<pubDate>{format_datetime(published)}</pubDate>"
+            f"<description>&lt;p&gt;{'contenu ' * 200}&lt;/p&gt;</description></item>"
+        )
+    path.write_text(
+        '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>archive</title>'
+        + "".join(items)
+        + "</channel></rss>",
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.fixture
+def streaming(monkeypatch):
+    monkeypatch.setenv("RSS_STREAMING_PARSE", "true")
+    monkeypatch.setenv("RSS_STREAM_OLD_RUN", "5")
+    monkeypatch.setenv("RSS_MAX_BYTES", "0")
+    monkeypatch.setattr(feed_stream, "CHUNK_SIZE", 4096)
+
+
+def test_streaming_matches_feedparser(monkeypatch):
+    source = Source(type=SourceType.RSS, url=str(SAMPLE), name="sample")
+    fetcher = RSSFetcher()
+    monkeypatch.setenv("RSS_STREAMING_PARSE", "false")
+    expected = fetcher.fetch_articles(source, 3650)
+    monkeypatch.setenv("RSS_STREAMING_PARSE", "true")
+    assert fetcher.fetch_articles(source, 3650) == expected
+    assert fetcher.last_bytes == SAMPLE.stat().st_size
+
+
+def test_atom_entries():
+    atom = b"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">
+    <entry><title type="html">A &amp;amp; B</title>
+      <link rel="replies" href="https://a.ntld/comments"/><link href="https://a.ntld/post"/>
+      <updated>2025-10-20T08:00:00Z</updated>
+      <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>Hello <b>world</b></p></div></content>
+    </entry></feed>"""
+    (entry,) = iter_feed_entries([atom[:50], atom[50:]])
+    assert entry.link == "https://a.ntld/post"
+    assert entry.updated_parsed[:3] == (2025, 10, 20)
+    assert entry.content[0].value == "<p>Hello <b>world</b></p>"
+
+
+def test_stops_after_run_of_old_entries(tmp_path, streaming):
+    path = _archive_feed(tmp_path / "archive.xml", nb_recent=3, nb_old=300)
+    fetcher = RSSFetcher()
+    articles = fetcher.fetch_articles(
+        Source(type=SourceType.RSS, url=str(path), name="archive"), 10
+    )
+
+    assert [a["title"] for a in articles] == ["Article 0", "Article 1", "Article 2"]
+    # seuls les premiers blocs du document ont été lus
+    assert fetcher.last_bytes < path.stat().st_size / 10
+
+
+def test_max_bytes_truncates_document(tmp_path, streaming, monkeypatch):
+    path = _archive_feed(tmp_path / "archive.xml", nb_recent=50, nb_old=0)
+    monkeypatch.setenv("RSS_MAX_BYTES", "20000")
+    fetcher = RSSFetcher()
+    articles = fetcher.fetch_articles(
+        Source(type=SourceType.RSS, url=str(path), name="archive"), 10
+    )
+
+    assert fetcher.last_bytes == 20000
+    assert 0 < len(articles) < 50
+
+    stats = {}
+    assert sum(len(c) for c in iter_document_chunks(str(path), 1000, "test", stats=stats)) == 1000
+
+
+def test_malformed_xml_falls_back_to_feedparser(tmp_path, streaming):
+    path = tmp_path / "bad.xml"
+    published = format_datetime(datetime.now().astimezone())
+    path.write_text(
+        f"<rss><channel><item><title>caf&eacute;&nbsp;</title><link>https://x.ntld/1</link>"
+        f"<pubDate>{published}</pubDate><description>ok</description></item></channel></rss>",
+        encoding="utf-8",
+    )
+    articles = RSSFetcher().fetch_articles(
+        Source(type=SourceType.RSS, url=str(path), name="bad"), 10
+    )
+    assert [a["link"] for a in articles] == ["https://x.ntld/1"]
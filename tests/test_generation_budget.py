@@ -0,0 +1,143 @@
+"""Tests de l'échéance de génération des résumés et du repli extractif"""
+
+"""
+pytest tests/test_generation_budget.py -v
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.generation_budget import (
+    STATUS_EXTRACTIVE,
+    STATUS_PARTIAL,
+    GenerationTimeout,
+    SummaryBudget,
+    fallback_summary,
+    stream_with_deadline,
+)
+from app.services.models import SourceType, UnifiedState
+
+
+class SlowLLM:
+    """LLM factice : un morceau toutes les `delay` secondes"""
+
+    def __init__(self, chunks, delay=0.0):
+        self.chunks = chunks
+        self.delay = delay
+        self.closed = False
+        self.timeout = None
+
+    def stream(self, prompt, timeout=None):
+        self.timeout = timeout
+        try:
+            for chunk in self.chunks:
+                time.sleep(self.delay)
+                yield SimpleNamespace(content=chunk)
+        finally:
+            self.closed = True
+
+
+def test_stream_completes_before_deadline():
+    assert stream_with_deadline(SlowLLM(["Python ", "3.14 ", "est sorti."]), "p", 5) == "Python 3.14 est sorti."
+
+
+def test_stream_interrupted_at_deadline_keeps_partial():
+    llm = SlowLLM(["Première phrase. ", "Suite ", *["lente "] * 50], delay=0.05)
+    start = time.monotonic()
+    with pytest.raises(GenerationTimeout) as error:
+        stream_with_deadline(llm, "p", 0.3)
+    assert time.monotonic() - start < 1
+    assert error.value.partial.startswith("Première phrase.")
+    # le thread de lecture ferme le flux au morceau suivant, la requête porte l'échéance
+    time.sleep(0.2)
+    assert llm.closed
+    assert llm.timeout == 0.3
+
+
+def test_stream_error_is_raised():
+    class BrokenLLM:
+        def stream(self, prompt, timeout=None):
+            raise ConnectionError("LLM injoignable")
+            yield
+
+    with pytest.raises(ConnectionError):
+        stream_with_deadline(BrokenLLM(), "p", 5)
+
+
+def test_budget_bounds_article_deadline():
+    assert SummaryBudget(article_seconds=0, run_seconds=0).article_deadline() is None
+    assert SummaryBudget(article_seconds=30, run_seconds=0).article_deadline() == 30
+    budget = SummaryBudget(article_seconds=30, run_seconds=10)
+    assert budget.article_deadline() <= 10
+    budget.start -= 20
+    assert budget.exhausted()
+    assert budget.article_deadline() == 0
+
+
+def test_fallback_keeps_partial_complete_sentences(monkeypatch):
+    monkeypatch.setenv("SUMMARY_MIN_PARTIAL_CHARS", "20")
+    partial = "Python 3.14 supprime le GIL en option. Les premiers benchmarks mont"
+    assert fallback_summary("titre", "contenu", partial) == (
+        "Python 3.14 supprime le GIL en option.",
+        STATUS_PARTIAL,
+    )
+
+
+def test_fallback_extractive_when_partial_too_short(monkeypatch):
+    monkeypatch.setenv("SUMMARY_MIN_PARTIAL_CHARS", "200")
+    content = "Python 3.14 est sorti. Il apporte un mode sans GIL."
+    summary, status = fallback_summary("Python 3.14", content, "Python 3.14")
+    assert status == STATUS_EXTRACTIVE
+    assert summary.startswith("Python 3.14 est sorti.")
+
+
+def test_summarize_node_flags_articles_past_deadline(mock_env_vars, monkeypatch):
+    from app.nodes import summarize_nodes
+
+    monkeypatch.setenv("SUMMARY_ARTICLE_DEADLINE", "0.2")
+    monkeypatch.setenv("SUMMARY_MIN_PARTIAL_CHARS", "20")
+    slow = SlowLLM(["Le modèle commence bien. ", *["puis ralentit "] * 100], delay=0.05)
+    fast = SlowLLM(["Résumé complet."])
+    llms = iter([slow, fast])
+    monkeypatch.setattr(summarize_nodes, "init_llm_chat", lambda: next(llms))
+
+    def article(title, score):
+        return {
+            "title": title,
+            "summary": f"{title}. Contenu de l'article.",
+            "link": f"https://example.com/{title}",
+            "score": score,
+            "published": "2025-10-20",
+            "source": SourceType.RSS,
+        }
+
+    result = summarize_nodes.summarize_node(
+        UnifiedState(filtered_articles=[article("lent", "90.0"), article("rapide", "80.0")], keywords=[])
+    )
+    by_title = {s["title"]: s for s in result.summaries}
+    assert by_title["lent"]["summary_status"] == STATUS_PARTIAL
+    assert by_title["lent"]["summary"] == "Le modèle commence bien."
+    assert by_title["rapide"]["summary_status"] == "complete"
+    assert by_title["rapide"]["summary"] == "Résumé complet."
+
+
+def test_summarize_node_run_budget_exhausted(mock_env_vars, monkeypatch):
+    from app.nodes import summarize_nodes
+
+    monkeypatch.setenv("SUMMARY_RUN_BUDGET", "60")
+    monkeypatch.setattr(summarize_nodes.SummaryBudget, "exhausted", lambda self: True)
+    monkeypatch.setattr(
+        summarize_nodes, "init_llm_chat", lambda: pytest.fail("aucun appel LLM sans budget")
+    )
+    article = {
+        "title": "Python 3.14",
+        "summary": "Python 3.14 est sorti. Il apporte un mode sans GIL.",
+        "link": "https://example.com/py",
+        "score": "90.0",
+        "published": "2025-10-20",
+        "source": SourceType.RSS,
+    }
+    result = summarize_nodes.summarize_node(UnifiedState(filtered_articles=[article], keywords=[]))
+    assert result.summaries[0]["summary_status"] == STATUS_EXTRACTIVE
@@ -0,0 +1,103 @@
+"""Tests de la recherche hybride FTS + vecteurs (fusion RRF)."""
+"""
+pytest tests/test_hybrid_search.py -v
+"""
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import db
+from app.services import hybrid_search as hybrid
+from app.services.models import SourceType
+
+ARTICLES = [
+    ("Faille CVE-2025-1234 dans OpenSSL", "Correctif publié pour la CVE-2025-1234.", "2025-10-20"),
+    ("Python 3.14 est sorti", "Nouvelle version du langage avec free-threading.", "2025-10-08"),
+    ("Vulnérabilité critique de la bibliothèque TLS", "Une faille permet l'exécution de code.", "2025-10-21"),
+    ("Django 6.0", "Nouvelle version majeure du framework web.", "2025-09-01"),
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "search.db"
+    engine = create_engine(f"sqlite:///{path}")
+    db.Base.metadata.create_all(engine)
+    db.ArticleFTS.init_table(engine)
+    with sessionmaker(bind=engine)() as session:
+        for title, summary, published in ARTICLES:
+            session.add(
+                db.Article(
+                    title=title,
+                    link=f"https://ntld/{published}",
+                    summary=summary,
+                    score="80.0",
+                    published=published,
+                    source=SourceType.RSS,
+                )
+            )
+        session.commit()
+    return path
+
+
+def _search(db_path, query, **kwargs):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        async with sessionmaker(engine, class_=AsyncSession)() as session:
+            result = await hybrid.hybrid_search(session, query, **kwargs)
+        await engine.dispose()
+        return result
+
+    return asyncio.run(run())
+
+
+def test_fts_match_query_quotes_identifiers():
+    assert (
+        hybrid.fts_match_query("CVE-2025-1234 python 3.14")
+        == '"CVE-2025-1234" OR "python" OR "3.14"'
+    )
+    assert hybrid.fts_match_query('"; DROP') == '"DROP"'
+    assert hybrid.fts_match_query("  ") == ""
+
+
+def test_reciprocal_rank_fusion():
+    fused = hybrid.reciprocal_rank_fusion([[1, 2, 3], [3, 4]], k=60)
+    assert [article_id for article_id, _ in fused] == [3, 1, 2, 4]
+    assert fused[0][1] == pytest.approx(1 / 63 + 1 / 61)
+
+
+def test_highlight_terms_escapes_html():
+    assert hybrid.highlight_terms("Faille <b>TLS</b>", "tls") == "Faille &lt;b&gt;<mark>TLS</mark>&lt;/b&gt;"
+
+
+def test_hybrid_merges_exact_and_semantic_hits(db_path, monkeypatch):
+    # les vecteurs retrouvent la reformulation (article 3) que le plein texte ignore
+    monkeypatch.setattr(hybrid, "_vector_ranking", lambda query, limit: [3, 1])
+    articles, timings = _search(db_path, "CVE-2025-1234", limit=5)
+
+    assert [a["link"] for a in articles] == ["https://ntld/2025-10-20", "https://ntld/2025-10-21"]
+    assert "<mark>" in articles[0]["title"]
+    assert articles[0]["score"] == 99.2  # 1er en plein texte, 2e en vecteurs
+    assert articles[1]["source"] == SourceType.RSS
+    assert set(timings) == {"fts", "vector", "fusion"}
+
+
+def test_hybrid_date_filter_applies_to_vector_hits(db_path, monkeypatch):
+    monkeypatch.setattr(hybrid, "_vector_ranking", lambda query, limit: [4, 2])
+    articles, _ = _search(db_path, "framework", date_min="2025-10-01", limit=5)
+    assert [a["link"] for a in articles] == ["https://ntld/2025-10-08"]
+
+
+def test_hybrid_runs_sub_queries_concurrently(db_path, monkeypatch):
+    def slow_vectors(query, limit):
+        time.sleep(0.3)
+        return [2]
+
+    monkeypatch.setattr(hybrid, "_vector_ranking", slow_vectors)
+    _, timings = _search(db_path, "python", limit=5)
+    assert timings["vector"] >= 300
+    assert timings["fts"] < 300
@@ -0,0 +1,112 @@
+"""Tests du pré-filtre lexical (cascade avant les embeddings)."""
+"""
+pytest tests/test_lexical_filter.py -v
+"""
+import re
+
+from app.nodes import filter_nodes
+from app.services.embedding_backends import load_sentence_model
+from app.services.lexical_filter import (
+    LexicalMatcher,
+    _trie_regex,
+    cascade_split,
+    load_synonyms,
+    normalize_text,
+)
+from app.services.models import SourceType
+
+KEYWORDS = ["ai agent", "python", "django", "cybersécurité", "cve"]
+
+
+def _article(title, summary=""):
+    return {"title": title, "summary": summary, "link": f"https://ntld/{title}", "source": SourceType.REDDIT}
+
+
+def test_trie_regex_matches_every_pattern_exactly():
+    patterns = ["cve", "cves", "cyber", "cybersecurite", "ai", "ai agent"]
+    regex = re.compile(f"^(?:{_trie_regex(patterns)})$")
+    assert all(regex.match(p) for p in patterns)
+    assert not regex.match("cyb")
+    assert not regex.match("ai agents")
+
+
+def test_matcher_synonyms_accents_and_word_boundaries():
+    matcher = LexicalMatcher(KEYWORDS, load_synonyms())
+    assert normalize_text("Cybersécurité") == "cybersecurite"
+    assert matcher.keywords_in("Zero-day et CYBERSECURITE : les AI agents de PyPI") == {
+        "cve", "cybersécurité", "ai agent", "python",
+    }
+    assert matcher.keywords_in("pythonic djangonaut") == set()
+
+
+def test_synonyms_file(tmp_path):
+    path = tmp_path / "synonyms.json"
+    path.write_text('{"django": ["wagtail"]}')
+    assert "wagtail" in load_synonyms(str(path))["django"]
+
+
+def test_cascade_bands():
+    accepted, ambiguous, rejected = cascade_split(
+        [
+            _article("Django 6.0 et Python 3.14", "nouvelle version"),  # titre : 2 x 2
+            _article("Release notes", "support de python"),  # contenu : 1
+            _article("Match de foot", "score final"),  # 0
+        ],
+        KEYWORDS,
+        threshold=0.5,
+        reject_score=0,
+        accept_score=4,
+    )
+    assert [a["title"] for a in accepted] == ["Django 6.0 et Python 3.14"]
+    assert accepted[0]["score"] == "50.0"
+    assert accepted[0]["matched_keywords"] == ["django", "python"]
+    assert [a["lexical_score"] for a in ambiguous] == [1]
+    assert [a["title"] for a in rejected] == ["Match de foot"]
+
+
+def test_zero_match_goes_to_embeddings_unless_noise(monkeypatch):
+    monkeypatch.setenv("CASCADE_NEGATIVE_KEYWORDS", "sponsored, offre d'emploi")
+    accepted, ambiguous, rejected = cascade_split(
+        [
+            _article("OpenAI ships GPT-5", "new model"),  # reformulation : aucun mot-clé
+            _article("Offre d'emploi : développeur", "CDI à Lyon"),  # 0 - 2
+            _article("Sponsored: Python course", "promo"),  # 2 - 2
+        ],
+        KEYWORDS,
+        threshold=0.5,
+    )
+    assert accepted == []
+    assert [a["title"] for a in ambiguous] == ["OpenAI ships GPT-5", "Sponsored: Python course"]
+    assert [a["title"] for a in rejected] == ["Offre d'emploi : développeur"]
+    assert rejected[0]["noise_keywords"] == ["offre d'emploi"]
+
+
+def test_filter_embeds_only_ambiguous(tiny_sentence_model_path, tmp_path, monkeypatch):
+    monkeypatch.setenv("CASCADE_FILTER", "true")
+    monkeypatch.setenv("CASCADE_ACCEPT_SCORE", "4")
+    monkeypatch.setenv("CASCADE_NEGATIVE_KEYWORDS", "foot")
+    model = load_sentence_model(tiny_sentence_model_path)
+    monkeypatch.setattr(filter_nodes, "init_sentence_model", lambda: model)
+    encoded = []
+    original = filter_nodes.encode_article_chunks
+
+    def spy(articles, model=None, cache=None):
+        encoded.extend(a["title"] for a in articles)
+        return original(articles, model, cache)
+
+    monkeypatch.setattr(filter_nodes, "encode_article_chunks", spy)
+    articles = [
+        _article("Django 6.0 et Python 3.14"),
+        _article("Release notes", "support de python"),
+        _article("Match de foot", "score final"),
+        _article("OpenAI ships GPT-5", "new model"),
+    ]
+    filtered = filter_nodes._filter_articles_with_faiss(
+        articles, KEYWORDS, threshold=0.0, index_path=str(tmp_path / "keywords.faiss")
+    )
+    assert encoded == ["Release notes", "OpenAI ships GPT-5"]
+    assert {a["title"]: a["filter_tier"] for a in filtered} == {
+        "Django 6.0 et Python 3.14": "lexical",
+        "Release notes": "embedding",
+        "OpenAI ships GPT-5": "embedding",
+    }
@@ -0,0 +1,104 @@
+"""Tests de la cascade LLM (petit modèle / grand modèle)"""
+
+"""
+pytest tests/test_llm_cascade.py -v
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.llm_cascade import LLMCascade, parse_triage
+from app.services.models import SourceType, UnifiedState
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def fake_llm(answer):
+    llm = MagicMock()
+    llm.invoke.return_value = SimpleNamespace(content=answer)
+    llm.stream.return_value = [SimpleNamespace(content=answer)]
+    return llm
+
+
+def make_cascade(triage_answer="oui", triage=True):
+    small, large = fake_llm(triage_answer), fake_llm("")
+    summarize = MagicMock(side_effect=lambda title, content, llm, deadline=None: "petit" if llm is small else "grand")
+    cascade = LLMCascade(small, large, summarize, short_tokens=10, triage=triage, token_counter=word_count)
+    return cascade, small, large
+
+
+@pytest.mark.parametrize(
+    "answer, expected",
+    [("oui", True), ("Non.", False), ("no", False), ("Oui, sans doute", True), ("peut-être", True), ("", True)],
+)
+def test_parse_triage(answer, expected):
+    assert parse_triage(answer) is expected
+
+
+def test_short_content_goes_to_small_model():
+    cascade, small, _ = make_cascade()
+    assert cascade.summarize("IA", "Nouveau modèle", "sorti aujourd'hui") == "petit"
+    # pas de tri pour un contenu court
+    small.invoke.assert_not_called()
+    small.stream.assert_not_called()
+    assert cascade.stats.calls("small_summary") == 1
+
+
+def test_long_content_triaged_then_large_model():
+    cascade, small, _ = make_cascade("oui")
+    assert cascade.summarize("IA", "Titre", "mot " * 50) == "grand"
+    small.invoke.assert_called_once()
+    assert cascade.stats.calls("triage") == cascade.stats.calls("large_summary") == 1
+
+
+def test_long_content_rejected_by_triage():
+    cascade, _, _ = make_cascade("non")
+    assert cascade.summarize("IA", "Titre", "mot " * 50) is None
+    assert cascade.stats.rejected == 1
+    assert cascade.stats.calls("large_summary") == 0
+
+
+def test_triage_disabled():
+    cascade, small, _ = make_cascade("non", triage=False)
+    assert cascade.summarize("IA", "Titre", "mot " * 50) == "grand"
+    small.invoke.assert_not_called()
+
+
+def test_summarize_node_with_cascade(mock_env_vars, monkeypatch):
+    from app.nodes.summarize_nodes import summarize_node
+
+    monkeypatch.setenv("LLM_CASCADE", "true")
+    monkeypatch.setenv("LLM_CASCADE_SHORT_TOKENS", "10")
+    monkeypatch.setattr("app.services.compression.get_token_counter", lambda: word_count)
+    small, large = fake_llm("non"), fake_llm("")
+    monkeypatch.setattr("app.services.model_service.init_small_llm_chat", lambda: small)
+    monkeypatch.setattr("app.services.model_service.init_llm_chat", lambda: large)
+
+    def article(title, summary, source):
+        return {
+            "title": title,
+            "summary": summary,
+            "link": f"https://example.com/{title}",
+            "score": "90.0",
+            "published": "2025-10-20",
+            "source": source,
+        }
+
+    articles = [
+        article("post", "un post court", SourceType.BLUESKY),
+        article("billet", "mot " * 50, SourceType.RSS),
+    ]
+    with patch("app.nodes.summarize_nodes._summarize_article", return_value="Résumé") as summarize:
+        result = summarize_node(UnifiedState(filtered_articles=articles, keywords=[]))
+    # le post court est résumé par le petit modèle ; le billet long, écarté par le tri mais
+    # retenu par la sélection, garde sa place avec un résumé extractif
+    statuses = {s["title"]: s["summary_status"] for s in result.summaries}
+    assert statuses == {"post": "complete", "billet": "extractive"}
+    assert all(s["summary"] for s in result.summaries)
+    assert summarize.call_count == 1
+    assert summarize.call_args.args[2] is small
+    large.invoke.assert_not_called()
@@ -0,0 +1,110 @@
+"""Tests du serveur LLM factice compatible OpenAI"""
+
+"""
+pytest tests/test_llm_stub.py -v
+"""
+
+import json
+import time
+
+import openai
+import pytest
+from langchain_openai import ChatOpenAI
+
+from app.services.batch_summary import parse_batch_response
+from app.services.llm_stub import StubConfig, fake_completion, start_stub_server
+
+FAST = StubConfig(ttft_ms=20, prefill_tps=0, tokens_per_second=500, jitter=0, output_tokens=10)
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(config=FAST):
+        server, stub, base_url = start_stub_server(config)
+        servers.append(server)
+        llm = ChatOpenAI(model="stub", openai_api_base=base_url, openai_api_key="x", max_retries=0)
+        return stub, llm
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_invoke_returns_completion(stub_server):
+    stub, llm = stub_server()
+    answer = llm.invoke("Résume cet article.").content
+    assert len(answer.split()) == 10
+    assert stub.stats["requests"] == 1
+    assert stub.stats["completion_tokens"] == 10
+
+
+def test_stream_yields_tokens(stub_server):
+    _, llm = stub_server()
+    chunks = [chunk.content for chunk in llm.stream("Résume cet article.")]
+    assert len([c for c in chunks if c]) == 10
+    assert "".join(chunks).endswith(".")
+
+
+def test_time_to_first_token_and_throughput(stub_server):
+    _, llm = stub_server(FAST._replace(ttft_ms=300, tokens_per_second=50))
+    start = time.monotonic()
+    stream = llm.stream("Résume cet article.")
+    next(chunk for chunk in stream if chunk.content)
+    first = time.monotonic() - start
+    list(stream)
+    total = time.monotonic() - start
+    assert 0.3 <= first < 0.6
+    # 10 tokens à 50 tokens/s
+    assert total - first >= 0.15
+
+
+def test_error_injection_is_reproducible(stub_server):
+    def errors(seed):
+        stub, llm = stub_server(FAST._replace(error_rate=0.5, seed=seed))
+        outcomes = []
+        for i in range(8):
+            try:
+                llm.invoke(f"Résume l'article {i}.")
+                outcomes.append(True)
+            except openai.InternalServerError:
+                outcomes.append(False)
+        assert stub.stats["errors"] == outcomes.count(False)
+        return outcomes
+
+    first = errors(seed=3)
+    assert first == errors(seed=3)
+    assert 0 < first.count(False) < 8
+
+
+def test_parallel_slots_queue_requests(stub_server):
+    from concurrent.futures import ThreadPoolExecutor
+
+    _, llm = stub_server(FAST._replace(ttft_ms=200, parallel=2))
+    start = time.monotonic()
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(lambda i: llm.invoke(f"article {i}"), range(4)))
+    # 4 requêtes, 2 à la fois : deux vagues
+    assert time.monotonic() - start >= 0.4
+
+
+def test_stalled_stream_closed_at_deadline(stub_server):
+    import threading
+
+    from app.services.generation_budget import GenerationTimeout, stream_with_deadline
+
+    # un token toutes les 10s : aucun morceau avant l'échéance
+    _, llm = stub_server(FAST._replace(stall_rate=1.0))
+    with pytest.raises(GenerationTimeout):
+        stream_with_deadline(llm, "Résume cet article.", 0.5)
+    # délai de lecture de la requête : la connexion est fermée sans attendre le token suivant
+    time.sleep(1.5)
+    assert not [thread for thread in threading.enumerate() if thread.name == "llm-stream"]
+
+
+def test_batch_and_triage_prompts():
+    batch = "".join(fake_completion("Résume :\n[1] titre\n[2] titre\nJSON :", 10))
+    assert parse_batch_response(batch, {1, 2}).keys() == {1, 2}
+    assert json.loads(batch)[0]["id"] == 1
+    assert fake_completion("Mérite un résumé ?\nRéponse :", 10) == ["oui"]
@@ -0,0 +1,77 @@
+"""Tests du regroupement des quasi-doublons (MinHash + LSH)."""
+"""
+pytest tests/test_near_dup.py -v
+"""
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.db import migrate_tables
+from app.services.models import SourceType
+from app.services.near_dup import (
+    MinHasher,
+    cluster_near_duplicates,
+    collapse_near_duplicates,
+    shingles,
+)
+
+RELEASE = (
+    "Django 5.2 LTS est disponible : import automatique des modèles dans le shell, "
+    "clés primaires composites et surcharge facilitée de BoundField. La version sera "
+    "supportée jusqu'en avril 2028 et remplace la 4.2 comme version à long terme."
+)
+
+
+def _article(link, summary, source=SourceType.RSS, score="0 %"):
+    return {"title": "Django 5.2", "summary": summary, "link": link, "source": source, "score": score}
+
+
+def test_shingles_and_signature_similarity():
+    assert shingles("a b c d") == {"a b c", "b c d"}
+    assert shingles("a b") == {"a b"}
+
+    hasher = MinHasher(num_perm=128)
+    base = shingles(" ".join(f"mot{i}" for i in range(100)))
+    close = shingles(" ".join(f"mot{i}" for i in range(90)) + " autre fin du texte")
+    far = shingles(" ".join(f"terme{i}" for i in range(100)))
+    sig = hasher.signature(base)
+    assert (sig == hasher.signature(close)).mean() > 0.7
+    assert (sig == hasher.signature(far)).mean() < 0.1
+
+
+def test_rewrites_of_same_release_are_grouped():
+    articles = [
+        _article("https://a.ntld/1", RELEASE),
+        _article("https://other.ntld/x", "Une faille critique touche OpenSSL, les versions 3.x doivent être mises à jour sans attendre."),
+        _article("https://b.ntld/2", RELEASE.replace("est disponible", "vient de sortir")),
+        _article("https://c.ntld/3", RELEASE + " Bonne mise à jour à tous !", SourceType.REDDIT),
+        _article("https://d.ntld/4", "Django 5.2"),  # trop court : jamais regroupé
+    ]
+    groups = cluster_near_duplicates(articles, threshold=0.6)
+    assert groups == [[0, 2, 3], [1], [4]]
+
+
+def test_collapse_keeps_richest_with_also_covered_by():
+    articles = [
+        _article("https://a.ntld/1", RELEASE),
+        _article("https://c.ntld/3", RELEASE + " Bonne mise à jour à tous !", SourceType.REDDIT),
+        _article("https://b.ntld/2", RELEASE.replace("est disponible", "vient de sortir"), SourceType.BLUESKY),
+    ]
+    representatives, removed = collapse_near_duplicates(articles, threshold=0.6)
+
+    assert [a["link"] for a in representatives] == ["https://c.ntld/3"]
+    assert representatives[0]["also_covered_by"] == [
+        {"title": "Django 5.2", "link": "https://a.ntld/1", "source": "rss"},
+        {"title": "Django 5.2", "link": "https://b.ntld/2", "source": "bluesky"},
+    ]
+    assert removed == {"rss": 1, "bluesky": 1}
+
+
+def test_migration_adds_also_covered_by_column(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE articles (id INTEGER PRIMARY KEY, title VARCHAR)"))
+
+    migrate_tables(engine)
+    migrate_tables(engine)  # idempotent
+
+    columns = {c["name"] for c in inspect(engine).get_columns("articles")}
+    assert "also_covered_by" in columns
@@ -0,0 +1,190 @@
+"""Tests du filtre de nouveauté et de l'index des embeddings des articles sauvegardés."""
+"""
+pytest tests/test_novelty.py -v
+"""
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import db
+from app.nodes.novelty_nodes import _split_already_covered
+from app.services.embeddings import EmbeddingCache, embedding_cache, encode_articles, encode_texts
+from app.services.models import SourceType
+from app.services.vector_store import ArticleVectorStore
+
+DAY = 86400
+NOW = 1_760_000_000
+
+
+def _unit(*values):
+    vector = np.zeros(8, dtype=np.float32)
+    vector[: len(values)] = values
+    return vector / np.linalg.norm(vector)
+
+
+def _article(link, title="titre"):
+    return {
+        "title": title,
+        "summary": f"contenu de {link}",
+        "link": link,
+        "published": "2025-10-20T10:00:00",
+        "score": "80.0",
+        "source": SourceType.RSS,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArticleVectorStore(tmp_path / "vectors", model_name="test-model")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    embedding_cache.clear()
+    yield
+    embedding_cache.clear()
+
+
+def test_store_appends_and_searches_recent_window(store, tmp_path):
+    store.add([1, 2], np.vstack([_unit(1), _unit(0, 1)]), timestamp=NOW - 10 * DAY)
+    store.add([3], np.vstack([_unit(0, 0, 1)]), timestamp=NOW - DAY)
+
+    # un second lecteur (autre worker) voit les mêmes lignes via memmap
+    reader = ArticleVectorStore(tmp_path / "vectors", model_name="test-model")
+    assert len(reader) == 3
+    assert list(reader.ids) == [1, 2, 3]
+
+    queries = np.vstack([_unit(1), _unit(0, 0, 1)])
+    sims, ids = reader.max_similarity_since(queries, since=NOW - 20 * DAY)
+    assert list(ids) == [1, 3]
+    assert sims == pytest.approx([1.0, 1.0])
+
+    # fenêtre de 7 jours : l'article 1 n'est plus candidat
+    sims, ids = reader.max_similarity_since(queries, since=NOW - 7 * DAY)
+    assert list(ids) == [3, 3]
+    assert sims[0] == pytest.approx(0.0)
+
+    store.add([4], np.vstack([_unit(1, 1)]), timestamp=NOW)
+    assert len(reader) == 4
+
+
+def test_store_refuses_other_model(store, tmp_path):
+    store.add([1], np.vstack([_unit(1)]))
+    other = ArticleVectorStore(tmp_path / "vectors", model_name="other-model")
+    assert not other.is_compatible()
+    assert other.add([2], np.vstack([_unit(1)])) == 0
+    assert len(store) == 1
+
+
+def test_add_after_interrupted_write_stays_aligned(store, tmp_path):
+    store.add([1, 2], np.vstack([_unit(1), _unit(0, 1)]), timestamp=NOW - DAY)
+    # arrêt entre l'écriture du vecteur et celle de sa ligne : vecteur orphelin
+    with open(tmp_path / "vectors" / "vectors.f32", "ab") as f:
+        f.write(_unit(1, 1).tobytes())
+
+    store.add([3], np.vstack([_unit(0, 0, 1)]), timestamp=NOW)
+    reader = ArticleVectorStore(tmp_path / "vectors", model_name="test-model")
+    assert list(reader.ids) == [1, 2, 3]
+    sims, ids = reader.max_similarity_since(np.vstack([_unit(0, 0, 1)]), since=NOW - 2 * DAY)
+    assert list(ids) == [3]
+    assert sims == pytest.approx([1.0])
+
+
+def test_encode_articles_reuses_cache():
+    cache = EmbeddingCache(max_size=10)
+    article = _article("https://a.ntld/1")
+    cache.put(article, _unit(1))
+
+    class FailingModel:
+        def encode(self, *args, **kwargs):
+            raise AssertionError("ne doit pas être appelé")
+
+    assert encode_articles([article], FailingModel(), cache) == pytest.approx(
+        _unit(1)[None, :]
+    )
+    assert cache.get_by_link("https://a.ntld/1") is not None
+
+
+def test_already_covered_articles_are_skipped(store):
+    store.add([10], np.vstack([_unit(1)]), timestamp=NOW - DAY)
+    restated, fresh = _article("https://b.ntld/restated"), _article("https://c.ntld/new")
+    embedding_cache.put(restated, _unit(1, 0.1))
+    embedding_cache.put(fresh, _unit(0, 1))
+
+    kept, covered = _split_already_covered(
+        [restated, fresh], store, threshold=0.9, days=7, now=NOW
+    )
+    assert kept == [fresh]
+    assert covered == [restated]
+    assert restated["already_covered"]["article_id"] == 10
+
+
+def test_save_to_db_indexes_inserted_articles(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'articles.db'}")
+    db.Base.metadata.create_all(engine)
+    monkeypatch.setattr(db, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setenv("ARTICLES_VECTORS_DIR", str(tmp_path / "vectors"))
+    monkeypatch.setenv("MODEL_EMBEDDINGS", "test-model")
+
+    article = _article("https://a.ntld/1")
+    embedding_cache.put(article, _unit(1))
+    # le résumé LLM remplace le contenu : l'embedding est retrouvé par le lien
+    summary = {**article, "summary": "résumé", "also_covered_by": None}
+
+    saved = db.save_to_db([summary])
+    assert saved[0]["id"] is not None
+    assert db.save_to_db([summary]) == []  # déjà sauvegardé
+
+    store = ArticleVectorStore()
+    assert list(store.ids) == [saved[0]["id"]]
+
+
+def test_backfill_keeps_save_dates_out_of_recent_window(store):
+    # articles du jour indexés à la sauvegarde, puis historique réindexé avec sa date
+    store.add([3], np.vstack([_unit(0, 0, 1)]), timestamp=NOW - DAY)
+    store.add([1, 2], np.vstack([_unit(1), _unit(0, 1)]), timestamp=[NOW - 40 * DAY, NOW - 30 * DAY])
+
+    sims, ids = store.max_similarity_since(np.vstack([_unit(1), _unit(0, 0, 1)]), since=NOW - 7 * DAY)
+    assert list(ids) == [3, 3]
+    assert sims[0] == pytest.approx(0.0)
+    _, ids = store.max_similarity_since(np.vstack([_unit(0, 1)]), since=NOW - 35 * DAY)
+    assert list(ids) == [2]
+
+
+def test_reindex_encodes_like_save_with_saved_dates(tmp_path, monkeypatch, tiny_sentence_model_path):
+    from datetime import datetime, timedelta, timezone
+
+    from app.services.embedding_backends import load_sentence_model
+    from app.services.semantic_search import reindex_articles
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'articles.db'}")
+    db.Base.metadata.create_all(engine)
+    monkeypatch.setenv("ARTICLES_VECTORS_DIR", str(tmp_path / "vectors"))
+    monkeypatch.setenv("MODEL_EMBEDDINGS", tiny_sentence_model_path)
+    # texte plus long que le modèle : début et fin gardés, comme à la sauvegarde
+    monkeypatch.setenv("EMBEDDING_TEXT_MODE", "head_tail")
+    summary = " ".join(f"mot{i}" for i in range(200))
+    saved = datetime.now() - timedelta(days=60)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        session.add(
+            db.Article(
+                title="ancien", link="https://a.ntld/1", summary=summary, score="80.0",
+                published="2025-08-01", dt_created=saved,
+            )
+        )
+        session.commit()
+
+    model = load_sentence_model(tiny_sentence_model_path)
+    assert reindex_articles(Session, model) == 1
+    store = ArticleVectorStore()
+    assert len(store) == 1
+    # même encodage que les articles indexés à la sauvegarde
+    live = encode_articles(
+        [{"title": "ancien", "summary": summary, "link": "https://a.ntld/1"}], model, EmbeddingCache()
+    )
+    assert np.allclose(store.vectors[0], live[0], atol=1e-5)
+    assert not np.allclose(store.vectors[0], encode_texts(model, [f"ancien {summary}"])[0], atol=1e-3)
+    # dt_created est relu sans fuseau, en UTC
+    assert store._rows[0, 1] == pytest.approx(saved.replace(tzinfo=timezone.utc).timestamp(), abs=1)
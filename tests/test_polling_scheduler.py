@@ -0,0 +1,74 @@
+"""Tests de la planification adaptative du polling des sources."""
+"""
+pytest tests/test_polling_scheduler.py -v
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.db import Base
+from app.services.models import Source, SourceType
+from app.services.polling_scheduler import PollingScheduler, next_interval_hours
+
+NOW = datetime(2025, 10, 20, 12, 0, 0)
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    monkeypatch.setenv("MAX_DAYS", "10")
+    monkeypatch.setenv("POLL_BUDGET", "0")
+    monkeypatch.setenv("POLL_MIN_INTERVAL_HOURS", "1")
+    monkeypatch.setenv("POLL_MAX_INTERVAL_HOURS", "168")
+    monkeypatch.setenv("POLL_JITTER", "0")
+    engine = create_engine(f"sqlite:///{tmp_path / 'schedule.db'}")
+    Base.metadata.create_all(engine)
+    return PollingScheduler(sessionmaker(bind=engine), rng=random.Random(0))
+
+
+def _rss(url):
+    return Source(type=SourceType.RSS, url=url, name=url)
+
+
+def _articles(*hours_ago):
+    return [
+        {"published": (NOW - timedelta(hours=h)).isoformat()} for h in hours_ago
+    ]
+
+
+def test_interval_follows_publication_rate():
+    # 4 nouveaux articles en 8h : échantillon de 2h, lissé vers l'estimation précédente
+    assert next_interval_hours(10, 8, 4, 1, 168) == pytest.approx(0.3 * 2 + 0.7 * 10)
+    # rien de nouveau : on espace les relèves, borné par le maximum
+    assert next_interval_hours(100, 24, 0, 1, 168) == 150
+    assert next_interval_hours(150, 24, 0, 1, 168) == 168
+
+
+def test_never_polled_sources_are_due(scheduler):
+    sources = [_rss("https://a.ntld/feed"), _rss("https://b.ntld/feed")]
+    assert scheduler.select_due(sources, now=NOW) == sources
+
+
+def test_frequent_source_is_polled_more_often(scheduler):
+    busy, quiet = _rss("https://busy.ntld/feed"), _rss("https://quiet.ntld/feed")
+    scheduler.record_poll(busy, _articles(*range(0, 48, 2)), now=NOW)
+    scheduler.record_poll(quiet, [], now=NOW)
+
+    assert scheduler.select_due([busy, quiet], now=NOW + timedelta(hours=1)) == []
+    assert scheduler.select_due([busy, quiet], now=NOW + timedelta(hours=12)) == [busy]
+    assert scheduler.select_due([busy, quiet], now=NOW + timedelta(days=11)) == [
+        busy,
+        quiet,
+    ]
+
+
+def test_budget_keeps_most_overdue_first(scheduler):
+    old, recent = _rss("https://old.ntld/feed"), _rss("https://recent.ntld/feed")
+    new = _rss("https://new.ntld/feed")
+    scheduler.record_poll(old, _articles(1, 20), now=NOW - timedelta(days=5))
+    scheduler.record_poll(recent, _articles(1, 20), now=NOW - timedelta(days=1))
+
+    scheduler.budget = 2
+    assert scheduler.select_due([recent, old, new], now=NOW) == [new, old]
@@ -0,0 +1,123 @@
+"""Tests du suivi de santé des sources et du disjoncteur."""
+"""
+pytest tests/test_source_health.py -v
+"""
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.db import Base
+from app.services.models import Source, SourceType
+from app.services.source_health import SourceHealthTracker, open_duration
+
+NOW = datetime(2025, 10, 20, 12, 0, 0)
+DEAD = Source(type=SourceType.RSS, url="https://dead.ntld/feed", name="dead")
+SLOW = Source(type=SourceType.RSS, url="https://slow.ntld/feed", name="slow")
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'health.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def tracker(session_factory, monkeypatch):
+    monkeypatch.setenv("CIRCUIT_BREAKER_THRESHOLD", "3")
+    monkeypatch.setenv("CIRCUIT_BREAKER_BASE_MINUTES", "60")
+    monkeypatch.setenv("CIRCUIT_BREAKER_MAX_HOURS", "24")
+    return SourceHealthTracker(session_factory)
+
+
+def test_open_duration_backoff():
+    assert open_duration(2, 3, 60, 24) is None
+    assert open_duration(3, 3, 60, 24) == timedelta(hours=1)
+    assert open_duration(4, 3, 60, 24) == timedelta(hours=2)
+    assert open_duration(20, 3, 60, 24) == timedelta(hours=24)
+    assert open_duration(50, 0, 60, 24) is None
+
+
+def test_breaker_opens_then_half_opens(tracker):
+    for _ in range(3):
+        tracker.record_failure(DEAD, 10_000, TimeoutError("timed out"), now=NOW)
+
+    assert tracker.open_sources([DEAD, SLOW], now=NOW) == {"rss:https://dead.ntld/feed"}
+    # à l'échéance la source est retentée une fois
+    assert tracker.open_sources([DEAD], now=NOW + timedelta(minutes=61)) == set()
+
+    # nouvel échec : délai doublé
+    later = NOW + timedelta(minutes=61)
+    tracker.record_failure(DEAD, 10_000, TimeoutError("timed out"), now=later)
+    assert tracker.open_sources([DEAD], now=later + timedelta(minutes=119)) != set()
+    assert tracker.open_sources([DEAD], now=later + timedelta(minutes=121)) == set()
+
+
+def test_success_closes_breaker(tracker):
+    for _ in range(4):
+        tracker.record_failure(DEAD, 50, ValueError("HTTP 404"), now=NOW)
+    tracker.record_success(DEAD, 50, 2048, now=NOW + timedelta(hours=3))
+
+    assert tracker.open_sources([DEAD], now=NOW + timedelta(hours=3)) == set()
+    _, broken = tracker.report()
+    assert broken == []
+
+
+def test_report_lists_slowest_and_broken(tracker):
+    tracker.record_success(SLOW, 4000, 500_000, now=NOW)
+    tracker.record_success(DEAD, 100, 1000, now=NOW)
+    tracker.record_failure(DEAD, 30, ValueError("HTTP 404"), now=NOW)
+
+    slowest, broken = tracker.report()
+    assert [h.source_key for h in slowest] == [
+        "rss:https://slow.ntld/feed",
+        "rss:https://dead.ntld/feed",
+    ]
+    assert [(h.source_key, h.last_error_class) for h in broken] == [
+        ("rss:https://dead.ntld/feed", "ValueError")
+    ]
+    assert slowest[0].total_bytes == 500_000
+
+
+def test_fetch_articles_skips_open_sources(session_factory, monkeypatch):
+    from app.nodes import utils_fetch_nodes
+
+    monkeypatch.setenv("CIRCUIT_BREAKER_THRESHOLD", "1")
+    monkeypatch.setenv("POLL_SCHEDULER", "false")
+    monkeypatch.setattr(
+        utils_fetch_nodes,
+        "SourceHealthTracker",
+        lambda: SourceHealthTracker(session_factory),
+    )
+    fetcher = Mock()
+    fetcher.fetch_articles.side_effect = [ValueError("HTTP 410"), [{"title": "ok"}]]
+
+    assert utils_fetch_nodes.fetch_articles(fetcher, [DEAD, SLOW]) == [{"title": "ok"}]
+    # 2e exécution : la source morte n'est plus relevée
+    fetcher.fetch_articles.side_effect = [[{"title": "ok"}]]
+    assert utils_fetch_nodes.fetch_articles(fetcher, [DEAD, SLOW]) == [{"title": "ok"}]
+    assert fetcher.fetch_articles.call_count == 3
+
+
+def test_bookkeeping_errors_do_not_fail_the_fetch(monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    from app.nodes import utils_fetch_nodes
+
+    monkeypatch.setenv("POLL_SCHEDULER", "false")
+    health = Mock()
+    health.open_sources.return_value = set()
+    locked = OperationalError("UPDATE source_health", {}, Exception("database is locked"))
+    health.record_success.side_effect = locked
+    health.record_failure.side_effect = locked
+    monkeypatch.setattr(utils_fetch_nodes, "SourceHealthTracker", lambda: health)
+    fetcher = Mock()
+    fetcher.fetch_articles.side_effect = [ValueError("HTTP 410"), [{"title": "ok"}]]
+
+    # base verrouillée : les articles relevés sont gardés, la relève continue
+    assert utils_fetch_nodes.fetch_articles(fetcher, [DEAD, SLOW]) == [{"title": "ok"}]
+    # la source relevée n'est pas comptée en échec
+    assert [c.args[0] for c in health.record_failure.call_args_list] == [DEAD]
@@ -44,4 +44,58 @@ def test_summarize_node_limit(mock_articles, mock_env_vars):
     with patch(PATCH, return_value="Mock summary"):
         result = summarize_node(state)
         assert len(result.summaries) == 5
-        assert all(s["summary"] == "Mock summary" for s in result.summaries)
\ No newline at end of file
+        assert all(s["summary"] == "Mock summary" for s in result.summaries)
+
+def _article(title, source, score, link=None):
+    return {
+        "title": title,
+        "summary": title,
+        "link": link or f"https://example.com/{title}",
+        "source": source,
+        "score": score,
+        "published": "2025-10-20",
+    }
+
+
+def test_select_articles_for_summary_takes_best_scores_per_source(mock_env_vars):
+    articles = [_article(f"rss {s}", SourceType.RSS, s) for s in ("40.0", "95.5", "10.0", "80.0")]
+    articles += [_article(f"reddit {s}", SourceType.REDDIT, s) for s in (0.2, 0.9, 0.5)]
+    selected = select_articles_for_summary(articles)
+    titles = [a["title"] for a in selected]
+    # quotas pris par score décroissant, pas dans l'ordre d'arrivée
+    assert titles[:3] == ["rss 95.5", "rss 80.0", "rss 40.0"]
+    assert titles[3:5] == ["reddit 0.9", "reddit 0.5"]
+
+
+def test_top_k_by_source_keeps_k_best_in_one_pass():
+    from app.services.sources_ponderation import _top_k_by_source
+
+    articles = [_article(f"a{i}", SourceType.RSS, float(i % 7)) for i in range(50)]
+    top = _top_k_by_source(articles, 3)
+    assert [a["score"] for a in top[SourceType.RSS]] == [6.0, 6.0, 6.0]
+    # à score égal, ordre d'arrivée
+    assert [a["title"] for a in top[SourceType.RSS]] == ["a6", "a13", "a20"]
+
+
+def test_select_articles_for_summary_mmr_demotes_near_duplicates(mock_env_vars, monkeypatch):
+    import numpy as np
+    from app.services.embeddings import EmbeddingCache
+
+    monkeypatch.setenv("LIMIT_ARTICLES_TO_RESUME", "2")
+    monkeypatch.setenv("RSS_WEIGHT", "100")
+    monkeypatch.setenv("SELECTION_MMR_LAMBDA", "0.5")
+    cache = EmbeddingCache(max_size=10)
+    duplicate = np.array([1.0, 0.0], dtype=np.float32)
+    articles = [
+        _article("gpt launch", SourceType.RSS, "90.0"),
+        _article("gpt launch again", SourceType.RSS, "89.0"),
+        _article("django release", SourceType.RSS, "70.0"),
+    ]
+    for article, vector in zip(articles, [duplicate, duplicate, np.array([0.0, 1.0], dtype=np.float32)]):
+        cache.put(article, vector)
+    monkeypatch.setattr("app.services.embeddings.embedding_cache", cache)
+
+    monkeypatch.setenv("SELECTION_MMR", "false")
+    assert [a["title"] for a in select_articles_for_summary(articles)] == ["gpt launch", "gpt launch again"]
+    monkeypatch.setenv("SELECTION_MMR", "true")
+    assert [a["title"] for a in select_articles_for_summary(articles)] == ["gpt launch", "django release"]
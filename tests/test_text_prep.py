@@ -0,0 +1,95 @@
+"""Tests de la préparation des textes dans le budget de tokens et des embeddings par fenêtres."""
+"""
+pytest tests/test_text_prep.py -v
+"""
+import faiss
+import numpy as np
+import pytest
+
+from app.nodes.filter_nodes import _max_pooled_keyword_search
+from app.services.embedding_backends import load_sentence_model
+from app.services.embeddings import EmbeddingCache, encode_article_chunks
+from app.services.text_prep import CHARS_PER_TOKEN, TextPreparer
+
+BODY = " ".join(f"w{i}" for i in range(100))
+
+
+def test_truncate_bounds_raw_text():
+    preparer = TextPreparer(max_tokens=10, mode="truncate")
+    (text,) = preparer.prepare("Titre", BODY)
+    assert text.startswith("Titre w0")
+    assert len(text) <= 10 * CHARS_PER_TOKEN
+
+
+def test_head_tail_keeps_start_and_end():
+    preparer = TextPreparer(max_tokens=20, mode="head_tail", head_ratio=0.75)
+    (text,) = preparer.prepare("Titre", BODY)
+    assert text.startswith("Titre w0 w1")
+    assert text.endswith("w98 w99")
+    assert preparer.token_count(text) == 21  # 20 tokens + séparateur
+
+    (short,) = preparer.prepare("Titre", "court")
+    assert short == "Titre court"
+
+
+def test_chunks_spread_over_body_with_title():
+    preparer = TextPreparer(max_tokens=20, mode="chunks", max_chunks=3)
+    chunks = preparer.prepare("Titre", BODY)
+    assert len(chunks) == 3
+    assert all(chunk.startswith("Titre ") for chunk in chunks)
+    assert chunks[0].startswith("Titre w0 ")
+    assert chunks[-1].endswith("w99")
+    assert all(preparer.token_count(chunk) <= 20 for chunk in chunks)
+    assert preparer.prepare("Titre", "") == ["Titre"]
+
+
+def test_tokenizations_are_cached():
+    preparer = TextPreparer(max_tokens=20, mode="chunks")
+    preparer.prepare("Titre", BODY)
+    hits = preparer._offsets.cache_info().hits
+    preparer.prepare("Titre", BODY)
+    assert preparer._offsets.cache_info().hits > hits
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        TextPreparer(mode="summary")
+
+
+def test_model_tokenizer_offsets(tiny_sentence_model_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_TEXT_MODE", "head_tail")
+    monkeypatch.setenv("EMBEDDING_MAX_TOKENS", "30")
+    model = load_sentence_model(tiny_sentence_model_path)
+    preparer = TextPreparer.from_model(model)
+    assert preparer.max_tokens == 30
+    (text,) = preparer.prepare("python", "release " * 200 + "final words")
+    assert text.startswith("python release")
+    assert text.endswith("words")
+    assert " … " in text
+
+
+def test_chunk_embeddings_and_max_pooled_search(tiny_sentence_model_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_TEXT_MODE", "chunks")
+    monkeypatch.setenv("EMBEDDING_MAX_TOKENS", "40")
+    monkeypatch.setenv("EMBEDDING_MAX_CHUNKS", "3")
+    # nouveau modèle : préparateur construit avec cette configuration
+    model = load_sentence_model(tiny_sentence_model_path)
+    articles = [
+        {"title": "long", "summary": "abc " * 300, "link": "https://ntld/long"},
+        {"title": "court", "summary": "abc", "link": "https://ntld/court"},
+    ]
+    cache = EmbeddingCache(10)
+    vectors, chunks = encode_article_chunks(articles, model, cache)
+    assert vectors.shape[0] == 2
+    assert [len(c) for c in chunks] == [3, 1]
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    assert cache.get_chunks(articles[0]).shape == chunks[0].shape
+
+    # la similarité d'un article est celle de sa meilleure fenêtre
+    keywords = np.eye(chunks[0].shape[1], dtype=np.float32)[:2]
+    index = faiss.IndexFlatIP(keywords.shape[1])
+    index.add(keywords)
+    similarities, indices = _max_pooled_keyword_search(index, chunks, k=2)
+    expected = np.array([(c @ keywords.T).max(axis=0) for c in chunks])
+    assert np.allclose(np.take_along_axis(expected, indices, axis=1), similarities, atol=1e-5)
+    assert (np.diff(similarities, axis=1) <= 0).all()
@@ -0,0 +1,61 @@
+"""Tests de l'extraction de texte HTML (parité avec BeautifulSoup)."""
+"""
+pytest tests/test_text_utils.py -v
+"""
+import random
+from pathlib import Path
+
+import feedparser
+import pytest
+from bs4 import BeautifulSoup
+
+from app.services.fetchers.rss_fetcher import RSSFetcher
+from app.services.text_utils import html_to_text
+
+SAMPLE = Path(__file__).parent / "data" / "feed_samples.xml"
+
+
+def _bs4_get_text(text: str) -> str:
+    return BeautifulSoup(text, "html.parser").get_text()
+
+
+def test_feed_samples_parity():
+    fetcher = RSSFetcher()
+    entries = feedparser.parse(str(SAMPLE), sanitize_html=True).entries
+    assert entries
+    for entry in entries:
+        summary = fetcher.get_summary(entry)
+        assert fetcher.strip_html(summary) == _bs4_get_text(summary)
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "",
+        "texte brut sans balise",
+        "   \n  ",
+        "<p>Un <b>gras</b> et <i>italique</i></p>\n<p>second</p>",
+        "AT&amp;T &eacute;t&eacute; &copy &unknown; &#233;&#x27;&#150;&#0;",
+        "<script>var a = '<b>';</script><style>p {}</style>visible",
+        "<pre>  garde   les\n\n espaces </pre>  <div>  </div>",
+        "<div><span>non fermé<p>suite</div>après",
+        "ligne<br>ligne</br><br/>fin",
+        "<![CDATA[brut <b>]]><!-- commentaire -->texte<?pi ?>",
+        "<ruby>漢<rt>kan</rt><rp>(</rp></ruby>",
+        "<a href='x'>lien</a> &lt;code&gt; < 3",
+    ],
+)
+def test_edge_cases_parity(html):
+    assert html_to_text(html) == _bs4_get_text(html)
+
+
+def test_random_fragments_parity():
+    rng = random.Random(29)
+    tokens = [
+        "<p>", "</p>", "<b>", "</b>", "<br>", "</br>", "<script>", "</script>",
+        "<pre>", "</pre>", "<!--x-->", "<![CDATA[c]]>", "&amp;", "&#8217;", "&nbsp",
+        "&#x9f;", " ", "\n", "\t", "mot", "é", "<", ">", "&",
+    ]
+    for _ in range(500):
+        html = "".join(rng.choice(tokens) for _ in range(rng.randint(1, 15)))
+        assert html_to_text(html) == _bs4_get_text(html), html
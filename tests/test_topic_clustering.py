@@ -0,0 +1,95 @@
+"""Tests du regroupement par sujet et du résumé multi-sources."""
+"""
+pytest tests/test_topic_clustering.py -v
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.nodes.cluster_nodes import topic_cluster_node
+from app.nodes.summarize_nodes import summarize_node
+from app.services.embeddings import embedding_cache
+from app.services.models import SourceType, UnifiedState
+from app.services.topic_clustering import cluster_by_topic, group_articles_by_topic
+
+
+def _vector(*values):
+    vector = np.zeros(4, dtype=np.float32)
+    vector[: len(values)] = values
+    return vector / np.linalg.norm(vector)
+
+
+def _article(title, score, source=SourceType.RSS):
+    return {
+        "title": title,
+        "summary": f"contenu {title}",
+        "link": f"https://ntld/{title}",
+        "published": "2025-10-20",
+        "score": score,
+        "source": source,
+    }
+
+
+@pytest.fixture
+def cve_and_release():
+    articles = [
+        _article("cve-rss", "70.0"),
+        _article("release", "90.0"),
+        _article("cve-reddit", "85.0", SourceType.REDDIT),
+        _article("cve-bluesky", "60.0", SourceType.BLUESKY),
+    ]
+    vectors = np.vstack(
+        [_vector(1, 0.1), _vector(0, 1), _vector(1, 0.05), _vector(1, 0.2)]
+    )
+    return articles, vectors
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    embedding_cache.clear()
+    yield
+    embedding_cache.clear()
+
+
+def test_cluster_by_topic_threshold(cve_and_release):
+    _, vectors = cve_and_release
+    assert cluster_by_topic(vectors, threshold=0.9) == [[0, 2, 3], [1]]
+    assert cluster_by_topic(vectors, threshold=0.999) == [[0], [1], [2], [3]]
+    assert cluster_by_topic(vectors[:1], threshold=0.9) == [[0]]
+
+
+def test_group_keeps_best_scored_representative(cve_and_release):
+    articles, vectors = cve_and_release
+    topics = group_articles_by_topic(articles, vectors, threshold=0.9, max_articles=2)
+
+    assert [t["title"] for t in topics] == ["cve-reddit", "release"]
+    cve = topics[0]
+    assert [m["title"] for m in cve["topic_members"]] == ["cve-rss"]
+    assert [c["title"] for c in cve["also_covered_by"]] == ["cve-rss", "cve-bluesky"]
+    assert "topic_members" not in topics[1]
+
+
+def test_one_llm_call_per_topic(cve_and_release, monkeypatch):
+    monkeypatch.setenv("TOPIC_CLUSTER_THRESHOLD", "0.9")
+    articles, vectors = cve_and_release
+    for article, vector in zip(articles, vectors):
+        embedding_cache.put(article, vector)
+
+    state = topic_cluster_node(UnifiedState(keywords=[], filtered_articles=articles))
+    assert len(state.filtered_articles) == 2
+
+    with patch(
+        "app.nodes.summarize_nodes._summarize_topic", return_value="Résumé du sujet"
+    ) as summarize_topic, patch(
+        "app.nodes.summarize_nodes._summarize_article", return_value="Résumé"
+    ) as summarize_article:
+        result = summarize_node(state)
+
+    assert summarize_topic.call_count == 1
+    assert summarize_article.call_count == 1
+    topic_articles = summarize_topic.call_args.args[0]
+    assert [a["title"] for a in topic_articles] == ["cve-reddit", "cve-rss", "cve-bluesky"]
+    cve_summary = next(s for s in result.summaries if s["title"] == "cve-reddit")
+    assert cve_summary["summary"] == "Résumé du sujet"
+    assert len(cve_summary["also_covered_by"]) == 2
@@ -2,6 +2,7 @@
 # uvicorn web:app --reload # http://127.0.0.1:8000/ 
 #
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
@@ -27,7 +28,24 @@ DB_PATH = os.getenv("DB_PATH", "techno-watch.db")
 
 TEMPLATES_WEB = "app/templates/web"
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Vérifie au démarrage que la base est migrée. La migration est faite une seule fois par
+    l'agent (python -m app --init-db), pas par chaque worker uvicorn.
+    """
+    from app.db.db import engine, pending_migrations
+
+    pending = await run_in_threadpool(pending_migrations, engine)
+    if pending:
+        logger.error(
+            f"Base {DB_PATH} non migrée, colonnes manquantes {pending} : lancer python -m app --init-db"
+        )
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 app.mount("/static", StaticFiles(directory=TEMPLATES_WEB), name="static")
 
 if os.getenv("TEST_PERFORMANCE", "false").lower() == "true":
@@ -39,6 +57,8 @@ templates = Jinja2Templates(directory=TEMPLATES_WEB)
 
 register_jinja_filters(templates.env)
 
+
+
 @app.get("/")
 async def read_articles_async(request: Request, date: str = None):
     """Affiche les articles filtrés par date de publication."""
@@ -63,6 +83,33 @@ def read_articles_sync(request: Request, date: str = None):
         {"request": request, "articles": articles}
     )
 
+@app.get("/semantic")
+async def semantic_search_articles(
+    request: Request,
+    q: str,
+    limit: int = 10,
+    ajax: bool = False
+):
+    """
+    Recherche sémantique : articles sauvegardés les plus proches de la requête (embeddings).
+    Args:
+        q: Texte recherché
+        limit: Nombre max de résultats
+    """
+    from app.services.semantic_search import semantic_search
+
+    if not q:
+        return {"error": "Le terme de recherche est obligatoire."}
+
+    # encodage de la requête et recherche FAISS bloquants : hors boucle asyncio
+    articles = await run_in_threadpool(semantic_search, q, limit)
+    logger.info(f"Recherche sémantique '{q}' - {len(articles)} résultats")
+    template = "fragments/_search_ajax_results.html" if ajax else "index.html"
+    return templates.TemplateResponse(
+        template,
+        {"request": request, "articles": articles}
+    )
+
 @app.get("/search")
 async def search_articles(
     request: Request,
@@ -70,7 +117,8 @@ async def search_articles(
     date_min: Optional[str] = None,
     date_max: Optional[str] = None,
     limit: int = 10,
-    ajax: bool = False    
+    ajax: bool = False,
+    mode: str = "fts"
 ):
     """
     Endpoint pour la recherche plein texte.
@@ -78,6 +126,7 @@ async def search_articles(
         q: Terme de recherche
         date_min/date_max: Filtres de date (format YYYY-MM-DD)
         limit: Nombre max de résultats
+        mode: "fts" (plein texte) ou "hybrid" (plein texte + sémantique, fusion RRF)
     """
     
     from datetime import datetime    
@@ -94,6 +143,9 @@ async def search_articles(
     except ValueError:
         return {"error": "Format de date invalide. Utilisez YYYY-MM-DD."}
 
+    if mode == "hybrid":
+        return await _hybrid_search_response(request, q, date_min, date_max, limit, ajax)
+
     async with get_db_async() as session:
         # Appel de la recherche FTS
         results = await ArticleFTS.search(
@@ -126,4 +178,25 @@ async def search_articles(
         return templates.TemplateResponse(
             "index.html",
             {"request": request, "articles": articles}
-        )
\ No newline at end of file
+        )
+
+
+async def _hybrid_search_response(request, q, date_min, date_max, limit, ajax):
+    """Recherche hybride FTS + vecteurs, durées de chaque étape dans l'en-tête Server-Timing"""
+    from time import perf_counter
+    from app.services.hybrid_search import hybrid_search, server_timing_header
+
+    start = perf_counter()
+    async with get_db_async() as session:
+        articles, timings = await hybrid_search(
+            session, q, date_min=date_min, date_max=date_max, limit=limit
+        )
+    timings["total"] = (perf_counter() - start) * 1000
+    logger.info(f"Recherche hybride '{q}' - {len(articles)} résultats - {server_timing_header(timings)}")
+    template = "fragments/_search_ajax_results.html" if ajax else "index.html"
+    response = templates.TemplateResponse(
+        template,
+        {"request": request, "articles": articles}
+    )
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return response